@@ -19,14 +19,38 @@ except ImportError:
     └─────────────────────────────────────┘
         """
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    # 後備方案：以 Pillow 直方圖計算墨水覆蓋率（不支援條碼偵測）
+    NUMPY_AVAILABLE = False
+
 
 from datetime import datetime
 import threading
+import time
+import multiprocessing
+import concurrent.futures
 import traceback
 import logging
 import urllib.request
 import urllib.parse
 import json
+import re
+import math
+import csv
+import shutil
+import tempfile
+import queue
+import io
+import hashlib
+import base64
+import contextlib
+import cProfile
+import tracemalloc
+import bisect
+from collections import OrderedDict, deque
 import webbrowser
 import ssl
 from packaging import version
@@ -34,6 +58,510 @@ from packaging import version
 # 應用程式版本信息
 APP_VERSION = "4.2.1"
 
+# 日誌等級：低於門檻的訊息直接略過。設定環境變數 PDF_TOOL_DEBUG=1
+# 或以 --debug 啟動時才顯示除錯訊息
+LOG_LEVELS = {"debug": 10, "info": 20, "success": 20, "warning": 30, "error": 40}
+DEBUG_MODE = os.getenv('PDF_TOOL_DEBUG') == '1' or '--debug' in sys.argv
+LOG_THRESHOLD = LOG_LEVELS["debug"] if DEBUG_MODE else LOG_LEVELS["info"]
+
+
+def log_enabled(level):
+    """此等級的訊息是否會被記錄；組合昂貴的除錯訊息前先檢查"""
+    return LOG_LEVELS.get(level, LOG_LEVELS["info"]) >= LOG_THRESHOLD
+
+
+LOG_FLUSH_INTERVAL = 100  # 日誌面板更新間隔（毫秒）
+LOG_MAX_LINES = 500  # 日誌面板保留的最大行數
+LOG_TRIM_LINES = 100  # 超過上限時一次刪除的行數
+OPERATION_LOG_BUFFER = 64 * 1024  # 操作紀錄檔的寫入緩衝大小（位元組）
+
+
+class OperationLog:
+    """以 JSON Lines 格式記錄每次操作，由背景執行緒寫入檔案
+
+    record() 只把資料放入佇列，不會阻塞處理中的執行緒；寫入執行緒
+    保持檔案開啟並在佇列清空時才 flush。開啟前呼叫 record() 不做任何事。
+    """
+
+    def __init__(self):
+        self.path = None
+        self._queue = None
+        self._thread = None
+
+    def open(self, log_dir):
+        """開啟當日的操作紀錄檔並啟動寫入執行緒"""
+        if self._thread:
+            return
+        today = datetime.now().strftime("%Y%m%d")
+        path = os.path.join(log_dir, f"operations_{today}.jsonl")
+        log_file = open(path, 'a', encoding='utf-8',
+                        buffering=OPERATION_LOG_BUFFER)
+        self.path = path
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write_entries,
+                                        args=(log_file, self._queue),
+                                        name="operation-log",
+                                        daemon=True)
+        self._thread.start()
+
+    def record(self, entry):
+        """加入一筆紀錄（任何執行緒皆可呼叫）"""
+        if self._queue is not None:
+            self._queue.put(entry)
+
+    def close(self):
+        """寫完佇列中的紀錄後關閉檔案"""
+        if not self._thread:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._thread = None
+        self._queue = None
+
+    @staticmethod
+    def _write_entries(log_file, entries):
+        with log_file:
+            while True:
+                entry = entries.get()
+                if entry is None:
+                    break
+                try:
+                    log_file.write(json.dumps(entry, ensure_ascii=False,
+                                              default=str) + "\n")
+                    if entries.empty():
+                        log_file.flush()
+                except Exception as e:
+                    logging.getLogger('PDFToolkit').error(
+                        "無法寫入操作紀錄：%s", e)
+
+
+operation_log = OperationLog()
+
+
+def total_file_size(paths):
+    """檔案大小總和（位元組）；不存在的檔案不計"""
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+
+_memory_info_api = None  # Windows GetProcessMemoryInfo 與其結構，第一次使用時建立
+
+
+def _windows_memory_counters():
+    """取得本程序的 PROCESS_MEMORY_COUNTERS，失敗時回傳 None"""
+    global _memory_info_api
+    import ctypes
+    from ctypes import wintypes
+
+    if _memory_info_api is None:
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD),
+                        ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t),
+                        ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t),
+                        ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        get_info = ctypes.windll.psapi.GetProcessMemoryInfo
+        get_info.argtypes = [wintypes.HANDLE,
+                             ctypes.POINTER(PROCESS_MEMORY_COUNTERS),
+                             wintypes.DWORD]
+        _memory_info_api = (get_info, PROCESS_MEMORY_COUNTERS)
+
+    get_info, structure = _memory_info_api
+    counters = structure()
+    counters.cb = ctypes.sizeof(counters)
+    if not get_info(ctypes.windll.kernel32.GetCurrentProcess(),
+                    ctypes.byref(counters), counters.cb):
+        return None
+    return counters
+
+
+def process_memory_mb():
+    """本程序目前的記憶體用量（MB），無法取得時（例如 macOS）回傳 None"""
+    try:
+        if sys.platform == "win32":
+            counters = _windows_memory_counters()
+            if counters is None:
+                return None
+            current = counters.WorkingSetSize
+        elif os.path.exists("/proc/self/statm"):
+            with open("/proc/self/statm") as f:
+                current = int(f.read().split()[1]) * os.sysconf(
+                    "SC_PAGE_SIZE")
+        else:
+            return None
+        return round(current / (1024 * 1024), 1)
+    except Exception:
+        return None
+
+
+def process_peak_memory_mb():
+    """本程序啟動至今的最高記憶體用量（MB），無法取得時回傳 None
+
+    只包含本程序，不含程序池中的工作程序。
+    """
+    try:
+        if sys.platform == "win32":
+            counters = _windows_memory_counters()
+            if counters is None:
+                return None
+            peak = counters.PeakWorkingSetSize
+        elif os.path.exists("/proc/self/status"):
+            # Linux 的 ru_maxrss 在 fork 後執行新程式時不會歸零，子程序會
+            # 帶著父程序的峰值；VmHWM 只計算目前的位址空間
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        peak = int(line.split()[1]) * 1024
+                        break
+                else:
+                    return None
+        else:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # macOS 以位元組回報，其他系統以 KB 回報
+            if sys.platform != "darwin":
+                peak *= 1024
+        return round(peak / (1024 * 1024), 1)
+    except Exception:
+        return None
+
+
+MEMORY_SAMPLE_INTERVAL = 0.05  # 操作期間取樣記憶體用量的間隔（秒）
+
+
+class MemorySampler:
+    """在背景執行緒定期取樣本程序的記憶體用量，保留期間的最高值
+
+    取樣的是整個程序，同時進行的其他操作也會計入。
+    """
+
+    def __init__(self, interval=MEMORY_SAMPLE_INTERVAL):
+        self.peak_mb = None
+        self._interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._sample()
+        if self.peak_mb is None:
+            return  # 此平台無法取得目前用量
+        self._thread = threading.Thread(target=self._run,
+                                        name="memory-sampler",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止取樣並回傳期間的最高用量（MB），無法取得時回傳 None"""
+        if self._thread:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+            self._sample()
+        return self.peak_mb
+
+    def _run(self):
+        while not self._stopped.wait(self._interval):
+            self._sample()
+
+    def _sample(self):
+        current = process_memory_mb()
+        if current is not None and (self.peak_mb is None
+                                    or current > self.peak_mb):
+            self.peak_mb = current
+
+
+PERF_RECENT_OPERATIONS = 20  # 效能面板保留的最近操作數量
+PERF_HISTOGRAM_BOUNDS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)  # 直方圖區間上限（毫秒）
+PERF_STAGE_LABELS = {
+    "open": "開啟",
+    "render": "渲染",
+    "encode": "編碼",
+    "insert": "插入",
+    "save": "儲存",
+}
+PROFILE_DIR = "logs"  # cProfile 結果的存放目錄
+# 設定環境變數 PDF_TOOL_PROFILE=1 或以 --profile 啟動時即擷取 cProfile 與 tracemalloc
+PROFILE_MODE = os.getenv('PDF_TOOL_PROFILE') == '1' or '--profile' in sys.argv
+
+
+def _new_stage_stats():
+    return {
+        "count": 0,
+        "total_s": 0.0,
+        "max_s": 0.0,
+        "histogram": [0] * (len(PERF_HISTOGRAM_BOUNDS_MS) + 1)
+    }
+
+
+def merge_stage_stats(target, stages):
+    """將 stages 的各階段統計累加到 target"""
+    for stage, stats in stages.items():
+        merged = target.get(stage)
+        if merged is None:
+            merged = target[stage] = _new_stage_stats()
+        merged["count"] += stats["count"]
+        merged["total_s"] += stats["total_s"]
+        merged["max_s"] = max(merged["max_s"], stats["max_s"])
+        merged["histogram"] = [a + b for a, b in zip(merged["histogram"],
+                                                     stats["histogram"])]
+
+
+class PerfStats:
+    """各階段（開啟、渲染、編碼、插入、儲存）的耗時統計
+
+    每段計時同時累加到全域統計與目前執行緒進行中的操作；操作結束時
+    取出該操作的各階段耗時，保留最近幾次供效能面板顯示。
+    """
+
+    def __init__(self):
+        self.profiling = PROFILE_MODE
+        self.stages = {}
+        self.recent = deque(maxlen=PERF_RECENT_OPERATIONS)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def add(self, stage, elapsed):
+        """記錄一段耗時（秒）"""
+        bucket = bisect.bisect_left(PERF_HISTOGRAM_BOUNDS_MS, elapsed * 1000)
+        targets = [self.stages]
+        current = getattr(self._local, 'stages', None)
+        if current is not None:
+            targets.append(current)
+        with self._lock:
+            for stages in targets:
+                stats = stages.get(stage)
+                if stats is None:
+                    stats = stages[stage] = _new_stage_stats()
+                stats["count"] += 1
+                stats["total_s"] += elapsed
+                if elapsed > stats["max_s"]:
+                    stats["max_s"] = elapsed
+                stats["histogram"][bucket] += 1
+
+    def merge(self, stages, peak_memory_mb=None):
+        """累加其他程序回傳的階段統計與該程序的記憶體峰值（MB）"""
+        current = getattr(self._local, 'stages', None)
+        with self._lock:
+            merge_stage_stats(self.stages, stages)
+            if current is not None:
+                merge_stage_stats(current, stages)
+        if current is not None and peak_memory_mb is not None:
+            worker_peak = self._local.peak_memory_mb
+            if worker_peak is None or peak_memory_mb > worker_peak:
+                self._local.peak_memory_mb = peak_memory_mb
+
+    def begin(self):
+        """開始收集目前執行緒的階段統計，回傳供 end() 還原的前一個狀態"""
+        previous = (getattr(self._local, 'stages', None),
+                    getattr(self._local, 'peak_memory_mb', None))
+        self._local.stages = {}
+        self._local.peak_memory_mb = None
+        return previous
+
+    def end(self, previous):
+        """結束收集，回傳這段期間的 (階段統計, 工作程序記憶體峰值)"""
+        stages = self._local.stages
+        peak_memory_mb = self._local.peak_memory_mb
+        self._local.stages, self._local.peak_memory_mb = previous
+        return stages, peak_memory_mb
+
+    def finish_operation(self, entry, stages):
+        """保留一次操作的摘要供效能面板顯示"""
+        self.recent.append((entry, stages))
+
+    def clear(self):
+        with self._lock:
+            self.stages.clear()
+        self.recent.clear()
+
+    def report(self):
+        """產生各階段耗時與最近操作的文字報告"""
+        with self._lock:
+            stages = {stage: dict(stats) for stage, stats in
+                      self.stages.items()}
+        recent = list(self.recent)
+
+        bounds = [f"<{bound}" for bound in PERF_HISTOGRAM_BOUNDS_MS]
+        bounds.append(f"≥{PERF_HISTOGRAM_BOUNDS_MS[-1]}")
+        lines = ["各階段耗時（啟動至今）", ""]
+        if not stages:
+            lines.append("  尚無資料")
+        for stage, stats in sorted(stages.items()):
+            average_ms = stats["total_s"] / stats["count"] * 1000
+            lines.append(
+                f"  {PERF_STAGE_LABELS.get(stage, stage)}：{stats['count']} 次，"
+                f"共 {stats['total_s']:.2f} 秒，平均 {average_ms:.1f} ms，"
+                f"最長 {stats['max_s'] * 1000:.1f} ms")
+            histogram = "  ".join(
+                f"{label}:{count}"
+                for label, count in zip(bounds, stats["histogram"]) if count)
+            lines.append(f"    分布（ms）{histogram}")
+
+        lines += ["", f"最近 {len(recent)} 次操作", ""]
+        for entry, op_stages in reversed(recent):
+            lines.append(
+                f"  {entry['timestamp']}  {entry['operation']}  "
+                f"{entry['outcome']}  {entry['duration_s']:.2f} 秒  "
+                f"{entry.get('pages', '-')} 頁")
+            breakdown = "  ".join(
+                f"{PERF_STAGE_LABELS.get(stage, stage)} "
+                f"{stats['total_s']:.2f}s/{stats['count']}"
+                for stage, stats in sorted(op_stages.items()))
+            if breakdown:
+                lines.append(f"    {breakdown}")
+            if entry.get('profile_path'):
+                lines.append(f"    cProfile：{entry['profile_path']}，"
+                             f"tracemalloc 峰值 {entry['traced_peak_mb']} MB")
+        return "\n".join(lines)
+
+
+perf_stats = PerfStats()
+
+
+@contextlib.contextmanager
+def perf_span(stage):
+    """計時一個處理階段"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        perf_stats.add(stage, time.perf_counter() - started)
+
+
+# 工作程序初始化時的階段統計（例如開啟來源文件），由下一項完成的工作帶回
+_worker_init_stages = {}
+
+
+def _init_with_perf(initializer, *initargs):
+    """在工作程序中執行 initializer，並保留其階段統計"""
+    previous = perf_stats.begin()
+    try:
+        initializer(*initargs)
+    finally:
+        stages, _ = perf_stats.end(previous)
+        merge_stage_stats(_worker_init_stages, stages)
+
+
+def _run_with_perf(worker, task):
+    """在工作程序中執行工作，一併回傳這項工作的階段統計與本程序的記憶體峰值
+
+    程序池只用於一次操作，工作程序啟動至今的峰值即為它在這次操作的峰值。
+    """
+    previous = perf_stats.begin()
+    try:
+        result = worker(task)
+    finally:
+        stages, _ = perf_stats.end(previous)
+    if _worker_init_stages:
+        merge_stage_stats(stages, _worker_init_stages)
+        _worker_init_stages.clear()
+    return result, stages, process_peak_memory_mb()
+
+
+_profile_lock = threading.Lock()
+
+
+def _start_profile():
+    """開始擷取 cProfile 與 tracemalloc；已有其他操作在擷取時回傳 None
+
+    cProfile 只記錄呼叫的執行緒，不含程序池中的工作程序。
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # 其他分析工具已在執行
+        _profile_lock.release()
+        return None
+    tracemalloc.start()
+    return profiler
+
+
+def _finish_profile(profiler, entry):
+    """停止擷取並將結果記錄到 entry"""
+    try:
+        profiler.disable()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(PROFILE_DIR,
+                            f"profile_{entry['operation']}_{stamp}.prof")
+        profiler.dump_stats(path)
+        entry["profile_path"] = path
+        entry["traced_peak_mb"] = round(peak / (1024 * 1024), 1)
+    except Exception as e:
+        logging.getLogger('PDFToolkit').error("無法儲存效能分析結果：%s", e)
+    finally:
+        _profile_lock.release()
+
+
+@contextlib.contextmanager
+def track_operation(operation, input_paths=(), **fields):
+    """記錄一次操作的耗時與結果到操作紀錄
+
+    with 區塊內可在回傳的 dict 填入 pages、output_paths、failures 等
+    欄位；區塊拋出例外時記為 error 並照常拋出，有 failures 時記為 partial。
+    peak_memory_mb 是這次操作期間單一程序的最高記憶體用量：本程序在
+    區塊內的取樣與各工作程序峰值中的最大值。
+    """
+    input_paths = list(input_paths)
+    entry = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "operation": operation,
+        "input_files": len(input_paths),
+        "input_bytes": total_file_size(input_paths),
+    }
+    entry.update(fields)
+    entry["outcome"] = "success"
+    profiler = _start_profile() if perf_stats.profiling else None
+    previous_stages = perf_stats.begin()
+    memory_sampler = MemorySampler()
+    memory_sampler.start()
+    started = time.perf_counter()
+    try:
+        yield entry
+    except Exception as e:
+        entry["outcome"] = "error"
+        entry["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        entry["duration_s"] = round(time.perf_counter() - started, 3)
+        stages, worker_peak_mb = perf_stats.end(previous_stages)
+        entry["stages"] = {
+            stage: {"count": stats["count"],
+                    "total_s": round(stats["total_s"], 4)}
+            for stage, stats in stages.items()
+        }
+        if profiler:
+            _finish_profile(profiler, entry)
+        peaks = [peak for peak in (memory_sampler.stop(), worker_peak_mb)
+                 if peak is not None]
+        entry["peak_memory_mb"] = max(peaks) if peaks else None
+        output_paths = entry.pop("output_paths", ())
+        entry["output_files"] = sum(
+            1 for path in output_paths if os.path.exists(path))
+        entry["output_bytes"] = total_file_size(output_paths)
+        if entry["outcome"] == "success" and entry.get("failures"):
+            entry["outcome"] = "partial"
+        perf_stats.finish_operation(entry, stages)
+        operation_log.record(entry)
+
+
 # 多源更新配置 - 支援內網 GitLab 和外網 GitHub
 UPDATE_SOURCES = {
     'gitlab': {
@@ -473,15 +1001,426 @@ class TextInsertDialog(tk.Toplevel):
         self.destroy()
 
 
+def plan_fixed_parts(total_pages, pages_per_file):
+    """依固定頁數規劃拆分範圍，回傳 (起始頁, 結束頁) 0-based 列表"""
+    return [(start, min(start + pages_per_file, total_pages) - 1)
+            for start in range(0, total_pages, pages_per_file)]
+
+
+def parse_page_ranges(expression, total_pages):
+    """解析頁碼運算式，例如 "1-3,7,10-end"
+
+    以逗號分隔的每一段各成為一個範圍，回傳 (起始頁, 結束頁) 0-based 列表；
+    "end" 代表最後一頁，"10-" 等同 "10-end"。格式錯誤時拋出 ValueError。
+    """
+
+    def to_index(token):
+        token = token.strip().lower()
+        if token == "end":
+            return total_pages - 1
+        if not token.isdigit():
+            raise ValueError(f"無法辨識的頁碼：{token}")
+        page = int(token)
+        if page < 1 or page > total_pages:
+            raise ValueError(f"頁碼 {page} 超出範圍（1 到 {total_pages}）")
+        return page - 1
+
+    ranges = []
+    for item in expression.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if "-" in item:
+            start_token, end_token = item.split("-", 1)
+            start = to_index(start_token)
+            end = to_index(end_token) if end_token.strip() else total_pages - 1
+        else:
+            start = end = to_index(item)
+        if start > end:
+            raise ValueError(f"範圍 {item} 的起始頁大於結束頁")
+        ranges.append((start, end))
+
+    if not ranges:
+        raise ValueError("請輸入頁碼範圍，例如 1-3,7,10-end")
+    return ranges
+
+
+def plan_bookmark_parts(doc):
+    """依第一層書籤規劃拆分範圍，回傳 (起始頁, 結束頁, 標題) 列表
+
+    第一個書籤之前的頁面（例如封面）自成一份。
+    """
+    starts = {}
+    for level, title, page in doc.get_toc(simple=True):
+        # 書籤頁碼為 1-based，-1 代表沒有目標頁
+        if level == 1 and 1 <= page <= len(doc):
+            starts.setdefault(page - 1, title.strip())
+
+    if not starts:
+        return []
+
+    if 0 not in starts:
+        starts[0] = "開頭"
+
+    sorted_starts = sorted(starts.items())
+    parts = []
+    for i, (start, title) in enumerate(sorted_starts):
+        if i + 1 < len(sorted_starts):
+            end = sorted_starts[i + 1][0] - 1
+        else:
+            end = len(doc) - 1
+        parts.append((start, end, title))
+    return parts
+
+
+def safe_file_name(name, max_length=60):
+    """移除檔名中不允許的字元"""
+    cleaned = "".join("_" if c in '\\/:*?"<>|' or ord(c) < 32 else c
+                      for c in name).strip(" .")
+    return cleaned[:max_length] or "untitled"
+
+
+# 估算輸出大小時每個物件的額外成本（物件標頭與交叉參照表）
+PDF_OBJECT_OVERHEAD = 40
+# 估算輸出大小時每個檔案的固定成本（檔頭、頁面樹、trailer）
+PDF_FILE_OVERHEAD = 1024
+
+
+class PDFSizeEstimator:
+    """以物件長度累加估算拆分檔大小，不需反覆存檔
+
+    每個物件的大小與引用關係只分析一次並快取；同一份拆分檔中
+    共用的字型、圖片只計算一次。
+    """
+
+    _REF_PATTERN = re.compile(rb"(\d+) 0 R")
+    # 指向頁面樹的鍵，走訪時略過以免把整份文件算進來
+    _PARENT_PATTERN = re.compile(rb"/Parent \d+ 0 R")
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.page_xrefs = {doc.page_xref(i) for i in range(len(doc))}
+        self._object_cache = {}
+
+    def _object_info(self, xref):
+        """回傳 (物件大小, 引用的 xref 列表)"""
+        info = self._object_cache.get(xref)
+        if info is None:
+            source = self.doc.xref_object(xref, compressed=True).encode(
+                "latin-1", "replace")
+            size = len(source) + PDF_OBJECT_OVERHEAD
+            if self.doc.xref_is_stream(xref):
+                size += self._stream_length(xref)
+            source = self._PARENT_PATTERN.sub(b"", source)
+            refs = [int(ref) for ref in self._REF_PATTERN.findall(source)]
+            info = (size, refs)
+            self._object_cache[xref] = info
+        return info
+
+    def _stream_length(self, xref):
+        """讀取串流原始長度，優先使用 /Length 避免讀取資料"""
+        value_type, value = self.doc.xref_get_key(xref, "Length")
+        if value_type == "int":
+            return int(value)
+        return len(self.doc.xref_stream_raw(xref) or b"")
+
+    def page_cost(self, page_index, seen):
+        """計算加入一頁所增加的位元組數，並把新物件記入 seen"""
+        page_xref = self.doc.page_xref(page_index)
+        cost = 0
+        stack = [page_xref]
+        while stack:
+            xref = stack.pop()
+            if xref in seen or xref <= 0 or xref >= self.doc.xref_length():
+                continue
+            # 其他頁面由它們自己計算
+            if xref in self.page_xrefs and xref != page_xref:
+                continue
+            seen.add(xref)
+            size, refs = self._object_info(xref)
+            cost += size
+            stack.extend(refs)
+        return cost
+
+
+def plan_size_parts(doc, max_bytes):
+    """依輸出大小上限規劃拆分範圍，回傳 (起始頁, 結束頁, 估計大小) 列表
+
+    單頁就超過上限時該頁自成一份。
+    """
+    estimator = PDFSizeEstimator(doc)
+    parts = []
+    start = 0
+    size = PDF_FILE_OVERHEAD
+    seen = set()
+
+    for page_index in range(len(doc)):
+        cost = estimator.page_cost(page_index, seen)
+        if page_index > start and size + cost > max_bytes:
+            # 放不下：本頁改為下一份的第一頁，重新計算其共用資源
+            parts.append((start, page_index - 1, size))
+            start = page_index
+            seen = set()
+            size = PDF_FILE_OVERHEAD + estimator.page_cost(page_index, seen)
+        else:
+            size += cost
+
+    if len(doc):
+        parts.append((start, len(doc) - 1, size))
+    return parts
+
+
+# 分隔頁偵測的渲染倍率（0.5 = 36 DPI，足以判斷墨水覆蓋率與條碼）
+SEPARATOR_RENDER_ZOOM = 0.5
+# 灰階值低於此值視為墨水
+INK_GRAY_LEVEL = 160
+# 忽略的頁邊比例（掃描陰影、打孔）
+SEPARATOR_MARGIN_RATIO = 0.05
+# 每個偵測工作處理的頁數，減少程序間往返
+SEPARATOR_CHUNK_PAGES = 32
+
+
+def rate_page_ink(page, detect_barcode=True):
+    """以低解析度灰階渲染評估頁面，回傳 (墨水覆蓋率, 是否像條碼頁)"""
+    rect = page.rect
+    margin_x = rect.width * SEPARATOR_MARGIN_RATIO
+    margin_y = rect.height * SEPARATOR_MARGIN_RATIO
+    clip = fitz.Rect(rect.x0 + margin_x, rect.y0 + margin_y,
+                     rect.x1 - margin_x, rect.y1 - margin_y)
+    pix = page.get_pixmap(matrix=fitz.Matrix(SEPARATOR_RENDER_ZOOM,
+                                             SEPARATOR_RENDER_ZOOM),
+                          colorspace=fitz.csGRAY,
+                          clip=clip,
+                          alpha=False)
+    if pix.width == 0 or pix.height == 0:
+        return 0.0, False
+
+    if not NUMPY_AVAILABLE:
+        histogram = Image.frombytes("L", (pix.width, pix.height),
+                                    pix.samples).histogram()
+        return sum(histogram[:INK_GRAY_LEVEL]) / (pix.width * pix.height), False
+
+    gray = np.frombuffer(pix.samples, dtype=np.uint8).reshape(
+        pix.height, pix.stride)[:, :pix.width]
+    ink = gray < INK_GRAY_LEVEL
+    coverage = float(ink.mean())
+    if not detect_barcode or coverage == 0.0 or coverage > 0.15:
+        return coverage, False
+    return coverage, _looks_like_barcode(ink)
+
+
+def _looks_like_barcode(ink):
+    """判斷墨水是否集中成一塊直條紋（條碼、分隔頁 patch code）"""
+    rows = np.flatnonzero(ink.any(axis=1))
+    cols = np.flatnonzero(ink.any(axis=0))
+    box = ink[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+    if box.shape[0] < 4 or box.shape[1] < 8:
+        return False
+    # 條碼的每一欄幾乎全黑或全白；文字行之間有空白，不會如此
+    profile = box.mean(axis=0)
+    solid = (profile > 0.8) | (profile < 0.2)
+    bars = profile > 0.5
+    transitions = int(np.count_nonzero(bars[1:] != bars[:-1]))
+    return bool(solid.mean() > 0.9 and bars.mean() > 0.2
+                and transitions >= 6)
+
+
+def _init_separator_worker(pdf_path, detect_barcode):
+    """分隔頁偵測工作程序初始化：每個程序只開啟一次來源 PDF"""
+    _worker_state['separator_doc'] = fitz.open(pdf_path)
+    _worker_state['detect_barcode'] = detect_barcode
+
+
+def _rate_pages_worker(page_range):
+    """分隔頁偵測工作：評估一段頁面，回傳 [(頁碼, 覆蓋率, 是否像條碼)]"""
+    doc = _worker_state['separator_doc']
+    detect_barcode = _worker_state['detect_barcode']
+    results = []
+    for page_index in range(page_range[0], page_range[1] + 1):
+        coverage, barcode = rate_page_ink(doc[page_index], detect_barcode)
+        results.append((page_index, coverage, barcode))
+    return results
+
+
+def plan_separator_parts(separators, total_pages, drop_separators=True):
+    """依分隔頁規劃拆分範圍，回傳 (起始頁, 結束頁) 列表
+
+    連續的分隔頁（例如雙面掃描時分隔紙的背面）視為同一個分隔。
+    保留分隔頁時，分隔頁併入其後的文件作為第一頁。
+    """
+    parts = []
+    start = None
+    previous_separator = False
+    for page_index in range(total_pages):
+        is_separator = page_index in separators
+        if is_separator and not previous_separator and start is not None:
+            parts.append((start, page_index - 1))
+            start = None
+        if start is None and not (is_separator and drop_separators):
+            start = page_index
+        previous_separator = is_separator
+    if start is not None:
+        parts.append((start, total_pages - 1))
+    return parts
+
+
+THUMBNAIL_MAX_WIDTH = 150  # 合併預覽縮圖的最大寬度
+
+
+def render_thumbnail(doc, page_index, max_width=THUMBNAIL_MAX_WIDTH):
+    """渲染合併預覽用的頁面縮圖"""
+    with perf_span("render"):
+        page = doc.load_page(page_index)
+        pix = page.get_pixmap(matrix=fitz.Matrix(0.25, 0.25))
+    mode = "RGBA" if pix.alpha else "RGB"
+    img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+
+    # 調整縮圖大小
+    if img.width > max_width:
+        ratio = max_width / img.width
+        new_height = int(img.height * ratio)
+        img = img.resize((max_width, new_height), Image.LANCZOS)
+    return img
+
+
+def merge_pages(pages, output_path, on_page=None):
+    """依序合併 [(文件, 頁碼)] 並存檔；每合併一頁呼叫 on_page(已完成頁數)"""
+    new_doc = fitz.open()
+    try:
+        for done, (doc, page_index) in enumerate(pages, 1):
+            with perf_span("insert"):
+                new_doc.insert_pdf(doc, from_page=page_index,
+                                   to_page=page_index)
+            if on_page:
+                on_page(done)
+        with perf_span("save"):
+            new_doc.save(output_path)
+    finally:
+        new_doc.close()
+
+
+def write_pdf_part(src_doc, from_page, to_page, output_path):
+    """以單次範圍 insert_pdf 輸出一個拆分檔
+
+    逐頁呼叫 insert_pdf 會為每頁建立新的物件對應表，導致共用的字型、
+    圖片在輸出檔中被重複複製；整段一次插入則只複製一份。
+    """
+    part_doc = fitz.open()
+    try:
+        with perf_span("insert"):
+            part_doc.insert_pdf(src_doc, from_page=from_page, to_page=to_page)
+        with perf_span("save"):
+            part_doc.save(output_path)
+    finally:
+        part_doc.close()
+
+
+# 少於此數量的工作直接在背景執行緒處理，省去啟動工作程序的成本
+PROCESS_POOL_MIN_TASKS = 8
+
+# 工作程序內的共用狀態（例如每個程序只開啟一次的來源文件）
+_worker_state = {}
+
+
+def run_process_pool(worker, tasks, initializer=None, initargs=(),
+                     on_result=None, max_workers=None,
+                     min_tasks=PROCESS_POOL_MIN_TASKS):
+    """在程序池中執行工作（需在背景執行緒呼叫）
+
+    worker 與 initializer 必須是模組層級函式。每完成一項工作即呼叫
+    on_result(task, result, error)，依完成順序回報；同時送出的工作數量
+    受限於程序數的兩倍，避免大量工作一次佔滿記憶體。工作數少於
+    min_tasks 時直接在目前程序執行，省去啟動程序的成本。工作程序中的
+    perf_span() 統計（包含 initializer 內的）會隨結果帶回並累加到目前的操作。
+    """
+    tasks = list(tasks)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    # Windows 的程序池上限為 61
+    max_workers = max(1, min(max_workers, len(tasks), 61))
+
+    if max_workers == 1 or len(tasks) < min_tasks:
+        # 工作量小：在目前程序內依序執行
+        try:
+            if initializer:
+                initializer(*initargs)
+            for task in tasks:
+                try:
+                    result, error = worker(task), None
+                except Exception as e:
+                    result, error = None, e
+                if on_result:
+                    on_result(task, result, error)
+        finally:
+            # initializer 在目前程序開啟的文件不會隨程序結束釋放，需自行關閉
+            for value in _worker_state.values():
+                if isinstance(value, fitz.Document):
+                    value.close()
+            _worker_state.clear()
+        return
+
+    # 使用 spawn 避免在已有 Tk 與背景執行緒的程序中 fork
+    context = multiprocessing.get_context("spawn")
+    if initializer:
+        # initializer 在 _run_with_perf 之外執行，另行收集其階段統計
+        initializer, initargs = _init_with_perf, (initializer, *initargs)
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=initializer,
+            initargs=initargs) as executor:
+        pending = {}
+        task_iter = iter(tasks)
+
+        def submit_next():
+            task = next(task_iter, None)
+            if task is not None:
+                pending[executor.submit(_run_with_perf, worker, task)] = task
+
+        for _ in range(max_workers * 2):
+            submit_next()
+
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                task = pending.pop(future)
+                try:
+                    result, stages, peak_memory_mb = future.result()
+                    error = None
+                    perf_stats.merge(stages, peak_memory_mb)
+                except Exception as e:
+                    result, error = None, e
+                if on_result:
+                    on_result(task, result, error)
+                submit_next()
+
+
+def _init_split_worker(pdf_path):
+    """拆分工作程序初始化：每個程序只開啟一次來源 PDF"""
+    with perf_span("open"):
+        _worker_state['split_doc'] = fitz.open(pdf_path)
+
+
+def _split_part_worker(part):
+    """拆分工作：輸出一個拆分檔並回傳耗時（秒）"""
+    start, end, output_path = part
+    started = time.perf_counter()
+    write_pdf_part(_worker_state['split_doc'], start, end, output_path)
+    return time.perf_counter() - started
+
+
 class PDFSplitDialog(tk.Toplevel):
     """PDF拆分對話框"""
 
-    def __init__(self, parent, pdf_path, colors):
+    def __init__(self, parent, pdf_path, colors, log_callback=None):
         super().__init__(parent)
         self.parent = parent
         self.pdf_path = pdf_path
         self.colors = colors
+        self.log_callback = log_callback or (lambda msg, level: None)
         self.pdf_doc = None
+        self.is_splitting = False
         # 獲取主應用程式的錯誤日誌方法
         self.main_app = None
         widget = parent
@@ -509,7 +1448,7 @@ class PDFSplitDialog(tk.Toplevel):
     def _setup_dialog(self):
         """設置對話框"""
         self.title("PDF 拆分工具")
-        self.geometry("500x400")
+        self.geometry("520x680")
         self.resizable(False, False)
         self.configure(bg=self.colors['bg_main'])
 
@@ -624,25 +1563,145 @@ class PDFSplitDialog(tk.Toplevel):
         tk.Label(single_frame, text="頁", bg=self.colors['bg_main'],
                  fg="black").pack(side="left")
 
-        # 按鈕區域
+        # 按頁碼運算式拆分
+        expr_frame = tk.Frame(options_frame, bg=self.colors['bg_main'])
+        expr_frame.pack(fill="x", padx=10, pady=5)
+
+        tk.Radiobutton(expr_frame,
+                       text="按頁碼拆分：",
+                       variable=self.split_type,
+                       value="expression",
+                       bg=self.colors['bg_main'],
+                       fg="black").pack(side="left")
+
+        self.page_expression = tk.StringVar(value="1-3,7,10-end")
+        expr_entry = tk.Entry(expr_frame,
+                              textvariable=self.page_expression,
+                              width=20)
+        expr_entry.pack(side="left", padx=5)
+
+        tk.Label(expr_frame,
+                 text="（逗號分隔，每段一個檔案）",
+                 bg=self.colors['bg_main'],
+                 fg="black").pack(side="left")
+
+        # 按書籤拆分
+        bookmark_frame = tk.Frame(options_frame, bg=self.colors['bg_main'])
+        bookmark_frame.pack(fill="x", padx=10, pady=5)
+
+        bookmark_count = len(
+            [item for item in self.pdf_doc.get_toc(simple=True) if item[0] == 1])
+        tk.Radiobutton(bookmark_frame,
+                       text=f"按第一層書籤拆分（共 {bookmark_count} 個書籤）",
+                       variable=self.split_type,
+                       value="bookmarks",
+                       state="normal" if bookmark_count else "disabled",
+                       bg=self.colors['bg_main'],
+                       fg="black").pack(side="left")
+
+        # 按檔案大小拆分
+        size_frame = tk.Frame(options_frame, bg=self.colors['bg_main'])
+        size_frame.pack(fill="x", padx=10, pady=5)
+
+        tk.Radiobutton(size_frame,
+                       text="按大小拆分：每個檔案不超過",
+                       variable=self.split_type,
+                       value="size",
+                       bg=self.colors['bg_main'],
+                       fg="black").pack(side="left")
+
+        self.max_size_mb = tk.StringVar(value="9.5")
+        size_entry = tk.Entry(size_frame,
+                              textvariable=self.max_size_mb,
+                              width=6)
+        size_entry.pack(side="left", padx=5)
+
+        tk.Label(size_frame, text="MB", bg=self.colors['bg_main'],
+                 fg="black").pack(side="left")
+
+        # 按分隔頁拆分（掃描批次中的空白頁或條碼分隔頁）
+        separator_frame = tk.Frame(options_frame, bg=self.colors['bg_main'])
+        separator_frame.pack(fill="x", padx=10, pady=(5, 0))
+
+        tk.Radiobutton(separator_frame,
+                       text="按分隔頁拆分：墨水覆蓋率低於",
+                       variable=self.split_type,
+                       value="separator",
+                       bg=self.colors['bg_main'],
+                       fg="black").pack(side="left")
+
+        self.blank_threshold = tk.StringVar(value="0.2")
+        tk.Entry(separator_frame,
+                 textvariable=self.blank_threshold,
+                 width=5).pack(side="left", padx=5)
+
+        tk.Label(separator_frame,
+                 text="% 視為空白頁",
+                 bg=self.colors['bg_main'],
+                 fg="black").pack(side="left")
+
+        separator_options = tk.Frame(options_frame, bg=self.colors['bg_main'])
+        separator_options.pack(fill="x", padx=30, pady=(0, 5))
+
+        self.drop_separators = tk.BooleanVar(value=True)
+        tk.Checkbutton(separator_options,
+                       text="移除分隔頁",
+                       variable=self.drop_separators,
+                       bg=self.colors['bg_main'],
+                       fg="black").pack(side="left")
+
+        self.detect_barcode = tk.BooleanVar(value=NUMPY_AVAILABLE)
+        tk.Checkbutton(separator_options,
+                       text="同時偵測條碼分隔頁",
+                       variable=self.detect_barcode,
+                       state="normal" if NUMPY_AVAILABLE else "disabled",
+                       bg=self.colors['bg_main'],
+                       fg="black").pack(side="left", padx=(10, 0))
+
+        # 按鈕區域（固定在底部）
         btn_frame = tk.Frame(main_frame, bg=self.colors['bg_main'])
-        btn_frame.pack(fill="x", pady=(20, 0))
+        btn_frame.pack(side="bottom", fill="x", pady=(10, 0))
 
-        tk.Button(btn_frame,
-                  text="開始拆分",
-                  command=self._start_split,
-                  bg=self.colors['success'],
-                  fg="white",
-                  font=("Microsoft YaHei", 10, "bold"),
-                  width=12).pack(side="right", padx=(5, 0))
+        # 進度顯示（在按鈕上方）
+        progress_frame = tk.Frame(main_frame, bg=self.colors['bg_main'])
+        progress_frame.pack(side="bottom", fill="x", pady=(10, 0))
 
-        tk.Button(btn_frame,
-                  text="取消",
-                  command=self.destroy,
-                  bg=self.colors['danger'],
-                  fg="white",
-                  font=("Microsoft YaHei", 10, "bold"),
-                  width=12).pack(side="right")
+        self.progress = ttk.Progressbar(progress_frame, mode='determinate')
+        self.progress.pack(fill="x")
+
+        self.progress_label = tk.Label(progress_frame,
+                                       text="",
+                                       bg=self.colors['bg_main'],
+                                       fg="black")
+        self.progress_label.pack(pady=5)
+
+        self.split_btn = tk.Button(btn_frame,
+                                   text="開始拆分",
+                                   command=self._start_split,
+                                   bg=self.colors['success'],
+                                   fg="white",
+                                   font=("Microsoft YaHei", 10, "bold"),
+                                   width=12)
+        self.split_btn.pack(side="right", padx=(5, 0))
+
+        self.cancel_btn = tk.Button(btn_frame,
+                                    text="取消",
+                                    command=self.destroy,
+                                    bg=self.colors['danger'],
+                                    fg="white",
+                                    font=("Microsoft YaHei", 10, "bold"),
+                                    width=12)
+        self.cancel_btn.pack(side="right")
+
+        # 拆分進行中不允許關閉對話框
+        self.protocol("WM_DELETE_WINDOW", self._on_close_request)
+
+    def _on_close_request(self):
+        """關閉視窗請求"""
+        if self.is_splitting:
+            messagebox.showinfo("提示", "拆分進行中，請等待完成")
+            return
+        self.destroy()
 
     def _start_split(self):
         """開始拆分PDF"""
@@ -655,7 +1714,11 @@ class PDFSplitDialog(tk.Toplevel):
                 return
 
             base_name = os.path.splitext(os.path.basename(self.pdf_path))[0]
-            success_count = 0
+
+            # 先規劃所有輸出檔 (起始頁, 結束頁, 輸出路徑)，再一次走訪來源輸出；
+            # 需要分析內容的模式改由 plan 在背景執行緒中規劃
+            parts = []
+            plan = None
 
             if split_type == "pages":
                 # 按頁數拆分
@@ -664,28 +1727,12 @@ class PDFSplitDialog(tk.Toplevel):
                     messagebox.showerror("錯誤", "每個檔案的頁數必須大於0")
                     return
 
-                current_page = 0
-                file_index = 1
-
-                while current_page < self.total_pages:
-                    end_page = min(current_page + pages_per_file - 1,
-                                   self.total_pages - 1)
-
-                    output_path = os.path.join(
-                        output_dir, f"{base_name}_part{file_index}.pdf")
-                    new_doc = fitz.open()
-
-                    for page_num in range(current_page, end_page + 1):
-                        new_doc.insert_pdf(self.pdf_doc,
-                                           from_page=page_num,
-                                           to_page=page_num)
-
-                    new_doc.save(output_path)
-                    new_doc.close()
-
-                    success_count += 1
-                    current_page = end_page + 1
-                    file_index += 1
+                for file_index, (start, end) in enumerate(
+                        plan_fixed_parts(self.total_pages, pages_per_file), 1):
+                    parts.append((start, end,
+                                  os.path.join(
+                                      output_dir,
+                                      f"{base_name}_part{file_index}.pdf")))
 
             elif split_type == "range":
                 # 按範圍拆分
@@ -697,18 +1744,10 @@ class PDFSplitDialog(tk.Toplevel):
                         "錯誤", f"頁面範圍無效，請輸入1到{self.total_pages}之間的頁數")
                     return
 
-                output_path = os.path.join(
-                    output_dir, f"{base_name}_pages{start+1}-{end+1}.pdf")
-                new_doc = fitz.open()
-
-                for page_num in range(start, end + 1):
-                    new_doc.insert_pdf(self.pdf_doc,
-                                       from_page=page_num,
-                                       to_page=page_num)
-
-                new_doc.save(output_path)
-                new_doc.close()
-                success_count = 1
+                parts.append((start, end,
+                              os.path.join(
+                                  output_dir,
+                                  f"{base_name}_pages{start+1}-{end+1}.pdf")))
 
             elif split_type == "single":
                 # 提取單頁
@@ -719,20 +1758,77 @@ class PDFSplitDialog(tk.Toplevel):
                                          f"頁數無效，請輸入1到{self.total_pages}之間的數字")
                     return
 
-                output_path = os.path.join(
-                    output_dir, f"{base_name}_page{page_num+1}.pdf")
-                new_doc = fitz.open()
-                new_doc.insert_pdf(self.pdf_doc,
-                                   from_page=page_num,
-                                   to_page=page_num)
-                new_doc.save(output_path)
-                new_doc.close()
-                success_count = 1
+                parts.append((page_num, page_num,
+                              os.path.join(output_dir,
+                                           f"{base_name}_page{page_num+1}.pdf")))
 
-            messagebox.showinfo(
-                "完成",
-                f"PDF拆分完成！\n成功創建了 {success_count} 個檔案\n儲存位置：{output_dir}")
-            self.destroy()
+            elif split_type == "expression":
+                # 按頁碼運算式拆分
+                try:
+                    ranges = parse_page_ranges(self.page_expression.get(),
+                                               self.total_pages)
+                except ValueError as e:
+                    messagebox.showerror("錯誤", f"頁碼格式無效：{str(e)}")
+                    return
+
+                for start, end in ranges:
+                    if start == end:
+                        name = f"{base_name}_page{start+1}.pdf"
+                    else:
+                        name = f"{base_name}_pages{start+1}-{end+1}.pdf"
+                    parts.append((start, end, os.path.join(output_dir, name)))
+
+            elif split_type == "bookmarks":
+                # 按第一層書籤拆分
+                for index, (start, end, title) in enumerate(
+                        plan_bookmark_parts(self.pdf_doc), 1):
+                    name = f"{base_name}_{index:02d}_{safe_file_name(title)}.pdf"
+                    parts.append((start, end, os.path.join(output_dir, name)))
+
+            elif split_type == "size":
+                # 按檔案大小拆分
+                max_mb = float(self.max_size_mb.get())
+                if max_mb <= 0:
+                    messagebox.showerror("錯誤", "檔案大小上限必須大於0")
+                    return
+                max_bytes = int(max_mb * 1024 * 1024)
+
+                def plan():
+                    return self._plan_size_split(max_bytes, output_dir,
+                                                 base_name)
+
+            elif split_type == "separator":
+                # 按分隔頁拆分
+                threshold = float(self.blank_threshold.get()) / 100
+                if threshold < 0:
+                    messagebox.showerror("錯誤", "空白頁門檻不可小於0")
+                    return
+                drop_separators = self.drop_separators.get()
+                detect_barcode = self.detect_barcode.get()
+
+                def plan():
+                    return self._plan_separator_split(threshold,
+                                                      drop_separators,
+                                                      detect_barcode,
+                                                      output_dir, base_name)
+
+            if plan is None:
+                if not parts:
+                    messagebox.showerror("錯誤", "沒有可輸出的頁面")
+                    return
+                plan = lambda: parts
+
+            # 各工作程序只開啟一次來源，並行輸出分配到的拆分檔
+            self.is_splitting = True
+            self.split_btn.config(state="disabled")
+            self.cancel_btn.config(state="disabled")
+            self.progress.config(value=0)
+            self.progress_label.config(text="正在規劃拆分...")
+
+            thread = threading.Thread(target=self._do_split,
+                                      args=(plan, output_dir))
+            thread.daemon = True
+            thread.start()
 
         except ValueError:
             messagebox.showerror("錯誤", "請輸入有效的數字")
@@ -742,6 +1838,155 @@ class PDFSplitDialog(tk.Toplevel):
                 self.main_app._log_error(error_msg, e, "PDF拆分處理")
             messagebox.showerror("錯誤", error_msg)
 
+    def _plan_size_split(self, max_bytes, output_dir, base_name):
+        """規劃按大小拆分（在背景執行緒中，使用獨立的文件物件）"""
+        parts = []
+        with fitz.open(self.pdf_path) as doc:
+            for file_index, (start, end, estimated) in enumerate(
+                    plan_size_parts(doc, max_bytes), 1):
+                if estimated > max_bytes:
+                    self.after(0, lambda p=start + 1: self.log_callback(
+                        f"第 {p} 頁本身已超過大小上限，將單獨輸出", "warning"))
+                parts.append((start, end,
+                              os.path.join(output_dir,
+                                           f"{base_name}_part{file_index}.pdf")))
+        return parts
+
+    def _plan_separator_split(self, threshold, drop_separators,
+                              detect_barcode, output_dir, base_name):
+        """偵測分隔頁並規劃拆分（在背景執行緒中，偵測分散到程序池）"""
+        total = self.total_pages
+        tasks = [(start, min(start + SEPARATOR_CHUNK_PAGES, total) - 1)
+                 for start in range(0, total, SEPARATOR_CHUNK_PAGES)]
+        separators = set()
+        errors = []
+        rated = [0]
+        started = time.perf_counter()
+
+        self.after(0, lambda: self.progress.config(maximum=max(total, 1)))
+
+        def on_result(task, results, error):
+            if error:
+                errors.append(error)
+                return
+            for page_index, coverage, barcode in results:
+                if coverage < threshold or barcode:
+                    separators.add(page_index)
+            rated[0] += len(results)
+            self.after(0, lambda n=rated[0]: self._update_detect_progress(
+                n, total))
+
+        run_process_pool(_rate_pages_worker,
+                         tasks,
+                         initializer=_init_separator_worker,
+                         initargs=(self.pdf_path, detect_barcode),
+                         on_result=on_result)
+        if errors:
+            raise errors[0]
+
+        elapsed = time.perf_counter() - started
+        self.after(0, lambda: self.log_callback(
+            f"偵測到 {len(separators)} 個分隔頁（{total} 頁，"
+            f"{total / max(elapsed, 1e-6):.0f} 頁/秒）", "info"))
+
+        return [(start, end,
+                 os.path.join(output_dir, f"{base_name}_doc{index}.pdf"))
+                for index, (start, end) in enumerate(
+                    plan_separator_parts(separators, total, drop_separators),
+                    1)]
+
+    def _update_detect_progress(self, rated, total):
+        """更新分隔頁偵測進度（主執行緒）"""
+        self.progress['value'] = rated
+        self.progress_label.config(text=f"正在偵測分隔頁 {rated} / {total} 頁...")
+
+    def _do_split(self, plan, output_dir):
+        """執行 PDF 拆分（在背景執行緒中）"""
+        started = time.perf_counter()
+        failures = []
+        completed = [0]
+
+        try:
+            parts = plan()
+            if not parts:
+                raise ValueError("沒有可輸出的頁面")
+        except Exception as e:
+            self.after(0, lambda err=e: self._split_error(err))
+            return
+
+        self.after(0, lambda: self._split_planned(len(parts)))
+
+        def on_result(part, elapsed, error):
+            completed[0] += 1
+            name = os.path.basename(part[2])
+            if error:
+                failures.append((name, error))
+            self.after(0, lambda n=completed[0], nm=name, t=elapsed, e=error:
+                       self._update_split_progress(n, len(parts), nm, t, e))
+
+        try:
+            with track_operation("split", [self.pdf_path],
+                                 pages=self.total_pages) as op:
+                run_process_pool(_split_part_worker,
+                                 parts,
+                                 initializer=_init_split_worker,
+                                 initargs=(self.pdf_path, ),
+                                 on_result=on_result)
+                op["output_paths"] = [part[2] for part in parts]
+                op["failures"] = len(failures)
+            total_time = time.perf_counter() - started
+            self.after(0, lambda: self._split_complete(
+                len(parts), failures, output_dir, total_time))
+        except Exception as e:
+            self.after(0, lambda err=e: self._split_error(err))
+
+    def _split_planned(self, total):
+        """拆分規劃完成（主執行緒）"""
+        self.progress.config(maximum=max(total, 1), value=0)
+        self.progress_label.config(text=f"正在拆分 0 / {total} 個檔案...")
+        self.log_callback(f"開始拆分為 {total} 個檔案", "info")
+
+    def _update_split_progress(self, completed, total, name, elapsed, error):
+        """更新拆分進度（主執行緒）"""
+        self.progress['value'] = completed
+        self.progress_label.config(text=f"正在拆分 {completed} / {total} 個檔案...")
+        if error:
+            self.log_callback(f"拆分失敗：{name} - {str(error)}", "error")
+        else:
+            self.log_callback(f"已輸出：{name}（{elapsed:.2f} 秒）", "success")
+
+    def _split_complete(self, total, failures, output_dir, total_time):
+        """拆分完成（主執行緒）"""
+        self.is_splitting = False
+        success_count = total - len(failures)
+        self.log_callback(
+            f"PDF 拆分完成：{success_count} / {total} 個檔案，耗時 {total_time:.2f} 秒",
+            "success" if not failures else "warning")
+
+        if failures:
+            failed_names = "\n".join(name for name, _ in failures[:10])
+            messagebox.showwarning(
+                "部分失敗",
+                f"成功創建了 {success_count} 個檔案，{len(failures)} 個失敗：\n"
+                f"{failed_names}\n儲存位置：{output_dir}")
+        else:
+            messagebox.showinfo(
+                "完成",
+                f"PDF拆分完成！\n成功創建了 {success_count} 個檔案\n儲存位置：{output_dir}")
+        self.destroy()
+
+    def _split_error(self, exception):
+        """拆分錯誤（主執行緒）"""
+        self.is_splitting = False
+        self.split_btn.config(state="normal")
+        self.cancel_btn.config(state="normal")
+        self.progress_label.config(text="")
+        error_msg = f"拆分過程中發生錯誤：{str(exception)}"
+        if self.main_app:
+            self.main_app._log_error(error_msg, exception, "PDF拆分處理")
+        self.log_callback(error_msg, "error")
+        messagebox.showerror("錯誤", error_msg)
+
     def destroy(self):
         """關閉對話框時清理資源"""
         if self.pdf_doc:
@@ -749,6 +1994,67 @@ class PDFSplitDialog(tk.Toplevel):
         super().destroy()
 
 
+# 壓縮級別：(頁面轉圖片的縮放比例, 儲存時的垃圾回收等級)
+COMPRESS_LEVELS = {
+    "light": (0.9, 1),  # 輕度壓縮
+    "medium": (0.7, 2),  # 中度壓縮
+    "heavy": (0.5, 4),  # 高度壓縮
+}
+
+
+def compress_document(src_doc, output_path, level, compress_images=True,
+                      remove_objects=True, on_page=None):
+    """壓縮文件並另存；處理每頁前呼叫 on_page(頁碼，從 1 起算)"""
+    zoom, garbage_level = COMPRESS_LEVELS[level]
+    compression_matrix = fitz.Matrix(zoom, zoom)
+
+    # 創建新的PDF文件
+    new_doc = fitz.open()
+    try:
+        # 逐頁處理
+        for page_num in range(len(src_doc)):
+            if on_page:
+                on_page(page_num + 1)
+            page = src_doc[page_num]
+
+            # 如果需要壓縮圖片，重新處理頁面
+            if compress_images:
+                # 獲取頁面作為圖片，使用壓縮矩陣
+                with perf_span("render"):
+                    pix = page.get_pixmap(matrix=compression_matrix)
+                with perf_span("encode"):
+                    img_data = pix.tobytes("jpeg", jpg_quality=70)  # 使用JPEG壓縮
+
+                # 創建新頁面
+                with perf_span("insert"):
+                    new_page = new_doc.new_page(width=page.rect.width,
+                                                height=page.rect.height)
+                    new_page.insert_image(page.rect, stream=img_data)
+            else:
+                # 直接複製頁面
+                with perf_span("insert"):
+                    new_doc.insert_pdf(src_doc,
+                                       from_page=page_num,
+                                       to_page=page_num)
+
+        # 設定儲存參數（使用通用參數）
+        save_options = {
+            "deflate": True,
+            "garbage": garbage_level if remove_objects else 0,
+            "clean": remove_objects
+        }
+
+        # 儲存壓縮後的PDF
+        with perf_span("save"):
+            try:
+                new_doc.save(output_path, **save_options)
+            except Exception:
+                # 如果參數不支援，使用最簡單的保存方式
+                new_doc.save(output_path)
+    finally:
+        new_doc.close()
+
+
 class PDFCompressDialog(tk.Toplevel):
     """PDF壓縮對話框"""
 
@@ -937,7 +2243,11 @@ class PDFCompressDialog(tk.Toplevel):
             self.update()
 
             # 執行壓縮
-            success = self._compress_pdf(output_path)
+            with track_operation("compress", [self.pdf_path],
+                                 pages=self.total_pages,
+                                 level=self.compress_level.get()) as op:
+                success = self._compress_pdf(output_path)
+                op["output_paths"] = [output_path]
 
             if success:
                 # 計算壓縮後大小
@@ -968,64 +2278,15 @@ class PDFCompressDialog(tk.Toplevel):
     def _compress_pdf(self, output_path):
         """執行PDF壓縮"""
         try:
-            level = self.compress_level.get()
-
-            # 根據壓縮級別設定參數
-            if level == "light":
-                compression_matrix = fitz.Matrix(0.9, 0.9)  # 輕度壓縮
-                garbage_level = 1
-            elif level == "medium":
-                compression_matrix = fitz.Matrix(0.7, 0.7)  # 中度壓縮
-                garbage_level = 2
-            else:  # heavy
-                compression_matrix = fitz.Matrix(0.5, 0.5)  # 高度壓縮
-                garbage_level = 4
-
-            # 創建新的PDF文件
-            new_doc = fitz.open()
-
-            # 逐頁處理
-            for page_num in range(self.total_pages):
+            def on_page(done):
                 self.progress_label.config(
-                    text=f"正在處理第 {page_num + 1} / {self.total_pages} 頁...")
-                self.update()
-
-                page = self.pdf_doc[page_num]
-
-                # 如果需要壓縮圖片，重新處理頁面
-                if self.compress_images.get():
-                    # 獲取頁面作為圖片，使用壓縮矩陣
-                    pix = page.get_pixmap(matrix=compression_matrix)
-                    img_data = pix.tobytes("jpeg", jpg_quality=70)  # 使用JPEG壓縮
-
-                    # 創建新頁面
-                    new_page = new_doc.new_page(width=page.rect.width,
-                                                height=page.rect.height)
-                    new_page.insert_image(page.rect, stream=img_data)
-                else:
-                    # 直接複製頁面
-                    new_doc.insert_pdf(self.pdf_doc,
-                                       from_page=page_num,
-                                       to_page=page_num)
-
-            # 設定儲存參數（使用通用參數）
-            save_options = {
-                "deflate": True,
-                "garbage": garbage_level if self.remove_objects.get() else 0,
-                "clean": self.remove_objects.get()
-            }
-
-            # 儲存壓縮後的PDF
-            try:
-                new_doc.save(output_path, **save_options)
-            except Exception as save_error:
-                # 如果參數不支援，使用最簡單的保存方式
-                self.progress_label.config(text="使用基本壓縮模式...")
+                    text=f"正在處理第 {done} / {self.total_pages} 頁...")
                 self.update()
-                new_doc.save(output_path)
-
-            new_doc.close()
 
+            compress_document(self.pdf_doc, output_path,
+                              self.compress_level.get(),
+                              self.compress_images.get(),
+                              self.remove_objects.get(), on_page)
             return True
 
         except Exception as e:
@@ -1041,38 +2302,458 @@ class PDFCompressDialog(tk.Toplevel):
         super().destroy()
 
 
-class PDFWatermarkDialog(tk.Toplevel):
-    """PDF 浮水印對話框"""
-
-    def __init__(self, parent, pdf_files, log_callback=None):
-        super().__init__(parent)
-        self.pdf_files = pdf_files
-        self.log_callback = log_callback or (lambda msg, level: None)
+def watermark_anchor(rect, position, ratio):
+    """計算浮水印錨點；ratio 為錨點與頁邊的距離比例"""
+    if position == "center":
+        return rect.width / 2, rect.height / 2
+    if position == "top-left":
+        return rect.width * ratio, rect.height * ratio
+    if position == "top-right":
+        return rect.width * (1 - ratio), rect.height * ratio
+    if position == "bottom-left":
+        return rect.width * ratio, rect.height * (1 - ratio)
+    # bottom-right
+    return rect.width * (1 - ratio), rect.height * (1 - ratio)
+
+
+WATERMARK_TEXT_COLOR = (0.5, 0.5, 0.5)  # 中等灰色
+WATERMARK_CUSTOM_FONT = "WMFont"  # 自訂字型檔在 PDF 中的資源名稱
+
+# 可選字型：顯示名稱 -> PyMuPDF 內建字型名稱
+WATERMARK_FONTS = {
+    "Helvetica": "helv",
+    "Times": "tiro",
+    "Courier": "cour",
+    "中文（繁體）": "china-t",
+    "中文（簡體）": "china-s",
+    "日文": "japan",
+    "韓文": "korea"
+}
 
-        self.title("PDF 浮水印")
-        self.geometry("500x600")
-        self.resizable(False, False)
-        self.configure(bg='#F8F9FA')
+_font_cache = {}
+_text_width_cache = {}
 
-        # 置中顯示
-        self.transient(parent)
-        self.grab_set()
 
-        # 色系配置
-        self.colors = {
-            'bg_main': '#F5F5F0',
-            'bg_panel': '#FDFDF2',
-            'primary': '#4D6FAC',
-            'success': '#4A6741',
-            'warning': '#D4A574',
-            'danger': '#B22222',
-            'fg_primary': '#2C2C2C',
-            'border': '#D8D8D8'
-        }
+def get_watermark_font(font_file):
+    """取得字型檔的 Font 物件（每個程序每個字型只載入一次）"""
+    font = _font_cache.get(font_file)
+    if font is None:
+        font = fitz.Font(fontfile=font_file)
+        _font_cache[font_file] = font
+    return font
 
-        self.setup_ui()
 
-    def setup_ui(self):
+def measure_watermark_text(text, font_size, font_name, font_file=None):
+    """計算文字寬度，依 (字型, 大小, 文字) 快取"""
+    key = (font_name, font_file, font_size, text)
+    width = _text_width_cache.get(key)
+    if width is None:
+        if font_file:
+            width = get_watermark_font(font_file).text_length(
+                text, fontsize=font_size)
+        else:
+            width = fitz.get_text_length(text, fontname=font_name,
+                                         fontsize=font_size)
+        _text_width_cache[key] = width
+    return width
+
+
+def _insert_text_styled(shape, point, text, style):
+    """插入指定字型、顏色與透明度的文字"""
+    shape.insert_text(point,
+                      text,
+                      fontsize=style['font_size'],
+                      fontname=style['font_name'],
+                      fontfile=style['font_file'],
+                      color=WATERMARK_TEXT_COLOR,
+                      fill_opacity=style['opacity'],
+                      morph=style['morph'])
+
+
+def _insert_text_opaque(shape, point, text, style):
+    """插入不透明文字（不支援 fill_opacity 參數時）"""
+    shape.insert_text(point,
+                      text,
+                      fontsize=style['font_size'],
+                      fontname=style['font_name'],
+                      fontfile=style['font_file'],
+                      color=WATERMARK_TEXT_COLOR,
+                      morph=style['morph'])
+
+
+def _insert_text_plain(shape, point, text, style):
+    """以預設字型與顏色插入文字"""
+    shape.insert_text(point,
+                      text,
+                      fontsize=style['font_size'],
+                      morph=style['morph'])
+
+
+_text_insert_strategy = None
+
+
+def detect_text_insert_strategy():
+    """偵測可用的文字插入方式
+
+    依序在暫存頁上試用各種方式，只在每個程序第一次呼叫時偵測，
+    之後直接回傳快取結果；全部失敗時才把各方式的錯誤寫入日誌。
+    """
+    global _text_insert_strategy
+    if _text_insert_strategy is None:
+        errors = []
+        probe = fitz.open()
+        try:
+            shape = probe.new_page().new_shape()
+            style = {
+                'font_size': 12,
+                'font_name': "helv",
+                'font_file': None,
+                'opacity': 0.5,
+                'morph': (fitz.Point(10, 20), fitz.Matrix(45))
+            }
+            for strategy in (_insert_text_styled, _insert_text_opaque,
+                             _insert_text_plain):
+                try:
+                    strategy(shape, (10, 20), "Watermark", style)
+                except Exception as e:
+                    errors.append(f"{strategy.__name__}: {e}")
+                    continue
+                _text_insert_strategy = strategy
+                break
+        finally:
+            probe.close()
+
+        if _text_insert_strategy is None:
+            logging.getLogger('PDFToolkit').error(
+                "所有文字插入方法都失敗：%s", "; ".join(errors))
+            raise Exception("無法插入文字浮水印")
+    return _text_insert_strategy
+
+
+class WatermarkStamper:
+    """浮水印蓋印器
+
+    浮水印只建立一次：文字浮水印依頁面尺寸各繪製一張範本頁（含旋轉、
+    平鋪與透明度），再以 show_pdf_page 蓋到每一頁，同尺寸頁面共用同一個
+    Form XObject。每種尺寸的範本各自存放在一份文件中：來源文件一旦被
+    show_pdf_page 引用，之後再新增頁面會超出目標文件的物件對應表；
+    圖片浮水印只讀取一次檔案，每份文件插入一次後以 xref 重複引用。
+    settings 為純資料字典，可傳給工作程序。
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self._templates = {}
+        self._image_data = None
+
+    def apply(self, input_path, output_path):
+        """為一個 PDF 檔案加上浮水印並另存"""
+        with perf_span("open"):
+            doc = fitz.open(input_path)
+        try:
+            with perf_span("insert"):
+                self.stamp_document(doc)
+            with perf_span("save"):
+                doc.save(output_path)
+        finally:
+            doc.close()
+
+    def stamp_document(self, doc):
+        """為文件的每一頁加上浮水印"""
+        if self.settings['type'] == "text":
+            for page in doc:
+                self.stamp_text_page(page)
+        else:
+            image_data = self._load_image()
+            if not image_data:
+                return
+            image_xref = 0
+            for page in doc:
+                image_xref = self._stamp_image(page, image_data, image_xref)
+
+    def stamp_text_page(self, page):
+        """蓋上文字浮水印，回傳同尺寸頁面共用的 Form XObject 的 xref"""
+        rect = page.rect
+        return page.show_pdf_page(rect, self._text_template(rect), 0)
+
+    def text_content(self, rect):
+        """取得指定頁面尺寸的文字浮水印內容串流"""
+        return self._text_template(rect)[0].read_contents()
+
+    def prepare_text_templates(self, doc):
+        """先為文件中每種頁面尺寸建立範本，回傳尺寸數量"""
+        for page in doc:
+            self._text_template(page.rect)
+        return len(self._templates)
+
+    def _text_template(self, rect):
+        """取得與頁面同尺寸的範本文件（每種尺寸只繪製一次，建立後不再修改）"""
+        key = (round(rect.width, 1), round(rect.height, 1))
+        template = self._templates.get(key)
+        if template is None:
+            template = fitz.open()
+            self._draw_text(template.new_page(width=rect.width,
+                                              height=rect.height))
+            self._templates[key] = template
+        return template
+
+    def _text_style(self):
+        """整理文字樣式設定"""
+        settings = self.settings
+        font_file = settings.get('font_file')
+        return {
+            'font_size': settings['font_size'],
+            'font_name': WATERMARK_CUSTOM_FONT if font_file else
+            settings.get('font_name', "helv"),
+            'font_file': font_file,
+            'opacity': settings.get('opacity', 1.0),
+            'morph': None
+        }
+
+    def _text_centers(self, rect, width, font_size):
+        """計算每個文字的中心點"""
+        if not self.settings.get('tiled'):
+            x, y = watermark_anchor(rect, self.settings['position'], 0.15)
+            position = self.settings['position']
+            # 左側位置由錨點向右排，右側位置排到錨點為止
+            if position.endswith("left"):
+                x += width / 2
+            elif position.endswith("right"):
+                x -= width / 2
+            return [(x, y)]
+
+        # 平鋪：在旋轉後的座標系中排成交錯網格，涵蓋整頁對角線範圍
+        step_x = width + font_size * 3
+        step_y = font_size * 4
+        center_x, center_y = rect.width / 2, rect.height / 2
+        reach = math.hypot(rect.width, rect.height) / 2
+        angle = math.radians(self.settings.get('rotation', 0))
+        cos_a, sin_a = math.cos(angle), math.sin(angle)
+        margin = width / 2 + font_size
+
+        centers = []
+        rows = int(reach // step_y) + 1
+        cols = int(reach // step_x) + 2
+        for row in range(-rows, rows + 1):
+            offset = step_x / 2 if row % 2 else 0
+            for col in range(-cols, cols + 1):
+                u = col * step_x + offset
+                v = row * step_y
+                # 正角度為逆時針方向（頁面座標 y 軸向下）
+                x = center_x + u * cos_a + v * sin_a
+                y = center_y - u * sin_a + v * cos_a
+                if (-margin < x < rect.width + margin
+                        and -margin < y < rect.height + margin):
+                    centers.append((x, y))
+        return centers
+
+    def _draw_text(self, page):
+        """在範本頁繪製文字浮水印（所有文字共用一個 Shape）"""
+        text = self.settings['text']
+        style = self._text_style()
+        font_size = style['font_size']
+        width = measure_watermark_text(text, font_size, style['font_name'],
+                                       style['font_file'])
+        rotation = self.settings.get('rotation', 0)
+
+        shape = page.new_shape()
+        for x, y in self._text_centers(page.rect, width, font_size):
+            # 以文字中心為旋轉軸；基線下移約 0.35 倍字高使文字垂直置中
+            if rotation:
+                style['morph'] = (fitz.Point(x, y), fitz.Matrix(rotation))
+            self._insert_text(shape, (x - width / 2, y + font_size * 0.35),
+                              text, style)
+        shape.commit()
+
+    def _insert_text(self, shape, point, text, style):
+        """在範本頁插入文字"""
+        insert = detect_text_insert_strategy()
+        try:
+            insert(shape, point, text, style)
+        except Exception as e:
+            logging.getLogger('PDFToolkit').error(
+                "文字浮水印插入失敗（%s）：%s", insert.__name__, e)
+            raise Exception("無法插入文字浮水印") from e
+
+    def _load_image(self):
+        """讀取浮水印圖片（每個蓋印器只讀取一次）"""
+        if self._image_data is None:
+            image_path = self.settings.get('image_path')
+            if not image_path:
+                return None
+            with open(image_path, 'rb') as f:
+                self._image_data = f.read()
+        return self._image_data
+
+    def _stamp_image(self, page, image_data, image_xref):
+        """蓋上圖片浮水印；同一文件內第一次插入後改用 xref 引用"""
+        rect = page.rect
+
+        # 計算圖片位置和大小
+        img_size = min(rect.width, rect.height) * 0.3  # 圖片大小為頁面的30%
+        x, y = watermark_anchor(rect, self.settings['position'], 0.05)
+        position = self.settings['position']
+        if position == "center":
+            x -= img_size / 2
+            y -= img_size / 2
+        else:
+            if position.endswith("right"):
+                x -= img_size
+            if position.startswith("bottom"):
+                y -= img_size
+
+        img_rect = fitz.Rect(x, y, x + img_size, y + img_size)
+
+        # 插入圖片
+        if image_xref:
+            page.insert_image(img_rect, xref=image_xref, overlay=True)
+            return image_xref
+        return page.insert_image(img_rect, stream=image_data, overlay=True)
+
+
+def _init_watermark_worker(settings):
+    """浮水印工作程序初始化：每個程序只建立一次浮水印"""
+    _worker_state['stamper'] = WatermarkStamper(settings)
+
+
+def _watermark_file_worker(job):
+    """浮水印工作：處理一個檔案並回傳耗時（秒）"""
+    input_path, output_path = job
+    started = time.perf_counter()
+    _worker_state['stamper'].apply(input_path, output_path)
+    return time.perf_counter() - started
+
+
+RECIPIENT_PLACEHOLDER = "-"  # 預備檔中的佔位文字
+
+
+def load_recipients(csv_path):
+    """讀取收件者 CSV，第一列為欄位名稱；略過空白列"""
+    for encoding in ("utf-8-sig", "cp950"):
+        try:
+            with open(csv_path, newline='', encoding=encoding) as f:
+                reader = csv.DictReader(f)
+                recipients = [{(k or "").strip(): (v or "").strip()
+                               for k, v in row.items()}
+                              for row in reader if any(
+                                  (v or "").strip() for v in row.values())]
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        raise ValueError("無法辨識 CSV 檔案的編碼（請存成 UTF-8）")
+
+    if not recipients:
+        raise ValueError("CSV 檔案中沒有收件者")
+    return recipients
+
+
+def format_recipient_text(template, recipient):
+    """以收件者欄位代入浮水印文字，例如「{name} {date}」"""
+    fields = {'date': datetime.now().strftime("%Y-%m-%d")}
+    fields.update(recipient)
+    try:
+        return template.format_map(fields)
+    except KeyError as e:
+        raise ValueError(f"CSV 中沒有欄位：{e.args[0]}")
+    except (ValueError, IndexError) as e:
+        raise ValueError(f"浮水印文字格式錯誤：{str(e)}")
+
+
+def prepare_recipient_base(settings, source_path, prepared_path):
+    """建立個人化浮水印的預備檔
+
+    以佔位文字蓋上浮水印後存檔；同尺寸頁面共用一個 Form XObject，
+    回傳這些 XObject 的 [(寬, 高, xref)]，之後每位收件者只需替換其內容
+    串流，不必重新解析來源或逐頁處理。
+    """
+    stamper = WatermarkStamper(
+        dict(settings, text=RECIPIENT_PLACEHOLDER, tiled=False))
+    targets = {}
+    with perf_span("open"):
+        doc = fitz.open(source_path)
+    try:
+        with perf_span("insert"):
+            # 所有尺寸的範本都建立完成後才開始蓋印
+            stamper.prepare_text_templates(doc)
+            for page in doc:
+                xref = stamper.stamp_text_page(page)
+                key = (round(page.rect.width, 1), round(page.rect.height, 1))
+                targets.setdefault(key,
+                                   (page.rect.width, page.rect.height, xref))
+        # 不做垃圾回收，保持 xref 編號不變
+        with perf_span("save"):
+            doc.save(prepared_path)
+    finally:
+        doc.close()
+    return list(targets.values())
+
+
+def write_recipient_copy(stamper, prepared_path, targets, output_path):
+    """複製預備檔並只替換浮水印內容，以增量方式存檔"""
+    with perf_span("open"):
+        shutil.copyfile(prepared_path, output_path)
+        doc = fitz.open(output_path)
+    try:
+        with perf_span("insert"):
+            for width, height, xref in targets:
+                doc.update_stream(
+                    xref, stamper.text_content(fitz.Rect(0, 0, width, height)))
+        with perf_span("save"):
+            doc.saveIncr()
+    finally:
+        doc.close()
+
+
+def _init_recipient_worker(settings):
+    """個人化浮水印工作程序初始化"""
+    _worker_state['recipient_settings'] = settings
+
+
+def _recipient_worker(job):
+    """個人化浮水印工作：輸出一位收件者的檔案並回傳耗時（秒）"""
+    prepared_path, targets, text, output_path = job
+    started = time.perf_counter()
+    stamper = WatermarkStamper(
+        dict(_worker_state['recipient_settings'], text=text))
+    write_recipient_copy(stamper, prepared_path, targets, output_path)
+    return time.perf_counter() - started
+
+
+class PDFWatermarkDialog(tk.Toplevel):
+    """PDF 浮水印對話框"""
+
+    def __init__(self, parent, pdf_files, log_callback=None):
+        super().__init__(parent)
+        self.pdf_files = pdf_files
+        self.log_callback = log_callback or (lambda msg, level: None)
+        self.is_running = False
+
+        self.title("PDF 浮水印")
+        self.geometry("520x820")
+        self.resizable(False, False)
+        self.configure(bg='#F8F9FA')
+
+        # 置中顯示
+        self.transient(parent)
+        self.grab_set()
+
+        # 色系配置
+        self.colors = {
+            'bg_main': '#F5F5F0',
+            'bg_panel': '#FDFDF2',
+            'primary': '#4D6FAC',
+            'success': '#4A6741',
+            'warning': '#D4A574',
+            'danger': '#B22222',
+            'fg_primary': '#2C2C2C',
+            'border': '#D8D8D8'
+        }
+
+        self.setup_ui()
+        self.protocol("WM_DELETE_WINDOW", self._on_close_request)
+
+    def setup_ui(self):
         """設置使用者介面"""
         main_frame = tk.Frame(self, bg=self.colors['bg_main'])
         main_frame.pack(fill="both", expand=True, padx=20, pady=20)
@@ -1175,6 +2856,82 @@ class PDFWatermarkDialog(tk.Toplevel):
         self.opacity.set(0.3)
         self.opacity.pack(side="right", fill="x", expand=True, padx=(10, 0))
 
+        # 字型
+        font_frame = tk.Frame(self.text_frame, bg=self.colors['bg_panel'])
+        font_frame.pack(fill="x", padx=10, pady=(0, 10))
+
+        tk.Label(font_frame,
+                 text="字型：",
+                 bg=self.colors['bg_panel'],
+                 fg="black",
+                 font=("Microsoft YaHei", 10)).pack(side="left")
+
+        self.font_choice = tk.StringVar(value="Helvetica")
+        self.font_combo = ttk.Combobox(font_frame,
+                                       textvariable=self.font_choice,
+                                       values=list(WATERMARK_FONTS),
+                                       state="readonly",
+                                       width=14)
+        self.font_combo.pack(side="left", padx=(10, 0))
+
+        tk.Button(font_frame,
+                  text="字型檔...",
+                  command=self.select_font_file,
+                  bg=self.colors['primary'],
+                  fg="white",
+                  font=("Microsoft YaHei", 9)).pack(side="left", padx=(10, 0))
+
+        self.font_file = None
+
+        # 收件者清單（個人化浮水印）
+        recipient_frame = tk.Frame(self.text_frame, bg=self.colors['bg_panel'])
+        recipient_frame.pack(fill="x", padx=10, pady=(0, 10))
+
+        tk.Button(recipient_frame,
+                  text="收件者 CSV...",
+                  command=self.select_recipients,
+                  bg=self.colors['primary'],
+                  fg="white",
+                  font=("Microsoft YaHei", 9)).pack(side="left")
+
+        self.recipients_label = tk.Label(
+            recipient_frame,
+            text="未選擇（文字可用 {name}、{date} 等欄位）",
+            bg=self.colors['bg_panel'],
+            fg=self.colors['fg_primary'],
+            font=("Microsoft YaHei", 9))
+        self.recipients_label.pack(side="left", padx=(10, 0))
+
+        self.recipients = None
+
+        # 旋轉角度與平鋪
+        rotation_frame = tk.Frame(self.text_frame, bg=self.colors['bg_panel'])
+        rotation_frame.pack(fill="x", padx=10, pady=(0, 10))
+
+        tk.Label(rotation_frame,
+                 text="旋轉角度：",
+                 bg=self.colors['bg_panel'],
+                 fg="black",
+                 font=("Microsoft YaHei", 10)).pack(side="left")
+
+        self.rotation = tk.Scale(rotation_frame,
+                                 from_=-90,
+                                 to=90,
+                                 resolution=15,
+                                 orient="horizontal",
+                                 bg=self.colors['bg_panel'])
+        self.rotation.set(0)
+        self.rotation.pack(side="left", fill="x", expand=True, padx=(10, 0))
+
+        self.tiled = tk.BooleanVar(value=False)
+        tk.Checkbutton(rotation_frame,
+                       text="平鋪整頁",
+                       variable=self.tiled,
+                       bg=self.colors['bg_panel'],
+                       fg="black",
+                       font=("Microsoft YaHei", 10)).pack(side="left",
+                                                          padx=(10, 0))
+
         # 圖片浮水印設定
         self.image_frame = tk.LabelFrame(main_frame,
                                          text="圖片設定",
@@ -1233,25 +2990,40 @@ class PDFWatermarkDialog(tk.Toplevel):
                                                               padx=10,
                                                               pady=2)
 
+        # 進度顯示
+        progress_frame = tk.Frame(main_frame, bg=self.colors['bg_main'])
+        progress_frame.pack(fill="x", pady=(15, 0))
+
+        self.progress = ttk.Progressbar(progress_frame, mode='determinate')
+        self.progress.pack(fill="x")
+
+        self.progress_label = tk.Label(progress_frame,
+                                       text="",
+                                       bg=self.colors['bg_main'],
+                                       fg="black")
+        self.progress_label.pack(pady=5)
+
         # 按鈕區域
         btn_frame = tk.Frame(main_frame, bg=self.colors['bg_main'])
-        btn_frame.pack(fill="x", pady=(20, 0))
-
-        tk.Button(btn_frame,
-                  text="開始加浮水印",
-                  command=self.start_watermark,
-                  bg=self.colors['success'],
-                  fg="white",
-                  font=("Microsoft YaHei", 12, "bold"),
-                  width=15).pack(side="right", padx=(5, 0))
+        btn_frame.pack(fill="x", pady=(5, 0))
 
-        tk.Button(btn_frame,
-                  text="取消",
-                  command=self.destroy,
-                  bg=self.colors['danger'],
-                  fg="white",
-                  font=("Microsoft YaHei", 12, "bold"),
-                  width=10).pack(side="right")
+        self.start_btn = tk.Button(btn_frame,
+                                   text="開始加浮水印",
+                                   command=self.start_watermark,
+                                   bg=self.colors['success'],
+                                   fg="white",
+                                   font=("Microsoft YaHei", 12, "bold"),
+                                   width=15)
+        self.start_btn.pack(side="right", padx=(5, 0))
+
+        self.cancel_btn = tk.Button(btn_frame,
+                                    text="取消",
+                                    command=self._on_close_request,
+                                    bg=self.colors['danger'],
+                                    fg="white",
+                                    font=("Microsoft YaHei", 12, "bold"),
+                                    width=10)
+        self.cancel_btn.pack(side="right")
 
         # 初始化顯示
         self.on_type_change()
@@ -1281,6 +3053,46 @@ class PDFWatermarkDialog(tk.Toplevel):
             self.image_path = None
             self.image_path_label.config(text="未選擇圖片")
 
+    def select_font_file(self):
+        """選擇浮水印字型檔"""
+        file_path = filedialog.askopenfilename(
+            title="選擇字型檔",
+            filetypes=[("字型檔案", "*.ttf *.otf *.ttc"), ("所有檔案", "*.*")])
+
+        if not file_path:
+            return
+        try:
+            get_watermark_font(file_path)
+        except Exception as e:
+            messagebox.showerror("錯誤", f"無法載入字型檔：{str(e)}")
+            return
+        self.font_file = file_path
+        font_name = os.path.basename(file_path)
+        self.font_combo.config(values=list(WATERMARK_FONTS) + [font_name])
+        self.font_choice.set(font_name)
+
+    def select_recipients(self):
+        """選擇收件者 CSV；再次選擇時可取消個人化模式"""
+        if self.recipients:
+            if messagebox.askyesno("收件者清單", "要清除目前的收件者清單嗎？"):
+                self.recipients = None
+                self.recipients_label.config(
+                    text="未選擇（文字可用 {name}、{date} 等欄位）")
+            return
+
+        file_path = filedialog.askopenfilename(
+            title="選擇收件者 CSV",
+            filetypes=[("CSV 檔案", "*.csv"), ("所有檔案", "*.*")])
+        if not file_path:
+            return
+        try:
+            self.recipients = load_recipients(file_path)
+        except Exception as e:
+            messagebox.showerror("錯誤", f"無法讀取收件者清單：{str(e)}")
+            return
+        self.recipients_label.config(
+            text=f"{os.path.basename(file_path)}（{len(self.recipients)} 位）")
+
     def start_watermark(self):
         """開始加浮水印"""
         try:
@@ -1303,175 +3115,218 @@ class PDFWatermarkDialog(tk.Toplevel):
             if not output_dir:
                 return
 
-            success_count = 0
-
-            for pdf_file in self.pdf_files:
-                try:
-                    input_path = pdf_file['path']
-                    base_name = os.path.splitext(
-                        os.path.basename(input_path))[0]
-                    output_path = os.path.join(output_dir,
-                                               f"{base_name}_watermarked.pdf")
+            settings = self.get_watermark_settings()
+            personalized = (self.recipients
+                            and self.watermark_type.get() == "text")
 
-                    self.apply_watermark(input_path, output_path)
-                    success_count += 1
-                    self.log_callback(f"已完成：{os.path.basename(output_path)}",
-                                      "success")
+            # 同名檔案加上序號，避免平行輸出互相覆蓋
+            jobs = []
+            used_names = set()
 
-                except Exception as e:
-                    error_msg = f"處理 {pdf_file['name']} 失敗：{str(e)}"
-                    self.log_callback(error_msg, "error")
-                    print(f"詳細錯誤：{e}")  # 調試用
+            def unique_path(stem):
+                file_name = f"{stem}.pdf"
+                counter = 2
+                while file_name.lower() in used_names:
+                    file_name = f"{stem}_{counter}.pdf"
+                    counter += 1
+                used_names.add(file_name.lower())
+                return os.path.join(output_dir, file_name)
 
-            if success_count > 0:
-                messagebox.showinfo(
-                    "完成", f"成功為 {success_count} 個檔案加上浮水印！\n"
-                    f"檔案已儲存到：{output_dir}")
-                self.destroy()
-            else:
-                messagebox.showerror("錯誤", "沒有檔案成功加上浮水印")
+            for pdf_file in self.pdf_files:
+                input_path = pdf_file['path']
+                base_name = os.path.splitext(os.path.basename(input_path))[0]
+                if not personalized:
+                    jobs.append(
+                        (input_path, unique_path(f"{base_name}_watermarked")))
+                    continue
+                # 每位收件者一個檔案，以第一個欄位命名
+                for recipient in self.recipients:
+                    text = format_recipient_text(settings['text'], recipient)
+                    label = safe_file_name(next(iter(recipient.values()))
+                                           or "recipient")
+                    jobs.append((input_path, text,
+                                 unique_path(f"{base_name}_{label}")))
+
+            self.is_running = True
+            self.start_btn.config(state="disabled")
+            self.cancel_btn.config(state="disabled")
+            self.progress.config(maximum=len(jobs), value=0)
+            self.progress_label.config(text=f"正在處理 0 / {len(jobs)} 個檔案...")
+
+            target = (self._do_recipient_watermark
+                      if personalized else self._do_watermark)
+            threading.Thread(target=target,
+                             args=(jobs, settings, output_dir),
+                             daemon=True).start()
 
         except Exception as e:
             messagebox.showerror("錯誤", f"加浮水印失敗：{str(e)}")
 
-    def apply_watermark(self, input_path, output_path):
-        """應用浮水印到 PDF"""
-        doc = fitz.open(input_path)
-
-        try:
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-
-                if self.watermark_type.get() == "text":
-                    self.add_text_watermark(page)
-                else:
-                    self.add_image_watermark(page)
-
-            doc.save(output_path)
-
-        finally:
-            doc.close()
-
-    def add_text_watermark(self, page):
-        """添加文字浮水印"""
-        text = self.watermark_text.get().strip()
-        font_size = self.font_size.get()
-        opacity = self.opacity.get()
-        position = self.position.get()
+    def _do_watermark(self, jobs, settings, output_dir):
+        """平行處理所有檔案（在背景執行緒中）"""
+        started = time.perf_counter()
+        failures = []
+        completed = [0]
 
-        # 獲取頁面尺寸
-        rect = page.rect
+        def on_result(job, elapsed, error):
+            completed[0] += 1
+            name = os.path.basename(job[0])
+            if error:
+                failures.append((name, error))
+            self.after(0, lambda n=completed[0], nm=name, t=elapsed, e=error:
+                       self._update_watermark_progress(n, len(jobs), nm, t, e))
 
-        # 計算位置
-        if position == "center":
-            x = rect.width / 2
-            y = rect.height / 2
-        elif position == "top-left":
-            x = rect.width * 0.15
-            y = rect.height * 0.15
-        elif position == "top-right":
-            x = rect.width * 0.85
-            y = rect.height * 0.15
-        elif position == "bottom-left":
-            x = rect.width * 0.15
-            y = rect.height * 0.85
-        else:  # bottom-right
-            x = rect.width * 0.85
-            y = rect.height * 0.85
-
-        # 使用更簡單的顏色設定 - 直接使用數字
-        gray_value = 0.5  # 中等灰色
-        color = (gray_value, gray_value, gray_value)
-
-        # 嘗試多種 API 方式
-        success = False
-
-        # 方法1：基本的insert_text
         try:
-            page.insert_text(
-                (x, y),  # 使用元組而不是fitz.Point
-                text,
-                fontsize=font_size,
-                color=color)
-            success = True
-            print("方法1成功：基本insert_text")
-
-        except Exception as e1:
-            print(f"方法1失敗：{e1}")
-
-            # 方法2：使用fitz.Point
-            try:
-                page.insert_text(fitz.Point(x, y),
-                                 text,
-                                 fontsize=font_size,
-                                 color=color)
-                success = True
-                print("方法2成功：使用fitz.Point")
-
-            except Exception as e2:
-                print(f"方法2失敗：{e2}")
-
-                # 方法3：最簡單的版本
-                try:
-                    page.insert_text(fitz.Point(x, y),
-                                     text,
-                                     fontsize=font_size)
-                    success = True
-                    print("方法3成功：最簡單版本")
+            with self._track_watermark("watermark", jobs) as op:
+                # 每個檔案都是獨立的工作，兩個以上就值得使用程序池
+                run_process_pool(_watermark_file_worker,
+                                 jobs,
+                                 initializer=_init_watermark_worker,
+                                 initargs=(settings, ),
+                                 on_result=on_result,
+                                 min_tasks=2)
+                op["failures"] = len(failures)
+            total_time = time.perf_counter() - started
+            self.after(0, lambda: self._watermark_complete(
+                len(jobs), failures, output_dir, total_time))
+        except Exception as e:
+            self.after(0, lambda err=e: self._watermark_error(err))
 
-                except Exception as e3:
-                    print(f"方法3失敗：{e3}")
+    def _do_recipient_watermark(self, jobs, settings, output_dir):
+        """為每位收件者產生個人化檔案（在背景執行緒中）
 
-                    # 方法4：使用drawString (如果可用)
+        每個來源只解析並蓋印一次成為預備檔，工作程序只替換浮水印文字。
+        """
+        started = time.perf_counter()
+        failures = []
+        completed = [0]
+
+        def on_result(name, elapsed, error):
+            completed[0] += 1
+            if error:
+                failures.append((name, error))
+            self.after(0, lambda n=completed[0], nm=name, t=elapsed, e=error:
+                       self._update_watermark_progress(n, len(jobs), nm, t, e))
+
+        temp_dir = tempfile.mkdtemp(prefix="pdf_watermark_")
+        try:
+            with self._track_watermark("recipient_watermark", jobs) as op:
+                pool_jobs = []
+                sources = list(dict.fromkeys(job[0] for job in jobs))
+                for index, source_path in enumerate(sources):
+                    self.after(0, lambda n=os.path.basename(source_path):
+                               self.progress_label.config(
+                                   text=f"正在準備來源：{n}..."))
+                    source_jobs = [job for job in jobs
+                                   if job[0] == source_path]
+                    prepared_path = os.path.join(temp_dir,
+                                                 f"source_{index}.pdf")
                     try:
-                        # 創建一個形狀來繪製文字
-                        shape = page.new_shape()
-                        shape.insert_text(fitz.Point(x, y),
-                                          text,
-                                          fontsize=font_size,
-                                          color=color)
-                        shape.commit()
-                        success = True
-                        print("方法4成功：使用shape")
-
-                    except Exception as e4:
-                        print(f"方法4失敗：{e4}")
-                        print("所有文字插入方法都失敗")
-
-        if not success:
-            raise Exception("無法插入文字浮水印")
+                        targets = prepare_recipient_base(settings, source_path,
+                                                         prepared_path)
+                    except Exception as e:
+                        for _, _, output_path in source_jobs:
+                            on_result(os.path.basename(output_path), None, e)
+                        continue
+                    pool_jobs.extend(
+                        (prepared_path, targets, text, output_path)
+                        for _, text, output_path in source_jobs)
+
+                run_process_pool(
+                    _recipient_worker,
+                    pool_jobs,
+                    initializer=_init_recipient_worker,
+                    initargs=(settings, ),
+                    on_result=lambda job, elapsed, error: on_result(
+                        os.path.basename(job[3]), elapsed, error),
+                    min_tasks=2)
+                op["failures"] = len(failures)
+            total_time = time.perf_counter() - started
+            self.after(0, lambda: self._watermark_complete(
+                len(jobs), failures, output_dir, total_time))
+        except Exception as e:
+            self.after(0, lambda err=e: self._watermark_error(err))
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _track_watermark(self, operation, jobs):
+        """記錄浮水印操作；每個工作的第一項為來源、最後一項為輸出檔"""
+        page_counts = {f['path']: f.get('pages', 0) for f in self.pdf_files}
+        sources = list(dict.fromkeys(job[0] for job in jobs))
+        return track_operation(
+            operation, sources,
+            pages=sum(page_counts.get(job[0], 0) for job in jobs),
+            output_paths=[job[-1] for job in jobs])
+
+    def _update_watermark_progress(self, completed, total, name, elapsed,
+                                   error):
+        """更新浮水印進度（主執行緒）"""
+        self.progress['value'] = completed
+        self.progress_label.config(text=f"正在處理 {completed} / {total} 個檔案...")
+        if error:
+            self.log_callback(f"處理 {name} 失敗：{str(error)}", "error")
+        else:
+            self.log_callback(f"已完成：{name}（{elapsed:.2f} 秒）", "success")
 
-    def add_image_watermark(self, page):
-        """添加圖片浮水印"""
-        if not hasattr(self, 'image_path') or not self.image_path:
-            return
+    def _watermark_complete(self, total, failures, output_dir, total_time):
+        """浮水印處理完成（主執行緒）"""
+        self.is_running = False
+        success_count = total - len(failures)
+        self.log_callback(
+            f"浮水印完成：{success_count} / {total} 個檔案，耗時 {total_time:.2f} 秒",
+            "success" if not failures else "warning")
 
-        position = self.position.get()
-        rect = page.rect
+        if success_count == 0:
+            self.start_btn.config(state="normal")
+            self.cancel_btn.config(state="normal")
+            self.progress_label.config(text="")
+            messagebox.showerror("錯誤", "沒有檔案成功加上浮水印")
+            return
 
-        # 計算圖片位置和大小
-        img_size = min(rect.width, rect.height) * 0.3  # 圖片大小為頁面的30%
+        if failures:
+            failed_names = "\n".join(name for name, _ in failures[:10])
+            messagebox.showwarning(
+                "部分失敗",
+                f"成功為 {success_count} 個檔案加上浮水印，{len(failures)} 個失敗：\n"
+                f"{failed_names}\n檔案已儲存到：{output_dir}")
+        else:
+            messagebox.showinfo(
+                "完成", f"成功為 {success_count} 個檔案加上浮水印！\n"
+                f"檔案已儲存到：{output_dir}")
+        self.destroy()
 
-        if position == "center":
-            x = (rect.width - img_size) / 2
-            y = (rect.height - img_size) / 2
-        elif position == "top-left":
-            x = rect.width * 0.05
-            y = rect.height * 0.05
-        elif position == "top-right":
-            x = rect.width * 0.95 - img_size
-            y = rect.height * 0.05
-        elif position == "bottom-left":
-            x = rect.width * 0.05
-            y = rect.height * 0.95 - img_size
-        else:  # bottom-right
-            x = rect.width * 0.95 - img_size
-            y = rect.height * 0.95 - img_size
+    def _watermark_error(self, exception):
+        """浮水印處理錯誤（主執行緒）"""
+        self.is_running = False
+        self.start_btn.config(state="normal")
+        self.cancel_btn.config(state="normal")
+        self.progress_label.config(text="")
+        error_msg = f"加浮水印失敗：{str(exception)}"
+        self.log_callback(error_msg, "error")
+        messagebox.showerror("錯誤", error_msg)
 
-        img_rect = fitz.Rect(x, y, x + img_size, y + img_size)
+    def _on_close_request(self):
+        """關閉視窗請求"""
+        if self.is_running:
+            messagebox.showinfo("提示", "浮水印處理中，請等待完成")
+            return
+        self.destroy()
 
-        # 插入圖片
-        page.insert_image(img_rect, filename=self.image_path, overlay=True)
+    def get_watermark_settings(self):
+        """收集目前的浮水印設定（純資料，可傳給其他程序）"""
+        choice_is_builtin = self.font_choice.get() in WATERMARK_FONTS
+        return {
+            'type': self.watermark_type.get(),
+            'text': self.watermark_text.get().strip(),
+            'font_size': self.font_size.get(),
+            'opacity': self.opacity.get(),
+            'position': self.position.get(),
+            'image_path': getattr(self, 'image_path', None),
+            'font_name': WATERMARK_FONTS.get(self.font_choice.get(), "helv"),
+            'font_file': None if choice_is_builtin else self.font_file,
+            'rotation': self.rotation.get(),
+            'tiled': self.tiled.get()
+        }
 
 
 class AboutDialog(tk.Toplevel):
@@ -1662,6 +3517,99 @@ class AboutDialog(tk.Toplevel):
                   width=15).pack(pady=10)
 
 
+PERF_REFRESH_INTERVAL = 1000  # 效能面板自動更新間隔（毫秒）
+
+
+class PerformanceDialog(tk.Toplevel):
+    """效能面板：顯示各階段耗時統計與最近的操作"""
+
+    def __init__(self, parent, colors, log_callback=None):
+        super().__init__(parent)
+        self.title("效能統計")
+        self.geometry("760x520")
+        self.configure(bg=colors['bg_main'])
+        self.colors = colors
+        self.log_callback = log_callback or (lambda msg, level="info": None)
+        self._refresh_job = None
+
+        self.profiling = tk.BooleanVar(value=perf_stats.profiling)
+        self._setup_ui()
+        self._refresh()
+
+    def _setup_ui(self):
+        main_frame = tk.Frame(self, bg=self.colors['bg_main'])
+        main_frame.pack(fill="both", expand=True, padx=15, pady=15)
+
+        tk.Checkbutton(main_frame,
+                       text="擷取 cProfile 與 tracemalloc（處理會變慢，結果存於 logs 目錄）",
+                       variable=self.profiling,
+                       command=self._toggle_profiling,
+                       bg=self.colors['bg_main'],
+                       font=("Microsoft YaHei", 10)).pack(anchor="w")
+
+        self.report_text = tk.Text(main_frame,
+                                   wrap=tk.NONE,
+                                   bg=self.colors['bg_panel'],
+                                   fg=self.colors['fg_primary'],
+                                   font=("Consolas", 10))
+        self.report_text.pack(fill="both", expand=True, pady=10)
+
+        btn_frame = tk.Frame(main_frame, bg=self.colors['bg_main'])
+        btn_frame.pack(fill="x")
+        tk.Button(btn_frame,
+                  text="清除統計",
+                  command=self._clear,
+                  font=("Microsoft YaHei", 10),
+                  width=10).pack(side="left")
+        tk.Button(btn_frame,
+                  text="儲存報告",
+                  command=self._save_report,
+                  font=("Microsoft YaHei", 10),
+                  width=10).pack(side="left", padx=(5, 0))
+        tk.Button(btn_frame,
+                  text="關閉",
+                  command=self.destroy,
+                  font=("Microsoft YaHei", 10),
+                  width=10).pack(side="right")
+
+    def _refresh(self):
+        """更新報告內容（保留目前的捲動位置）"""
+        position = self.report_text.yview()[0]
+        self.report_text.delete("1.0", tk.END)
+        self.report_text.insert("1.0", perf_stats.report())
+        self.report_text.yview_moveto(position)
+        self._refresh_job = self.after(PERF_REFRESH_INTERVAL, self._refresh)
+
+    def _toggle_profiling(self):
+        perf_stats.profiling = self.profiling.get()
+        state = "啟用" if perf_stats.profiling else "停用"
+        self.log_callback(f"效能分析擷取已{state}", "info")
+
+    def _clear(self):
+        perf_stats.clear()
+
+    def _save_report(self):
+        path = filedialog.asksaveasfilename(
+            title="儲存效能報告",
+            defaultextension=".txt",
+            initialfile=f"perf_report_{datetime.now():%Y%m%d_%H%M%S}.txt",
+            filetypes=[("文字檔", "*.txt")])
+        if not path:
+            return
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(perf_stats.report())
+            self.log_callback(f"效能報告已儲存：{path}", "success")
+        except Exception as e:
+            messagebox.showerror("錯誤", f"儲存效能報告失敗：{str(e)}")
+
+    def destroy(self):
+        if self._refresh_job:
+            self.after_cancel(self._refresh_job)
+            self._refresh_job = None
+        super().destroy()
+
+
 class PDFToolkit:
     """PDF 工具包 - 提供PDF合併、簽名、拆分、壓縮等全方位功能"""
 
@@ -1671,6 +3619,11 @@ class PDFToolkit:
         
         # 程式關閉標誌
         self._is_closing = False
+        self._perf_dialog = None
+
+        # 日誌佇列：任何執行緒都可寫入，由主執行緒定時批次顯示
+        self._log_queue = queue.SimpleQueue()
+        self._log_line_count = 0
 
         # 初始化智能多源更新檢查器
         self.update_checker = UpdateChecker(APP_VERSION, UPDATE_SOURCES)
@@ -1755,6 +3708,13 @@ class PDFToolkit:
             print(f"日誌設置失敗：{e}")
             self.error_logger = None
             self.log_file_path = None
+            return
+
+        # 操作紀錄（JSON Lines），供分析耗時與資源用量
+        try:
+            operation_log.open(log_dir)
+        except Exception as e:
+            print(f"操作紀錄設置失敗：{e}")
 
     def _log_error(self, error_message, exception=None, context=""):
         """記錄錯誤到日誌檔案"""
@@ -1775,16 +3735,7 @@ class PDFToolkit:
                 tb_str = traceback.format_exc()
                 log_message += f" | 堆疊追蹤:\n{tb_str}"
 
-            # 直接寫入檔案（更可靠的方法）
-            if self.log_file_path:
-                try:
-                    with open(self.log_file_path, 'a', encoding='utf-8') as f:
-                        f.write(log_message + "\n\n")
-                        f.flush()
-                except Exception as file_error:
-                    print(f"無法寫入日誌檔案：{file_error}")
-
-            # 使用logging系統（作為備份）
+            # 由常駐的 FileHandler 寫入，不必每次重新開啟檔案
             if self.error_logger:
                 self.error_logger.error(log_message)
 
@@ -2239,6 +4190,19 @@ class PDFToolkit:
                               pady=2)
         about_btn.pack(side="right", padx=(0, 5))
 
+        # 效能統計按鈕
+        perf_btn = tk.Button(btn_container,
+                             text="📊 效能",
+                             command=self._show_performance,
+                             bg=self.colors['fg_secondary'],
+                             fg="white",
+                             font=("Microsoft YaHei", 9),
+                             relief="flat",
+                             cursor="hand2",
+                             padx=10,
+                             pady=2)
+        perf_btn.pack(side="right", padx=(0, 5))
+
         # 檢查更新按鈕
         update_btn = tk.Button(btn_container,
                                text="🔄 檢查更新",
@@ -2301,6 +4265,7 @@ class PDFToolkit:
 
         log_scrollbar.pack(side="right", fill="y")
         self.log_text.pack(side="left", fill="both", expand=True)
+        self.root.after(LOG_FLUSH_INTERVAL, self._flush_log_queue)
 
         # 初始化日誌
         self._log_message("系統啟動完成", "info")
@@ -2380,7 +4345,8 @@ class PDFToolkit:
 
     def _add_pdf_file(self, file_path):
         """添加 PDF 檔案"""
-        doc = fitz.open(file_path)
+        with perf_span("open"):
+            doc = fitz.open(file_path)
 
         # 添加到檔案列表
         self.pdf_files.append({
@@ -2440,18 +4406,7 @@ class PDFToolkit:
             file_name = page_info['file_name']
 
             # 生成縮圖
-            page = doc.load_page(page_index)
-            pix = page.get_pixmap(matrix=fitz.Matrix(0.25, 0.25))
-            mode = "RGBA" if pix.alpha else "RGB"
-            img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
-
-            # 調整縮圖大小
-            max_width = 150
-            if img.width > max_width:
-                ratio = max_width / img.width
-                new_height = int(img.height * ratio)
-                img = img.resize((max_width, new_height), Image.LANCZOS)
-
+            img = render_thumbnail(doc, page_index)
             thumb_image = ImageTk.PhotoImage(img)
 
             # 建立縮圖容器
@@ -2626,23 +4581,20 @@ class PDFToolkit:
         """執行 PDF 合併（在背景執行緒中）"""
         try:
             self._log_message("開始合併 PDF 檔案", "info")
+            total = len(self.pages)
 
-            new_doc = fitz.open()
-
-            for i, page_info in enumerate(self.pages):
-                doc = page_info['doc']
-                page_index = page_info['page_index']
-                new_doc.insert_pdf(doc,
-                                   from_page=page_index,
-                                   to_page=page_index)
-
+            def on_page(done):
                 # 更新進度（在主執行緒中）
-                progress = (i + 1) / len(self.pages) * 100
+                progress = done / total * 100
                 self.root.after(
                     0, lambda p=progress: self._update_merge_progress(p))
 
-            new_doc.save(save_path)
-            new_doc.close()
+            with track_operation("merge",
+                                 [f['path'] for f in self.pdf_files],
+                                 pages=total,
+                                 output_paths=[save_path]):
+                merge_pages([(p['doc'], p['page_index']) for p in self.pages],
+                            save_path, on_page)
 
             # 合併完成
             self.root.after(0, lambda: self._merge_complete(save_path))
@@ -2767,6 +4719,10 @@ class PDFToolkit:
                 selected_index[0] = -1
                 selection_window.destroy()
 
+            def on_batch():
+                selected_index[0] = -2
+                selection_window.destroy()
+
             tk.Button(btn_frame,
                       text="確定",
                       command=on_select,
@@ -2783,11 +4739,22 @@ class PDFToolkit:
                       font=("Microsoft YaHei", 10),
                       width=10).pack(side="right", padx=5)
 
+            tk.Button(btn_frame,
+                      text="批次套用版面",
+                      command=on_batch,
+                      bg=self.colors['info'],
+                      fg="white",
+                      font=("Microsoft YaHei", 10),
+                      width=12).pack(side="left", padx=5)
+
             # 等待視窗關閉
             self.root.wait_window(selection_window)
 
             if selected_index[0] == -1:
                 return  # 用戶取消
+            if selected_index[0] == -2:
+                self._batch_sign()
+                return
 
             selected_file = self.pdf_files[selected_index[0]]
 
@@ -2802,6 +4769,18 @@ class PDFToolkit:
             self._log_message(error_msg, "error")
             messagebox.showerror("錯誤", error_msg)
 
+    def _batch_sign(self):
+        """以儲存的簽名版面批次簽署所有檔案"""
+        try:
+            batch_dialog = BatchSignDialog(self.root, self.pdf_files,
+                                           self._log_message)
+            self.root.wait_window(batch_dialog)
+        except Exception as e:
+            error_msg = f"開啟批次簽名失敗：{str(e)}"
+            self._log_error(error_msg, e, "批次簽名功能")
+            self._log_message(error_msg, "error")
+            messagebox.showerror("錯誤", error_msg)
+
     def _open_signature_editor_with_hint(self, action_type):
         """開啟簽名編輯器並提示用戶操作"""
         if action_type == "upload":
@@ -2828,7 +4807,8 @@ class PDFToolkit:
 
         pdf_path = self.pdf_files[0]['path']
         try:
-            split_dialog = PDFSplitDialog(self.root, pdf_path, self.colors)
+            split_dialog = PDFSplitDialog(self.root, pdf_path, self.colors,
+                                          self._log_message)
             # 檢查對話框是否成功創建
             if split_dialog.winfo_exists():
                 self.root.wait_window(split_dialog)
@@ -2870,6 +4850,14 @@ class PDFToolkit:
             self._log_error(error_msg, e, "關於對話框")
             messagebox.showerror("錯誤", error_msg)
 
+    def _show_performance(self):
+        """顯示效能統計面板（非強制回應，可邊處理邊觀察）"""
+        if self._perf_dialog and self._perf_dialog.winfo_exists():
+            self._perf_dialog.lift()
+            return
+        self._perf_dialog = PerformanceDialog(self.root, self.colors,
+                                              self._log_message)
+
     def _add_watermark(self):
         """加浮水印"""
         if not self.pdf_files:
@@ -2888,11 +4876,15 @@ class PDFToolkit:
             messagebox.showerror("錯誤", error_msg)
 
     def _log_message(self, message, level="info"):
-        """記錄日誌訊息"""
+        """記錄日誌訊息（低於日誌等級門檻的訊息直接略過）"""
+        if not log_enabled(level):
+            return
+
         timestamp = datetime.now().strftime("[%H:%M:%S]")
 
         # 設定日誌前綴和顏色
         prefixes = {
+            "debug": "[除錯]",
             "info": "[資訊]",
             "success": "[成功]",
             "warning": "[警告]",
@@ -2900,16 +4892,36 @@ class PDFToolkit:
         }
 
         prefix = prefixes.get(level, "[資訊]")
-        log_entry = f"{timestamp} {prefix} {message}\n"
 
-        # 插入日誌
-        self.log_text.insert(tk.END, log_entry)
-        self.log_text.see(tk.END)
+        # 放入佇列即返回，可在背景執行緒安全呼叫
+        self._log_queue.put(f"{timestamp} {prefix} {message}\n")
 
-        # 限制日誌長度
-        lines = self.log_text.get(1.0, tk.END).count('\n')
-        if lines > 500:
-            self.log_text.delete(1.0, "50.0")
+    def _flush_log_queue(self):
+        """將佇列中的日誌一次插入面板（主執行緒定時執行）"""
+        if self._is_closing:
+            return
+
+        entries = []
+        try:
+            while True:
+                entries.append(self._log_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        if entries:
+            text = "".join(entries)
+            self.log_text.insert(tk.END, text)
+            self._log_line_count += text.count('\n')
+
+            # 限制日誌長度：超過上限時一次刪除較舊的行
+            if self._log_line_count > LOG_MAX_LINES:
+                excess = (self._log_line_count - LOG_MAX_LINES +
+                          LOG_TRIM_LINES)
+                self.log_text.delete("1.0", f"{excess + 1}.0")
+                self._log_line_count -= excess
+            self.log_text.see(tk.END)
+
+        self.root.after(LOG_FLUSH_INTERVAL, self._flush_log_queue)
 
     def run(self):
         """啟動應用程式"""
@@ -2921,6 +4933,10 @@ class PDFToolkit:
             self._log_message(f"錯誤日誌檔案：{self.log_file_path}", "info")
         else:
             self._log_message("錯誤日誌系統未啟用", "warning")
+        if operation_log.path:
+            self._log_message(f"操作紀錄檔案：{operation_log.path}", "info")
+        if perf_stats.profiling:
+            self._log_message("效能分析擷取已啟用（cProfile 與 tracemalloc）", "info")
 
         # 檢查是否首次啟動，詢問創建捷徑
         self._log_message("將在 1 秒後執行首次設定檢查", "info")
@@ -2936,6 +4952,7 @@ class PDFToolkit:
         """程式關閉處理"""
         self._is_closing = True
         self.root.destroy()
+        operation_log.close()
 
     def _check_for_updates(self):
         """手動檢查更新"""
@@ -3511,6 +5528,500 @@ class PDFToolkit:
                   width=15).pack(pady=10)
 
 
+PAGE_CACHE_SIZE = 12  # 簽名編輯器保留的頁面圖片數量
+PREFETCH_DISTANCE = 1  # 預先渲染前後各幾頁
+DRAFT_RENDER_RATIO = 0.5  # 快速預覽的解析度比例
+PROGRESSIVE_RENDER_THRESHOLD = 0.1  # 渲染超過此秒數的頁面先顯示快速預覽
+TILE_SIZE = 512  # 放大檢視時每個圖塊的像素邊長
+TILE_CACHE_SIZE = 48  # 保留的圖塊數量
+MAX_PAGE_SCALE = 8.0  # 最大顯示比例（800%）
+ZOOM_STEP = 1.25  # 每次縮放的倍率
+SIGNATURE_BITMAP_CACHE_SIZE = 4  # 每個簽名保留的顯示圖片數量
+SIGNATURE_REFINE_DELAY = 300  # 停止縮放多少毫秒後以高品質重新產生簽名圖片
+
+
+def render_page_image(doc, page_index, scale, clip=None):
+    """以縮放矩陣直接將頁面渲染為 PIL 圖片；clip 為頁面座標的渲染範圍"""
+    page = doc.load_page(page_index)
+    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale),
+                          clip=fitz.Rect(clip) if clip else None,
+                          alpha=False)
+    return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+
+def _render_page_worker(request):
+    """渲染工作程序：回傳 (圖片, 耗時秒數)
+
+    source 為 (檔案路徑, 版本)；來源檔案改變或原檔被覆寫時重新開啟。
+    """
+    source, page_index, scale, clip = request
+    started = time.perf_counter()
+    if _worker_state.get('render_source') != source:
+        old_doc = _worker_state.pop('render_doc', None)
+        if old_doc:
+            old_doc.close()
+        _worker_state['render_doc'] = fitz.open(source[0])
+        _worker_state['render_source'] = source
+    img = render_page_image(_worker_state['render_doc'], page_index, scale,
+                            clip)
+    return img, time.perf_counter() - started
+
+
+class PageImageCache:
+    """頁面圖片 LRU 快取（可跨執行緒使用）
+
+    以 (頁碼, 縮放比例) 為鍵；超過容量時淘汰最久未使用的頁面。
+    """
+
+    def __init__(self, max_items=PAGE_CACHE_SIZE):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(page_index, scale):
+        """建立快取鍵；縮放比例取到小數第三位避免浮點誤差"""
+        return page_index, round(scale, 3)
+
+    def get(self, key):
+        with self._lock:
+            img = self._items.get(key)
+            if img is not None:
+                self._items.move_to_end(key)
+            return img
+
+    def put(self, key, img):
+        with self._lock:
+            self._items[key] = img
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class PageRenderer:
+    """背景頁面渲染服務
+
+    PyMuPDF 渲染時不會釋放 GIL，在執行緒中渲染仍會卡住介面，因此實際
+    渲染交給一個獨立的工作程序；本程序只用一個背景執行緒依優先順序排程
+    並等待結果。過期的請求（wanted() 回傳 False）直接略過，整頁渲染的
+    結果放入快取。無法啟動工作程序時改在背景執行緒渲染。
+    """
+
+    def __init__(self, pdf_path, cache):
+        self.cache = cache
+        self.pdf_path = pdf_path
+        self.revision = 0
+        self._requests = queue.PriorityQueue()
+        self._sequence = 0
+        self._sequence_lock = threading.Lock()
+        self._executor = None
+        self._process_failed = False
+        self._fallback_doc = None
+        self._fallback_source = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def render(self, page_index, scale, clip=None, callback=None,
+               wanted=None, priority=1, on_error=None):
+        """排入渲染請求；完成後在背景執行緒呼叫 callback(圖片, 耗時)，
+        渲染失敗時改呼叫 on_error(例外)"""
+        with self._sequence_lock:
+            self._sequence += 1
+            sequence = self._sequence
+        self._requests.put((priority, sequence,
+                            (page_index, scale, clip, callback, wanted,
+                             on_error)))
+
+    def prefetch(self, current_index, page_count, scale, wanted):
+        """預先渲染 current_index 前後的頁面"""
+        for distance in range(1, PREFETCH_DISTANCE + 1):
+            for index in (current_index + distance, current_index - distance):
+                if 0 <= index < page_count:
+                    self.render(index,
+                                scale,
+                                wanted=lambda i=index: wanted(i),
+                                priority=2)
+
+    def reopen(self, pdf_path):
+        """來源檔案改變（例如另存或覆寫原檔）後重新開啟"""
+        self.pdf_path = pdf_path
+        self.revision += 1
+
+    def close(self):
+        self._requests.put((-1, 0, None))
+        if self._executor:
+            self._executor.shutdown(wait=False)
+
+    def _run(self):
+        while True:
+            _, _, request = self._requests.get()
+            if request is None:
+                break
+            page_index, scale, clip, callback, wanted, on_error = request
+            if wanted and not wanted():
+                continue
+
+            key = PageImageCache.key(page_index, scale)
+            img = None if clip else self.cache.get(key)
+            elapsed = 0.0
+            if img is None:
+                try:
+                    img, elapsed = self._render(
+                        ((self.pdf_path, self.revision), page_index, scale,
+                         clip))
+                except Exception as e:
+                    # 背景渲染失敗不影響顯示，介面執行緒會自行渲染
+                    if on_error:
+                        on_error(e)
+                    continue
+                perf_stats.add("render", elapsed)
+                if not clip:
+                    self.cache.put(key, img)
+            if callback:
+                callback(img, elapsed)
+
+        if self._fallback_doc:
+            self._fallback_doc.close()
+
+    def _render(self, request):
+        """交給渲染程序執行"""
+        if not self._process_failed:
+            try:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=1,
+                        mp_context=multiprocessing.get_context("spawn"))
+                return self._executor.submit(_render_page_worker,
+                                             request).result()
+            except (concurrent.futures.process.BrokenProcessPool,
+                    OSError):
+                self._process_failed = True
+                self._executor = None
+
+        source, page_index, scale, clip = request
+        started = time.perf_counter()
+        if self._fallback_source != source:
+            if self._fallback_doc:
+                self._fallback_doc.close()
+            self._fallback_doc = fitz.open(source[0])
+            self._fallback_source = source
+        img = render_page_image(self._fallback_doc, page_index, scale, clip)
+        return img, time.perf_counter() - started
+
+
+def insert_signature_image(page, rect, img, image_xrefs):
+    """以記憶體中的 PNG 插入簽名圖片
+
+    image_xrefs 記錄已嵌入的圖片；內容相同的簽名只嵌入一次，
+    之後在任何頁面都以 xref 重複引用。
+    """
+    key = (img.mode, img.size, hashlib.sha1(img.tobytes()).hexdigest())
+    xref = image_xrefs.get(key)
+    if xref:
+        with perf_span("insert"):
+            page.insert_image(rect, xref=xref, keep_proportion=True,
+                              overlay=True)
+        return xref
+
+    with perf_span("encode"):
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+    with perf_span("insert"):
+        xref = page.insert_image(rect,
+                                 stream=buffer.getvalue(),
+                                 keep_proportion=True,
+                                 overlay=True)
+    image_xrefs[key] = xref
+    return xref
+
+
+HANDWRITING_STROKE_WIDTH = 4  # 手寫筆畫寬度（畫布像素）
+HANDWRITING_TOLERANCE = 0.6  # 簡化筆畫時允許的偏差（畫布像素）
+HANDWRITING_MAX_SIZE = (250, 120)  # 手寫簽名加入頁面時的最大尺寸（點）
+
+
+def _round_strokes(strokes):
+    return [[(round(x, 2), round(y, 2)) for x, y in stroke]
+            for stroke in strokes]
+
+
+def smooth_stroke(points, passes=2):
+    """以 Chaikin 切角法平滑筆畫，保留起點與終點"""
+    for _ in range(passes):
+        if len(points) < 3:
+            break
+        smoothed = [points[0]]
+        for (x1, y1), (x2, y2) in zip(points, points[1:]):
+            smoothed.append((0.75 * x1 + 0.25 * x2, 0.75 * y1 + 0.25 * y2))
+            smoothed.append((0.25 * x1 + 0.75 * x2, 0.25 * y1 + 0.75 * y2))
+        smoothed.append(points[-1])
+        points = smoothed
+    return points
+
+
+def simplify_stroke(points, tolerance=HANDWRITING_TOLERANCE):
+    """以 Ramer-Douglas-Peucker 演算法移除偏差小於 tolerance 的點"""
+    if len(points) < 3:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    ranges = [(0, len(points) - 1)]
+    while ranges:
+        first, last = ranges.pop()
+        (x1, y1), (x2, y2) = points[first], points[last]
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+        max_distance, farthest = 0.0, None
+        for i in range(first + 1, last):
+            px, py = points[i]
+            if length:
+                distance = abs(dy * px - dx * py + x2 * y1 - y2 * x1) / length
+            else:
+                distance = math.hypot(px - x1, py - y1)
+            if distance > max_distance:
+                max_distance, farthest = distance, i
+        if farthest is not None and max_distance > tolerance:
+            keep[farthest] = True
+            ranges.append((first, farthest))
+            ranges.append((farthest, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def render_handwriting(strokes, size, width):
+    """將筆畫畫成預覽圖片（以四倍解析度繪製再縮小，邊緣較平滑）"""
+    factor = 4
+    image = Image.new("RGBA", (size[0] * factor, size[1] * factor),
+                      (255, 255, 255, 0))
+    draw = ImageDraw.Draw(image)
+    line_width = max(round(width * factor), 1)
+    radius = line_width / 2
+    for stroke in strokes:
+        points = [(x * factor, y * factor) for x, y in stroke]
+        if len(points) > 1:
+            draw.line(points, fill="black", width=line_width, joint="curve")
+        for x, y in (points[0], points[-1]):
+            draw.ellipse((x - radius, y - radius, x + radius, y + radius),
+                         fill="black")
+    return image.resize(size, Image.LANCZOS)
+
+
+def prepare_handwriting(strokes, width=HANDWRITING_STROKE_WIDTH,
+                        max_size=HANDWRITING_MAX_SIZE):
+    """平滑並簡化手寫筆畫，移到左上角並限制尺寸
+
+    回傳 (筆畫, 筆畫寬度, 預覽圖片)；座標以預覽圖片的像素（即 PDF 點）為單位。
+    """
+    strokes = [simplify_stroke(smooth_stroke(stroke)) for stroke in strokes
+               if stroke]
+    if not strokes:
+        return [], width, None
+
+    half = width / 2
+    left = min(x for stroke in strokes for x, _ in stroke) - half
+    top = min(y for stroke in strokes for _, y in stroke) - half
+    right = max(x for stroke in strokes for x, _ in stroke) + half
+    bottom = max(y for stroke in strokes for _, y in stroke) + half
+    ratio = min(1.0, max_size[0] / (right - left), max_size[1] / (bottom - top))
+
+    strokes = _round_strokes([[((x - left) * ratio, (y - top) * ratio)
+                               for x, y in stroke] for stroke in strokes])
+    size = (max(round((right - left) * ratio), 1),
+            max(round((bottom - top) * ratio), 1))
+    width *= ratio
+    return strokes, width, render_handwriting(strokes, size, width)
+
+
+def draw_handwriting(page, rect, strokes, width, scale=1.0):
+    """以向量路徑將手寫筆畫畫到頁面上；所有筆畫在同一次 commit 寫入"""
+    shape = page.new_shape()
+    for stroke in strokes:
+        points = [fitz.Point(rect.x0 + x * scale, rect.y0 + y * scale)
+                  for x, y in stroke]
+        if len(points) == 1:
+            points.append(points[0])  # 單點以圓形線帽畫成圓點
+        shape.draw_polyline(points)
+    shape.finish(color=(0, 0, 0),
+                 width=width * scale,
+                 lineCap=1,
+                 lineJoin=1,
+                 closePath=False)
+    shape.commit(overlay=True)
+
+
+SIGNATURE_LAYOUT_VERSION = 1
+
+
+def signature_page_selector(page_index, page_count):
+    """將頁碼轉為版面的頁面選擇：最後一頁記為 "last"，其餘為 1 起算的頁碼"""
+    if page_count > 1 and page_index == page_count - 1:
+        return "last"
+    return page_index + 1
+
+
+def resolve_page_selector(selector, page_count):
+    """頁面選擇（"first"、"last"、"all" 或 1 起算頁碼，負數由末頁倒數）對應的頁碼列表"""
+    if selector == "all":
+        return list(range(page_count))
+    if selector == "first":
+        selector = 1
+    elif selector == "last":
+        selector = -1
+    index = int(selector)
+    index = index - 1 if index > 0 else page_count + index
+    return [index] if 0 <= index < page_count else []
+
+
+def save_signature_layout(layout_path, signatures, page_count):
+    """將簽名編輯器中的簽名版面存成 JSON（圖片以 PNG base64 內嵌，相同圖片只存一份）"""
+    images = []
+    image_indexes = {}
+    entries = []
+    for signature in signatures:
+        entry = {
+            'page': signature_page_selector(signature['page'], page_count),
+            'x': round(signature['x'], 2),
+            'y': round(signature['y'], 2),
+            'scale_factor': signature.get('scale_factor', 1.0),
+            'type': signature.get('type', 'image')
+        }
+        if signature.get('strokes'):
+            # 手寫簽名以向量筆畫儲存
+            entry.update(strokes=_round_strokes(signature['strokes']),
+                         stroke_width=round(signature['stroke_width'], 3),
+                         size=list(signature['original_image'].size))
+            entries.append(entry)
+            continue
+
+        img = signature['original_image']
+        key = (img.mode, img.size, hashlib.sha1(img.tobytes()).hexdigest())
+        if key not in image_indexes:
+            buffer = io.BytesIO()
+            img.save(buffer, format="PNG")
+            images.append(base64.b64encode(buffer.getvalue()).decode('ascii'))
+            image_indexes[key] = len(images) - 1
+        entry['image'] = image_indexes[key]
+        entries.append(entry)
+
+    with open(layout_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': SIGNATURE_LAYOUT_VERSION,
+            'images': images,
+            'signatures': entries
+        }, f, ensure_ascii=False, indent=2)
+
+
+def load_signature_layout(layout_path):
+    """讀取簽名版面，準備好可直接插入的 PNG
+
+    每張圖片只解碼一次，依縮放係數縮放後重新編碼；回傳的資料可傳給工作程序，
+    整批檔案共用，不必每個檔案重新處理圖片。
+    """
+    with open(layout_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != SIGNATURE_LAYOUT_VERSION:
+        raise ValueError(f"不支援的版面檔版本：{data.get('version')}")
+
+    decoded = [Image.open(io.BytesIO(base64.b64decode(encoded)))
+               for encoded in data['images']]
+    pngs = []
+    png_indexes = {}
+    stamps = []
+    for entry in data['signatures']:
+        scale_factor = entry.get('scale_factor', 1.0)
+        if 'strokes' in entry:
+            width, height = entry['size']
+            stamps.append({
+                'strokes': entry['strokes'],
+                'stroke_width': entry['stroke_width'],
+                'scale': scale_factor,
+                'page': entry['page'],
+                'rect': (entry['x'], entry['y'],
+                         entry['x'] + max(int(width * scale_factor), 1),
+                         entry['y'] + max(int(height * scale_factor), 1))
+            })
+            continue
+
+        img = decoded[entry['image']]
+        size = (max(int(img.width * scale_factor), 1),
+                max(int(img.height * scale_factor), 1))
+        key = (entry['image'], size)
+        if key not in png_indexes:
+            scaled = img if size == img.size else img.resize(
+                size, Image.LANCZOS)
+            buffer = io.BytesIO()
+            scaled.save(buffer, format="PNG")
+            pngs.append(buffer.getvalue())
+            png_indexes[key] = len(pngs) - 1
+        stamps.append({
+            'image': png_indexes[key],
+            'page': entry['page'],
+            'rect': (entry['x'], entry['y'], entry['x'] + size[0],
+                     entry['y'] + size[1])
+        })
+    return {'images': pngs, 'stamps': stamps}
+
+
+def apply_signature_layout(doc, layout):
+    """將版面套用到文件，回傳插入的簽名數量；超出頁面的簽名會移回頁面內"""
+    image_xrefs = {}
+    count = 0
+    for stamp in layout['stamps']:
+        for page_index in resolve_page_selector(stamp['page'], len(doc)):
+            page = doc[page_index]
+            rect = fitz.Rect(stamp['rect'])
+            page_rect = page.rect
+            dx = max(min(page_rect.x1 - rect.x1, 0), page_rect.x0 - rect.x0)
+            dy = max(min(page_rect.y1 - rect.y1, 0), page_rect.y0 - rect.y0)
+            rect = fitz.Rect(rect.x0 + dx, rect.y0 + dy, rect.x1 + dx,
+                             rect.y1 + dy)
+            count += 1
+            if 'strokes' in stamp:
+                draw_handwriting(page, rect, stamp['strokes'],
+                                 stamp['stroke_width'], stamp['scale'])
+                continue
+            xref = image_xrefs.get(stamp['image'])
+            if xref:
+                page.insert_image(rect,
+                                  xref=xref,
+                                  keep_proportion=True,
+                                  overlay=True)
+            else:
+                image_xrefs[stamp['image']] = page.insert_image(
+                    rect,
+                    stream=layout['images'][stamp['image']],
+                    keep_proportion=True,
+                    overlay=True)
+    return count
+
+
+def _init_batch_sign_worker(layout):
+    _worker_state['layout'] = layout
+
+
+def _batch_sign_worker(job):
+    """為單一檔案套用簽名版面，回傳 (簽名數量, 耗時秒數)"""
+    input_path, output_path = job
+    started = time.perf_counter()
+    with perf_span("open"):
+        doc = fitz.open(input_path)
+    try:
+        with perf_span("insert"):
+            count = apply_signature_layout(doc, _worker_state['layout'])
+        with perf_span("save"):
+            doc.save(output_path)
+    finally:
+        doc.close()
+    return count, time.perf_counter() - started
+
+
 class SignEditor(tk.Toplevel):
     """增強的 PDF 簽名編輯器"""
 
@@ -3531,9 +6042,31 @@ class SignEditor(tk.Toplevel):
         self.page_index = 0
         self.signatures = []  # 儲存多個簽名
         self.selected_signature = None  # 當前選中的簽名
+        self.selection_frame = None  # 選中框的 Canvas 項目
+        self._signature_refine_job = None
         self.scale = 1.0
         self.log_callback = log_callback or (lambda msg, level: None)
 
+        # 頁面圖片快取與相鄰頁面預先渲染
+        self.page_cache = PageImageCache()
+        self.renderer = PageRenderer(pdf_path, self.page_cache)
+        self.last_render_time = 0.0  # 最近一次整頁渲染耗時，用來決定是否先顯示預覽
+        self.page_image = None  # 目前顯示的頁面圖片（調整視窗大小時作為暫時預覽）
+
+        # 縮放與分塊渲染（zoom 為相對於適合視窗大小的倍率）
+        self.zoom = 1.0
+        self.fit_scale = 1.0
+        self.page_origin = (0, 0)  # 頁面左上角在 Canvas 上的位置
+        self.page_pixel_size = (0, 0)
+        self.tile_mode = False
+        self.tile_cache = PageImageCache(TILE_CACHE_SIZE)
+        self.tile_items = {}  # (col, row) -> (Canvas 項目, PhotoImage, 是否已清晰渲染)
+        self.visible_tiles = set()
+        self.pending_tiles = set()
+        self._tile_job = None
+        self._resize_job = None
+        self._resize_preview_job = None
+
         # 色系配置
         self.colors = {
             'bg_main': '#F8F9FA',
@@ -3597,11 +6130,13 @@ class SignEditor(tk.Toplevel):
             self.focus_set()
             self.canvas.focus_set()
 
-            # 檢查點擊位置
-            clicked_items = self.canvas.find_overlapping(
-                event.x, event.y, event.x, event.y)
-            self.log_callback(
-                f"Canvas點擊 ({event.x}, {event.y})，項目：{clicked_items}", "info")
+            # 檢查點擊位置（換算為捲動後的 Canvas 座標）
+            x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+            clicked_items = self.canvas.find_overlapping(x, y, x, y)
+            if log_enabled("debug"):
+                self.log_callback(
+                    f"Canvas點擊 ({event.x}, {event.y})，項目：{clicked_items}",
+                    "debug")
 
             # 檢查是否點擊了簽名
             signature_found = False
@@ -3610,8 +6145,9 @@ class SignEditor(tk.Toplevel):
                 for sig in self.signatures:
                     if sig.get('canvas_id') == item:
                         signature_found = True
-                        self.log_callback(f"通過Canvas ID找到簽名：{sig['id']}",
-                                          "info")
+                        if log_enabled("debug"):
+                            self.log_callback(f"通過Canvas ID找到簽名：{sig['id']}",
+                                              "debug")
                         break
                 if signature_found:
                     break
@@ -3621,7 +6157,7 @@ class SignEditor(tk.Toplevel):
                 dragging_signature = any(
                     sig.get('dragging', False) for sig in self.signatures)
                 if not dragging_signature:
-                    self.log_callback("點擊空白區域，取消選中", "info")
+                    self.log_callback("點擊空白區域，取消選中", "debug")
                     self.selected_signature = None
                     self._update_selection_visual()
                     self._update_selected_info()
@@ -3633,8 +6169,9 @@ class SignEditor(tk.Toplevel):
         if self.selected_signature:
             if messagebox.askyesno("確認", "確定要刪除選中的簽名嗎？"):
                 self.signatures.remove(self.selected_signature)
+                self._remove_signature_items(self.selected_signature)
                 self.selected_signature = None
-                self._redraw_signatures()
+                self._update_selection_visual()
                 self._update_selected_info()
                 self.log_callback("已刪除選中的簽名", "info")
 
@@ -3761,6 +6298,41 @@ class SignEditor(tk.Toplevel):
                   font=("Microsoft YaHei", 9),
                   width=8).pack(side="left", padx=2)
 
+        # 縮放控制
+        zoom_frame = tk.Frame(page_frame, bg=self.colors['bg_panel'])
+        zoom_frame.pack(fill="x")
+
+        tk.Button(zoom_frame,
+                  text="－",
+                  command=lambda: self._set_zoom(self.zoom / ZOOM_STEP),
+                  bg=self.colors['secondary'],
+                  fg="white",
+                  font=("Microsoft YaHei", 9),
+                  width=3).pack(side="left", padx=2)
+
+        tk.Button(zoom_frame,
+                  text="適合",
+                  command=lambda: self._set_zoom(1.0),
+                  bg=self.colors['secondary'],
+                  fg="white",
+                  font=("Microsoft YaHei", 9),
+                  width=5).pack(side="left", padx=2)
+
+        tk.Button(zoom_frame,
+                  text="＋",
+                  command=lambda: self._set_zoom(self.zoom * ZOOM_STEP),
+                  bg=self.colors['secondary'],
+                  fg="white",
+                  font=("Microsoft YaHei", 9),
+                  width=3).pack(side="left", padx=2)
+
+        self.zoom_label = tk.Label(zoom_frame,
+                                   text="100%",
+                                   bg=self.colors['bg_panel'],
+                                   fg=self.colors['primary'],
+                                   font=("Microsoft YaHei", 10, "bold"))
+        self.zoom_label.pack(side="left", padx=10)
+
         # 中間：簽名控制
         sign_frame = tk.Frame(toolbar, bg=self.colors['bg_panel'])
         sign_frame.pack(side="left", padx=30, pady=10)
@@ -3881,6 +6453,32 @@ class SignEditor(tk.Toplevel):
                   font=("Microsoft YaHei", 10, "bold"),
                   width=12).pack(side="right")
 
+        tk.Button(save_btn_frame,
+                  text="儲存版面",
+                  command=self._save_layout,
+                  bg=self.colors['secondary'],
+                  fg="white",
+                  font=("Microsoft YaHei", 10),
+                  width=10).pack(side="right", padx=(0, 5))
+
+        # 繁重頁面先顯示低解析度預覽
+        self.progressive_render = tk.BooleanVar(value=True)
+        tk.Checkbutton(save_frame,
+                       text="快速預覽",
+                       variable=self.progressive_render,
+                       bg=self.colors['bg_panel'],
+                       fg=self.colors['secondary'],
+                       font=("Microsoft YaHei", 9)).pack(anchor="w")
+
+        # 覆寫原檔時只附加變更的物件
+        self.incremental_save = tk.BooleanVar(value=True)
+        tk.Checkbutton(save_frame,
+                       text="覆寫原檔時增量儲存",
+                       variable=self.incremental_save,
+                       bg=self.colors['bg_panel'],
+                       fg=self.colors['secondary'],
+                       font=("Microsoft YaHei", 9)).pack(anchor="w")
+
     def _create_main_content(self):
         """建立主要內容區域"""
         content_frame = tk.Frame(self, bg=self.colors['bg_main'])
@@ -3921,13 +6519,21 @@ class SignEditor(tk.Toplevel):
                                 highlightbackground=self.colors['secondary'],
                                 takefocus=True)
 
-        # 滾動條
+        # 滾動條（捲動後重新渲染可視範圍）
+        def scroll_y(*args):
+            self.canvas.yview(*args)
+            self._on_view_scrolled()
+
+        def scroll_x(*args):
+            self.canvas.xview(*args)
+            self._on_view_scrolled()
+
         v_scrollbar = ttk.Scrollbar(canvas_frame,
                                     orient="vertical",
-                                    command=self.canvas.yview)
+                                    command=scroll_y)
         h_scrollbar = ttk.Scrollbar(canvas_frame,
                                     orient="horizontal",
-                                    command=self.canvas.xview)
+                                    command=scroll_x)
 
         self.canvas.configure(yscrollcommand=v_scrollbar.set,
                               xscrollcommand=h_scrollbar.set)
@@ -3936,6 +6542,21 @@ class SignEditor(tk.Toplevel):
         h_scrollbar.pack(side="bottom", fill="x")
         self.canvas.pack(side="left", fill="both", expand=True)
 
+        # 視窗大小改變時重新適應頁面
+        self.canvas.bind('<Configure>', self._on_canvas_resize)
+
+        # 滾輪捲動、Ctrl + 滾輪縮放、中鍵或右鍵拖曳平移
+        self.canvas.bind('<MouseWheel>', self._on_mouse_wheel)
+        self.canvas.bind('<Shift-MouseWheel>',
+                         lambda e: self._on_mouse_wheel(e, horizontal=True))
+        self.canvas.bind('<Control-MouseWheel>', self._on_zoom_wheel)
+        for button in ('<Button-4>', '<Button-5>'):  # Linux
+            self.canvas.bind(button, self._on_mouse_wheel)
+            self.canvas.bind('<Control-' + button[1:], self._on_zoom_wheel)
+        for button in (2, 3):
+            self.canvas.bind(f'<ButtonPress-{button}>', self._start_pan)
+            self.canvas.bind(f'<B{button}-Motion>', self._pan)
+
     def _create_status_section(self):
         """建立狀態區域"""
         status_frame = tk.Frame(self, bg=self.colors['bg_panel'], height=40)
@@ -3966,73 +6587,433 @@ class SignEditor(tk.Toplevel):
                                                    pady=10)
 
     def _show_page(self):
-        """顯示 PDF 頁面"""
+        """顯示 PDF 頁面
+
+        頁面能完整放進可視範圍時顯示單張圖片；放大或頁面超出可視範圍時
+        改為分塊渲染，只渲染看得到的圖塊。
+        """
         self.canvas.delete("all")
+        for signature in self.signatures:
+            signature.pop('canvas_id', None)
+        self.selection_frame = None
+        self.tile_items = {}
+        self.visible_tiles = set()
 
         try:
             page = self.pdf.load_page(self.page_index)
-            pix = page.get_pixmap()
-            img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+            self.fit_scale = self._fit_scale(page.rect)
+            self.scale = self.fit_scale * self.zoom
+            size = (page.rect * fitz.Matrix(self.scale, self.scale)).irect
+            self.page_pixel_size = (size.width, size.height)
 
-            # 等待 Canvas 初始化完成
-            self.canvas.update_idletasks()
+            canvas_width = max(self.canvas.winfo_width(), 100)
+            canvas_height = max(self.canvas.winfo_height(), 100)
+            self.tile_mode = (size.width > canvas_width
+                              or size.height > canvas_height)
+            self._layout_page(canvas_width, canvas_height)
+
+            needs_sharp = False
+            if self.tile_mode:
+                x0, y0 = self.page_origin
+                self.canvas.create_rectangle(x0,
+                                             y0,
+                                             x0 + size.width,
+                                             y0 + size.height,
+                                             fill="white",
+                                             outline="#CCCCCC",
+                                             tags="page")
+                self._schedule_tile_update()
+            else:
+                needs_sharp = self._show_page_image(page)
 
-            # 調整頁面大小以適應 Canvas - 使用更激進的全頁顯示
-            canvas_width = self.canvas.winfo_width()
-            canvas_height = self.canvas.winfo_height()
+            # 重新放置簽名
+            self._redraw_signatures()
 
-            # 確保 Canvas 已經有實際尺寸
-            if canvas_width > 100 and canvas_height > 100:
-                img_width, img_height = img.size
+            # 更新頁面標籤
+            self.page_label.config(
+                text=f"第 {self.page_index + 1} 頁 / 共 {len(self.pdf)} 頁")
+            self.zoom_label.config(text=f"{round(self.scale * 100)}%")
 
-                # 計算縮放比例 - 讓PDF幾乎填滿整個區域，增加縮放係數
-                width_ratio = (canvas_width - 20) / img_width  # 留20像素邊距
-                height_ratio = (canvas_height - 20) / img_height  # 留20像素邊距
-                self.scale = min(width_ratio, height_ratio, 5.0)  # 允許放大到5倍
+            if log_enabled("debug"):
+                self.log_callback(f"顯示第 {self.page_index + 1} 頁", "debug")
 
-                # 如果縮放比例太小，至少保持一個合理的最小縮放
-                self.scale = max(self.scale, 1.0)
+            if needs_sharp:
+                self._request_sharp_render()
 
-                if self.scale != 1.0:
-                    new_width = int(img_width * self.scale)
-                    new_height = int(img_height * self.scale)
-                    img = img.resize((new_width, new_height), Image.LANCZOS)
-            else:
-                # Canvas 還沒準備好，使用較大的預設縮放
-                self.scale = 2.0
-                img_width, img_height = img.size
-                new_width = int(img_width * self.scale)
-                new_height = int(img_height * self.scale)
-                img = img.resize((new_width, new_height), Image.LANCZOS)
+            self._prefetch_neighbors()
+
+        except Exception as e:
+            self.log_callback(f"顯示頁面失敗：{str(e)}", "error")
 
+    def _layout_page(self, canvas_width, canvas_height):
+        """計算頁面左上角位置與捲動範圍；頁面小於可視範圍時置中"""
+        margin = 10
+        width, height = self.page_pixel_size
+        self.page_origin = (max((canvas_width - width) // 2, margin),
+                            max((canvas_height - height) // 2, margin))
+        self.canvas.config(scrollregion=(
+            0, 0, max(canvas_width, width + self.page_origin[0] + margin),
+            max(canvas_height, height + self.page_origin[1] + margin)))
+
+    def _show_page_image(self, page):
+        """以單張圖片顯示整頁；回傳是否仍需背景渲染清晰版本"""
+        key = PageImageCache.key(self.page_index, self.scale)
+        img = self.page_cache.get(key)
+        needs_sharp = False
+        if img is None and (self.progressive_render.get()
+                            and self.last_render_time >
+                            PROGRESSIVE_RENDER_THRESHOLD):
+            # 繁重頁面：先以低解析度快速顯示，清晰版本由背景渲染後替換
+            draft = render_page_image(self.pdf, self.page_index,
+                                      self.scale * DRAFT_RENDER_RATIO)
+            img = draft.resize(self.page_pixel_size, Image.BILINEAR)
+            needs_sharp = True
+        elif img is None:
+            started = time.perf_counter()
+            img = render_page_image(self.pdf, self.page_index, self.scale)
+            self.last_render_time = time.perf_counter() - started
+            self.page_cache.put(key, img)
+
+        self.page_image = img
+        self.page_tk = ImageTk.PhotoImage(img)
+        self.canvas.create_image(*self.page_origin,
+                                 image=self.page_tk,
+                                 anchor="nw",
+                                 tags="page")
+        return needs_sharp
+
+    def _request_sharp_render(self):
+        """請背景渲染程序產生目前頁面的清晰整頁影像"""
+        page_index, scale = self.page_index, self.scale
+        key = PageImageCache.key(page_index, scale)
+        if key in self.page_cache:
+            self._show_sharp_image(page_index, scale, self.page_cache.get(key),
+                                   0.0)
+            return
+
+        def on_rendered(img, elapsed):
+            self._deliver(lambda: self._show_sharp_image(
+                page_index, scale, img, elapsed))
+
+        self.renderer.render(
+            page_index,
+            scale,
+            callback=on_rendered,
+            wanted=lambda: (self.page_index, self.scale) == (page_index, scale),
+            priority=0)
+
+    def _show_sharp_image(self, page_index, scale, img, elapsed):
+        """以清晰影像取代預覽（主執行緒）"""
+        if ((page_index, scale) != (self.page_index, self.scale)
+                or self.tile_mode or img is None):
+            return
+        self.last_render_time = elapsed
+        self.page_image = img
+        self.page_tk = ImageTk.PhotoImage(img)
+        self.canvas.itemconfig("page", image=self.page_tk)
+
+    def _schedule_tile_update(self):
+        """合併短時間內的多次捲動，稍後再更新圖塊"""
+        if self.tile_mode and not self._tile_job:
+            self._tile_job = self.after(30, self._update_tiles)
+
+    def _update_tiles(self):
+        """放置可視範圍內的圖塊
+
+        已快取的圖塊直接顯示；其餘先以整頁預覽的對應區域放大暫代，
+        再交給背景渲染程序以目前縮放比例清晰渲染。離開可視範圍的圖塊
+        從 Canvas 移除，記憶體用量只取決於可視範圍與圖塊快取大小。
+        """
+        self._tile_job = None
+        if not self.tile_mode:
+            return
+
+        x0, y0 = self.page_origin
+        width, height = self.page_pixel_size
+        view_left = self.canvas.canvasx(0) - x0
+        view_top = self.canvas.canvasy(0) - y0
+        view_right = view_left + self.canvas.winfo_width()
+        view_bottom = view_top + self.canvas.winfo_height()
+
+        cols = (width + TILE_SIZE - 1) // TILE_SIZE
+        rows = (height + TILE_SIZE - 1) // TILE_SIZE
+        first_col = max(int(view_left // TILE_SIZE), 0)
+        last_col = min(int((view_right - 1) // TILE_SIZE), cols - 1)
+        first_row = max(int(view_top // TILE_SIZE), 0)
+        last_row = min(int((view_bottom - 1) // TILE_SIZE), rows - 1)
+        self.visible_tiles = {(col, row)
+                              for col in range(first_col, last_col + 1)
+                              for row in range(first_row, last_row + 1)}
+
+        for tile in list(self.tile_items):
+            if tile not in self.visible_tiles:
+                self.canvas.delete(self.tile_items.pop(tile)[0])
+
+        base = self.page_cache.get(
+            PageImageCache.key(self.page_index, self.fit_scale))
+        for tile in sorted(self.visible_tiles, key=lambda t: (t[1], t[0])):
+            if tile in self.tile_items and self.tile_items[tile][2]:
+                continue
+            img = self.tile_cache.get(self._tile_key(tile))
+            if img is not None:
+                self._place_tile(tile, img, sharp=True)
+                continue
+            if tile not in self.tile_items and base is not None:
+                self._place_tile(tile,
+                                 self._tile_placeholder(base, tile),
+                                 sharp=False)
+            self._request_tile(tile)
+
+    def _tile_key(self, tile):
+        return (self.page_index, round(self.scale, 3)) + tile
+
+    def _tile_bounds(self, tile):
+        """圖塊在頁面圖片中的像素範圍"""
+        col, row = tile
+        width, height = self.page_pixel_size
+        left, top = col * TILE_SIZE, row * TILE_SIZE
+        return (left, top, min(left + TILE_SIZE, width),
+                min(top + TILE_SIZE, height))
+
+    def _tile_placeholder(self, base, tile):
+        """由整頁預覽裁切並放大出圖塊的暫代圖片"""
+        left, top, right, bottom = self._tile_bounds(tile)
+        ratio = base.width / self.page_pixel_size[0]
+        return base.resize((right - left, bottom - top),
+                           Image.BILINEAR,
+                           box=(left * ratio, top * ratio, right * ratio,
+                                bottom * ratio))
+
+    def _place_tile(self, tile, img, sharp):
+        """在 Canvas 上放置或更新圖塊（位於頁面之上、簽名之下）"""
+        photo = ImageTk.PhotoImage(img)
+        existing = self.tile_items.get(tile)
+        if existing:
+            item = existing[0]
+            self.canvas.itemconfig(item, image=photo)
+        else:
+            left, top, _, _ = self._tile_bounds(tile)
+            item = self.canvas.create_image(self.page_origin[0] + left,
+                                            self.page_origin[1] + top,
+                                            image=photo,
+                                            anchor="nw",
+                                            tags="tile")
+            self.canvas.tag_raise(item, "page")
+        self.tile_items[tile] = (item, photo, sharp)
+
+    def _request_tile(self, tile):
+        """請背景渲染程序渲染一個圖塊"""
+        key = self._tile_key(tile)
+        if key in self.pending_tiles:
+            return
+        self.pending_tiles.add(key)
+        page_index, scale = self.page_index, self.scale
+        left, top, right, bottom = self._tile_bounds(tile)
+        clip = (left / scale, top / scale, right / scale, bottom / scale)
+
+        def wanted():
+            if ((self.page_index, self.scale) == (page_index, scale)
+                    and tile in self.visible_tiles):
+                return True
+            self.pending_tiles.discard(key)
+            return False
+
+        def on_rendered(img, elapsed):
+            self._deliver(lambda: self._show_tile(key, tile, img))
+
+        def on_error(error):
+            # 渲染失敗也要移除，之後捲動或縮放時才會重新請求
+            self._deliver(lambda: self.pending_tiles.discard(key))
+
+        self.renderer.render(page_index,
+                             scale,
+                             clip=clip,
+                             callback=on_rendered,
+                             wanted=wanted,
+                             priority=0,
+                             on_error=on_error)
+
+    def _show_tile(self, key, tile, img):
+        """圖塊渲染完成（主執行緒）"""
+        self.pending_tiles.discard(key)
+        self.tile_cache.put(key, img)
+        if (self.tile_mode and key == self._tile_key(tile)
+                and tile in self.visible_tiles):
+            self._place_tile(tile, img, sharp=True)
+
+    def _on_view_scrolled(self):
+        """捲動後更新可視範圍內的圖塊"""
+        self._schedule_tile_update()
+
+    def _on_mouse_wheel(self, event, horizontal=False):
+        """滑鼠滾輪捲動頁面"""
+        if event.num == 4:
+            units = -3
+        elif event.num == 5:
+            units = 3
+        else:
+            units = -3 if event.delta > 0 else 3
+        if horizontal:
+            self.canvas.xview_scroll(units, "units")
+        else:
+            self.canvas.yview_scroll(units, "units")
+        self._on_view_scrolled()
+
+    def _on_zoom_wheel(self, event):
+        """Ctrl + 滾輪以游標位置為中心縮放頁面"""
+        zoom_in = event.num == 4 or (event.num != 5 and event.delta > 0)
+        factor = ZOOM_STEP if zoom_in else 1 / ZOOM_STEP
+        self._set_zoom(self.zoom * factor, (event.x, event.y))
+
+    def _start_pan(self, event):
+        self.canvas.scan_mark(event.x, event.y)
+
+    def _pan(self, event):
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self._on_view_scrolled()
+
+    def _set_zoom(self, zoom, anchor=None):
+        """設定頁面縮放倍率（相對於適合視窗大小），維持錨點位置不動"""
+        zoom = min(max(zoom, 1.0), self._max_zoom())
+        if abs(zoom - self.zoom) < 1e-6:
+            return
+        if anchor is None:
+            anchor = (self.canvas.winfo_width() / 2,
+                      self.canvas.winfo_height() / 2)
+
+        # 記住錨點在頁面座標中的位置
+        page_x = (self.canvas.canvasx(anchor[0]) -
+                  self.page_origin[0]) / self.scale
+        page_y = (self.canvas.canvasy(anchor[1]) -
+                  self.page_origin[1]) / self.scale
+
+        self.zoom = zoom
+        self._show_page()
+
+        # 捲動使錨點回到同一個螢幕位置
+        scroll_region = [float(v) for v in
+                         str(self.canvas.cget("scrollregion")).split()]
+        target_x = self.page_origin[0] + page_x * self.scale - anchor[0]
+        target_y = self.page_origin[1] + page_y * self.scale - anchor[1]
+        self.canvas.xview_moveto(max(target_x, 0) / scroll_region[2])
+        self.canvas.yview_moveto(max(target_y, 0) / scroll_region[3])
+        self._schedule_tile_update()
+
+    def _max_zoom(self):
+        return max(MAX_PAGE_SCALE / self.fit_scale, 1.0)
+
+    def _deliver(self, callback):
+        """從背景執行緒把結果交給主執行緒"""
+        try:
+            self.after(0, callback)
+        except (RuntimeError, tk.TclError):
+            pass  # 編輯器已關閉
+
+    def _prefetch_neighbors(self):
+        """趁空閒時以適合視窗的比例預先渲染相鄰頁面，翻頁時可直接使用快取"""
+        scale = self.fit_scale
+        self.renderer.prefetch(
+            self.page_index, len(self.pdf), scale,
+            lambda index: (abs(index - self.page_index) <= PREFETCH_DISTANCE
+                           and self.fit_scale == scale))
+
+    def _on_canvas_resize(self, event):
+        """Canvas 尺寸改變：立即以舊圖片縮放預覽，停止調整後才重新渲染"""
+        if self.page_image is None:
+            return
+        if not self._resize_preview_job and not self.tile_mode:
+            # 拖曳時最多每 40ms 更新一次預覽
+            self._resize_preview_job = self.after(40, self._preview_resize)
+        if self._resize_job:
+            self.after_cancel(self._resize_job)
+        self._resize_job = self.after(250, self._finish_resize)
+
+    def _preview_resize(self):
+        """以目前的頁面圖片快速縮放到新尺寸（不重新渲染）"""
+        self._resize_preview_job = None
+        page_item = self.canvas.find_withtag("page")
+        if not page_item or self.tile_mode:
+            return
+
+        canvas_width = max(self.canvas.winfo_width(), 100)
+        canvas_height = max(self.canvas.winfo_height(), 100)
+        page = self.pdf.load_page(self.page_index)
+        scale = self._fit_scale(page.rect, (canvas_width, canvas_height))
+
+        if scale != self.scale:
+            self.scale = self.fit_scale = scale
+            size = (page.rect * fitz.Matrix(scale, scale)).irect
+            self.page_pixel_size = (size.width, size.height)
+            key = PageImageCache.key(self.page_index, scale)
+            img = self.page_cache.get(key)
+            if img is None:
+                img = self.page_image.resize(self.page_pixel_size,
+                                             Image.BILINEAR)
+            else:
+                self.page_image = img
             self.page_tk = ImageTk.PhotoImage(img)
+            self.canvas.itemconfig(page_item, image=self.page_tk)
 
-            # 居中顯示 PDF 頁面
-            canvas_width = max(self.canvas.winfo_width(), 100)
-            canvas_height = max(self.canvas.winfo_height(), 100)
-            canvas_center_x = canvas_width // 2
-            canvas_center_y = canvas_height // 2
+        self._layout_page(canvas_width, canvas_height)
+        self.canvas.coords(page_item, *self.page_origin)
+        self._redraw_signatures(fast=True)
 
-            self.canvas.create_image(canvas_center_x,
-                                     canvas_center_y,
-                                     image=self.page_tk,
-                                     anchor="center",
-                                     tags="page")
+    def _finish_resize(self):
+        """停止調整視窗大小後重新渲染
 
-            # 更新滾動區域
-            self.canvas.config(scrollregion=self.canvas.bbox("all"))
+        縮放檢視時維持目前的顯示比例，只重新排版並補上新露出的圖塊；
+        適合視窗模式則在背景渲染新尺寸的清晰頁面。
+        """
+        self._resize_job = None
+        if self._resize_preview_job:
+            self.after_cancel(self._resize_preview_job)
+            self._resize_preview_job = None
+
+        canvas_width = max(self.canvas.winfo_width(), 100)
+        canvas_height = max(self.canvas.winfo_height(), 100)
+        if self.tile_mode or self.zoom != 1.0:
+            page = self.pdf.load_page(self.page_index)
+            fit_scale = self._fit_scale(page.rect,
+                                        (canvas_width, canvas_height))
+            self.fit_scale = fit_scale
+            self.zoom = min(max(self.scale / fit_scale, 1.0), self._max_zoom())
+            self._show_page()
+            return
 
-            # 重新放置簽名
-            self._redraw_signatures()
+        self._preview_resize()
+        width, height = self.page_pixel_size
+        if width > canvas_width or height > canvas_height:
+            # 視窗縮小到放不下整頁，改用分塊顯示
+            self._show_page()
+        elif self.canvas.find_withtag("page"):
+            self._request_sharp_render()
+            self._prefetch_neighbors()
+
+    def _fit_scale(self, page_rect, canvas_size=None):
+        """計算讓頁面適應 Canvas 的縮放比例"""
+        if canvas_size:
+            canvas_width, canvas_height = canvas_size
+        else:
+            # 等待 Canvas 初始化完成
+            self.canvas.update_idletasks()
 
-            # 更新頁面標籤
-            self.page_label.config(
-                text=f"第 {self.page_index + 1} 頁 / 共 {len(self.pdf)} 頁")
+            # 調整頁面大小以適應 Canvas - 使用更激進的全頁顯示
+            canvas_width = self.canvas.winfo_width()
+            canvas_height = self.canvas.winfo_height()
 
-            self.log_callback(f"顯示第 {self.page_index + 1} 頁", "info")
+        # Canvas 還沒準備好，使用較大的預設縮放
+        if canvas_width <= 100 or canvas_height <= 100:
+            return 2.0
 
-        except Exception as e:
-            self.log_callback(f"顯示頁面失敗：{str(e)}", "error")
+        # 計算縮放比例 - 讓PDF幾乎填滿整個區域（留20像素邊距）
+        img_width = max(round(page_rect.width), 1)
+        img_height = max(round(page_rect.height), 1)
+        width_ratio = (canvas_width - 20) / img_width
+        height_ratio = (canvas_height - 20) / img_height
+        scale = min(width_ratio, height_ratio, 5.0)  # 允許放大到5倍
+
+        # 大圖面縮小到完整顯示，細節再以縮放檢視
+        return max(scale, 0.05)
 
     def _turn_page(self, delta):
         """翻頁"""
@@ -4040,6 +7021,8 @@ class SignEditor(tk.Toplevel):
         if 0 <= new_index < len(self.pdf):
             self.page_index = new_index
             self.selected_signature = None  # 切換頁面時取消選中
+            self.canvas.xview_moveto(0)
+            self.canvas.yview_moveto(0)
             self._show_page()
             self._update_selected_info()
         else:
@@ -4277,10 +7260,8 @@ class SignEditor(tk.Toplevel):
                                 highlightbackground="#cccccc")
         draw_canvas.pack(expand=False, pady=10)  # 不要讓畫布自動擴展
 
-        # 建立簽名圖片
-        signature_image = Image.new("RGBA", (canvas_width, canvas_height),
-                                    (255, 255, 255, 0))
-        draw_obj = ImageDraw.Draw(signature_image)
+        # 記錄筆畫座標，完成時再轉為向量路徑
+        strokes = []
 
         # 繪圖變數
         drawing = False
@@ -4290,6 +7271,7 @@ class SignEditor(tk.Toplevel):
             nonlocal drawing, last_x, last_y
             drawing = True
             last_x, last_y = event.x, event.y
+            strokes.append([(event.x, event.y)])
 
         def draw_line(event):
             nonlocal last_x, last_y
@@ -4301,14 +7283,11 @@ class SignEditor(tk.Toplevel):
                                         x,
                                         y,
                                         fill="black",
-                                        width=4,
+                                        width=HANDWRITING_STROKE_WIDTH,
                                         capstyle=tk.ROUND,
                                         smooth=tk.TRUE,
                                         joinstyle=tk.ROUND)
-                # 在圖片上繪製（使用圓形筆刷效果）
-                draw_obj.line((last_x, last_y, x, y), fill="black", width=4)
-                # 在線條端點繪製圓點，使線條更平滑
-                draw_obj.ellipse((x - 2, y - 2, x + 2, y + 2), fill="black")
+                strokes[-1].append((x, y))
                 last_x, last_y = x, y
 
         def stop_draw(event):
@@ -4318,19 +7297,19 @@ class SignEditor(tk.Toplevel):
         # 重新定義按鈕功能，現在畫布變數已經可用
         def clear_signature():
             draw_canvas.delete("all")
-            nonlocal signature_image, draw_obj
-            signature_image = Image.new("RGBA", (canvas_width, canvas_height),
-                                        (255, 255, 255, 0))
-            draw_obj = ImageDraw.Draw(signature_image)
+            strokes.clear()
 
         def finish_signature():
             # 檢查是否有繪製內容
             try:
-                bbox = signature_image.getbbox()
-                if bbox:
-                    # 裁剪簽名圖片，去除空白區域
-                    cropped_signature = signature_image.crop(bbox)
-                    self._add_signature(cropped_signature, "handwritten")
+                # 平滑、簡化筆畫並裁去空白區域，預覽圖片只用於畫面顯示
+                vector_strokes, stroke_width, preview = prepare_handwriting(
+                    strokes)
+                if preview:
+                    self._add_signature(preview,
+                                        "handwritten",
+                                        strokes=vector_strokes,
+                                        stroke_width=stroke_width)
                     draw_window.destroy()
                     self.log_callback("手寫簽名已完成", "success")
                     self.status_label.config(text="手寫簽名完成 - 已自動選中可操作",
@@ -4367,13 +7346,17 @@ class SignEditor(tk.Toplevel):
 
         draw_window.bind('<Configure>', on_window_resize)
 
-    def _add_signature(self, signature_img, signature_type):
-        """添加簽名到當前頁面"""
+    def _add_signature(self, signature_img, signature_type, strokes=None,
+                       stroke_width=None):
+        """添加簽名到當前頁面
+
+        strokes 為手寫簽名的向量筆畫（已裁切並限制尺寸），儲存時畫成向量路徑。
+        """
         # 調整簽名大小
         signature_copy = signature_img.copy()
 
-        # 根據類型調整大小
-        if signature_type == "handwritten":
+        # 根據類型調整大小（向量筆畫已在 prepare_handwriting 中處理）
+        if signature_type == "handwritten" and not strokes:
             # 手寫簽名可能需要裁剪空白區域
             bbox = signature_copy.getbbox()
             if bbox:
@@ -4382,7 +7365,7 @@ class SignEditor(tk.Toplevel):
         # 設定合適的簽名尺寸
         if signature_type == "handwritten":
             # 手寫簽名保持原始比例，但限制最大尺寸
-            max_width, max_height = 250, 120
+            max_width, max_height = HANDWRITING_MAX_SIZE
         else:
             # 上傳的圖片簽名可以稍大一些
             max_width, max_height = 300, 150
@@ -4418,6 +7401,9 @@ class SignEditor(tk.Toplevel):
             'id': len(self.signatures) + 1,
             'scale_factor': 1.0  # 縮放係數
         }
+        if strokes:
+            signature_obj['strokes'] = strokes
+            signature_obj['stroke_width'] = stroke_width
 
         self.signatures.append(signature_obj)
 
@@ -4426,101 +7412,142 @@ class SignEditor(tk.Toplevel):
             f"添加{signature_type}簽名: PDF坐標=({safe_x:.1f}, {safe_y:.1f}), "
             f"圖片尺寸=({signature_copy.width}, {signature_copy.height})", "info")
 
-        self._redraw_signatures()
+        self._draw_signature_on_canvas(signature_obj)
 
         # 自動選中新添加的簽名
         self.selected_signature = signature_obj
+        self._update_selection_visual()
         self._update_selected_info()
 
         # 更新狀態提示
         self.status_label.config(text=f"簽名已添加並選中 - 可使用鍵盤 +/- 縮放或拖曳移動",
                                  fg=self.colors['success'])
 
-    def _redraw_signatures(self):
-        """重新繪製所有簽名"""
-        # 清除舊的簽名顯示 - 使用新的標籤系統
-        for sig in self.signatures:
-            if 'canvas_id' in sig:
-                self.canvas.delete(sig['canvas_id'])
-            if 'frame_id' in sig:
-                self.canvas.delete(sig['frame_id'])
+    def _redraw_signatures(self, fast=False):
+        """同步所有簽名的顯示
 
-        # 繪製當前頁面的簽名
+        Canvas 項目會保留重複使用：目前頁面的簽名只更新位置，顯示尺寸改變時
+        才重新產生圖片；其他頁面的簽名則從 Canvas 移除。
+        """
+        for signature in self.signatures:
+            if signature['page'] == self.page_index:
+                self._draw_signature_on_canvas(signature, fast)
+            else:
+                self._remove_signature_items(signature)
+        self._update_selection_visual()
+
+    def _remove_signature_items(self, signature):
+        """從 Canvas 移除簽名項目（保留已產生的圖片供下次顯示）"""
+        canvas_id = signature.pop('canvas_id', None)
+        if canvas_id is not None:
+            self.canvas.delete(canvas_id)
+
+    def _signature_size(self, signature):
+        """簽名在 PDF 上的尺寸（點）"""
+        scale_factor = signature.get('scale_factor', 1.0)
+        original_img = signature['original_image']
+        return (max(int(original_img.width * scale_factor), 1),
+                max(int(original_img.height * scale_factor), 1))
+
+    def _update_signature_image(self, signature):
+        """依縮放係數更新儲存時使用的簽名圖片（以 PDF 點為單位）"""
+        original_img = signature['original_image']
+        size = self._signature_size(signature)
+        if size == original_img.size:
+            signature['image'] = original_img
+        elif signature['image'].size != size:
+            signature['image'] = original_img.resize(size, Image.LANCZOS)
+
+    def _signature_bitmap(self, signature, display_size, fast=False):
+        """取得簽名在指定顯示尺寸的 PhotoImage
+
+        每個簽名依顯示尺寸保留少量圖片；連續縮放時以較快的濾鏡產生，
+        停止操作後再以 LANCZOS 重新產生。
+        """
+        bitmaps = signature.setdefault('bitmaps', OrderedDict())
+        cached = bitmaps.get(display_size)
+        if cached and (cached[1] or fast):
+            bitmaps.move_to_end(display_size)
+            return cached[0]
+
+        original_img = signature['original_image']
+        if display_size == original_img.size:
+            display_img, final = original_img, True
+        elif fast:
+            display_img, final = original_img.resize(display_size,
+                                                     Image.BILINEAR), False
+        else:
+            display_img, final = original_img.resize(display_size,
+                                                     Image.LANCZOS), True
+        photo = ImageTk.PhotoImage(display_img)
+        bitmaps[display_size] = (photo, final)
+        bitmaps.move_to_end(display_size)
+        while len(bitmaps) > SIGNATURE_BITMAP_CACHE_SIZE:
+            bitmaps.popitem(last=False)
+        return photo
+
+    def _schedule_signature_refine(self):
+        """停止縮放一段時間後再以高品質重新產生簽名圖片"""
+        if self._signature_refine_job:
+            self.after_cancel(self._signature_refine_job)
+        self._signature_refine_job = self.after(SIGNATURE_REFINE_DELAY,
+                                                self._refine_signatures)
+
+    def _refine_signatures(self):
+        """以高品質圖片取代快速縮放的簽名顯示"""
+        self._signature_refine_job = None
         for signature in self.signatures:
             if signature['page'] == self.page_index:
                 self._draw_signature_on_canvas(signature)
-
-    def _draw_signature_on_canvas(self, signature):
-        """在 Canvas 上繪製簽名"""
-        try:
-            # 根據縮放係數調整簽名圖片
-            scale_factor = signature.get('scale_factor', 1.0)
-            original_img = signature['original_image']
-
-            # 應用縮放
-            if scale_factor != 1.0:
-                new_width = int(original_img.width * scale_factor)
-                new_height = int(original_img.height * scale_factor)
-                scaled_img = original_img.resize((new_width, new_height),
-                                                 Image.LANCZOS)
             else:
-                scaled_img = original_img
-
-            # 更新簽名圖片
-            signature['image'] = scaled_img
-            signature_tk = ImageTk.PhotoImage(scaled_img)
-
-            # 將PDF坐標轉換為Canvas坐標
-            page_bbox = self.canvas.bbox("page")
-            if page_bbox:
-                page_left, page_top = page_bbox[0], page_bbox[1]
-                # PDF坐標轉Canvas坐標
-                display_x = page_left + (signature['x'] * self.scale)
-                display_y = page_top + (signature['y'] * self.scale)
+                self._update_signature_image(signature)
 
-                # 調試記錄座標轉換
-                self.log_callback(
-                    f"簽名 {signature['id']} 座標轉換: PDF坐標=({signature['x']:.1f}, {signature['y']:.1f}) "
-                    f"-> Canvas坐標=({display_x:.1f}, {display_y:.1f}), scale={self.scale:.2f}",
-                    "debug")
-            else:
-                # 後備方案：直接使用PDF坐標
-                display_x = signature['x']
-                display_y = signature['y']
-                self.log_callback("無法獲取頁面邊界，使用PDF坐標作為Canvas坐標", "warning")
+    def _draw_signature_on_canvas(self, signature, fast=False):
+        """在 Canvas 上繪製或更新簽名；fast 表示正在連續縮放"""
+        try:
+            size = self._signature_size(signature)
+            if not fast:
+                self._update_signature_image(signature)
+
+            # 依顯示尺寸取得快取的圖片，尺寸相同時不重新產生
+            display_size = (max(round(size[0] * self.scale), 1),
+                            max(round(size[1] * self.scale), 1))
+            photo = self._signature_bitmap(signature, display_size, fast)
+            if not signature['bitmaps'][display_size][1]:
+                self._schedule_signature_refine()
+            image_changed = photo is not signature.get('tk_image')
+            signature['tk_image'] = photo
+            signature['display_size'] = display_size
+
+            # PDF坐標轉Canvas坐標
+            page_left, page_top = self.page_origin
+            display_x = page_left + (signature['x'] * self.scale)
+            display_y = page_top + (signature['y'] * self.scale)
+
+            canvas_id = signature.get('canvas_id')
+            if canvas_id is not None:
+                self.canvas.coords(canvas_id, display_x, display_y)
+                if image_changed:
+                    self.canvas.itemconfig(canvas_id,
+                                           image=signature['tk_image'])
+                return
 
             # 創建簽名圖片 - 使用簡單的標籤系統
             signature_tag = f"sig_{signature['id']}"
-            signature_id = self.canvas.create_image(display_x,
-                                                    display_y,
-                                                    image=signature_tk,
-                                                    anchor="nw",
-                                                    tags=signature_tag)
-
-            self.log_callback(
-                f"創建簽名 {signature['id']} 在位置 ({display_x}, {display_y}), Canvas ID: {signature_id}",
-                "info")
-
-            # 如果是選中的簽名，添加選中框
-            if signature == self.selected_signature:
-                x1, y1 = display_x - 3, display_y - 3
-                x2, y2 = display_x + scaled_img.width + 3, display_y + scaled_img.height + 3
-                frame_id = self.canvas.create_rectangle(
-                    x1,
-                    y1,
-                    x2,
-                    y2,
-                    outline="red",
-                    width=2,
-                    dash=(5, 5),
-                    tags=f"{signature_tag}_frame")
-                signature['frame_id'] = frame_id
-
-            # 保持圖片引用
-            signature['tk_image'] = signature_tk
+            signature_id = self.canvas.create_image(
+                display_x,
+                display_y,
+                image=signature['tk_image'],
+                anchor="nw",
+                tags=signature_tag)
             signature['canvas_id'] = signature_id
 
-            # 直接綁定到Canvas項目ID
+            if log_enabled("debug"):
+                self.log_callback(
+                    f"創建簽名 {signature['id']} 在位置 ({display_x:.1f}, {display_y:.1f}), "
+                    f"Canvas ID: {signature_id}, scale={self.scale:.2f}", "debug")
+
+            # 直接綁定到Canvas項目ID（項目存在期間只綁定一次）
             self._bind_signature_events_simple(signature, signature_id)
 
         except Exception as e:
@@ -4543,15 +7570,16 @@ class SignEditor(tk.Toplevel):
             signature['dragging'] = True
             signature['drag_start_x'] = event.x
             signature['drag_start_y'] = event.y
-            self.log_callback(f"選中簽名 {signature['id']}", "success")
+            if log_enabled("debug"):
+                self.log_callback(f"選中簽名 {signature['id']}", "debug")
 
         def on_drag(event):
             if signature.get('dragging', False):
                 dx = event.x - signature['drag_start_x']
                 dy = event.y - signature['drag_start_y']
                 self.canvas.move(canvas_id, dx, dy)
-                if 'frame_id' in signature:
-                    self.canvas.move(signature['frame_id'], dx, dy)
+                if self.selection_frame and signature == self.selected_signature:
+                    self.canvas.move(self.selection_frame, dx, dy)
                 signature['drag_start_x'] = event.x
                 signature['drag_start_y'] = event.y
 
@@ -4562,39 +7590,25 @@ class SignEditor(tk.Toplevel):
                 if coords:
                     # 轉換Canvas坐標到PDF坐標
                     try:
-                        page_bbox = self.canvas.bbox("page")
-                        if page_bbox:
-                            page_left, page_top = page_bbox[0], page_bbox[1]
-                            # 更新相對於PDF的位置（考慮縮放）
-                            # 確保座標轉換的精確性
-                            pdf_x = (coords[0] - page_left) / self.scale
-                            pdf_y = (coords[1] - page_top) / self.scale
-
-                            # 驗證PDF坐標的合理性
-                            page = self.pdf.load_page(signature['page'])
-                            page_rect = page.rect
-                            pdf_width, pdf_height = page_rect.width, page_rect.height
-
-                            # 確保坐標在PDF範圍內
-                            signature['x'] = max(
-                                0,
-                                min(pdf_x,
-                                    pdf_width - signature['image'].width))
-                            signature['y'] = max(
-                                0,
-                                min(pdf_y,
-                                    pdf_height - signature['image'].height))
-
+                        page_left, page_top = self.page_origin
+                        # 更新相對於PDF的位置（考慮縮放）
+                        pdf_x = (coords[0] - page_left) / self.scale
+                        pdf_y = (coords[1] - page_top) / self.scale
+
+                        # 驗證PDF坐標的合理性
+                        page = self.pdf.load_page(signature['page'])
+                        page_rect = page.rect
+                        pdf_width, pdf_height = page_rect.width, page_rect.height
+
+                        # 確保坐標在PDF範圍內
+                        width, height = self._signature_size(signature)
+                        signature['x'] = max(0, min(pdf_x, pdf_width - width))
+                        signature['y'] = max(0, min(pdf_y, pdf_height - height))
+
+                        if log_enabled("debug"):
                             self.log_callback(
                                 f"簽名移動到 PDF坐標 ({signature['x']:.1f}, {signature['y']:.1f})",
-                                "info")
-                        else:
-                            # 如果無法獲取PDF邊界，使用Canvas坐標作為後備
-                            signature['x'] = coords[0]
-                            signature['y'] = coords[1]
-                            self.log_callback(
-                                f"簽名移動到 Canvas坐標 ({signature['x']:.1f}, {signature['y']:.1f})",
-                                "warning")
+                                "debug")
                     except Exception as e:
                         # 發生錯誤時使用Canvas坐標作為後備
                         signature['x'] = coords[0]
@@ -4613,194 +7627,37 @@ class SignEditor(tk.Toplevel):
         self.canvas.tag_bind(canvas_id, "<Leave>",
                              lambda e: self.canvas.config(cursor="arrow"))
 
-        self.log_callback(f"已綁定簽名 {signature['id']} 事件到 Canvas ID {canvas_id}",
-                          "info")
+        if log_enabled("debug"):
+            self.log_callback(
+                f"已綁定簽名 {signature['id']} 事件到 Canvas ID {canvas_id}",
+                "debug")
 
     def _update_selection_visual(self):
-        """更新選中框視覺效果，不重繪簽名"""
-        # 清除所有舊的選中框
-        for sig in self.signatures:
-            if 'frame_id' in sig:
-                self.canvas.delete(sig['frame_id'])
-                del sig['frame_id']
-
-        # 為選中的簽名添加選中框
-        if self.selected_signature and 'canvas_id' in self.selected_signature:
-            try:
-                canvas_id = self.selected_signature['canvas_id']
-                coords = self.canvas.coords(canvas_id)
-                if coords and len(coords) >= 2:
-                    x, y = coords[0], coords[1]
-                    scaled_img = self.selected_signature['image']
-
-                    # 創建選中框
-                    x1, y1 = x - 3, y - 3
-                    x2, y2 = x + scaled_img.width + 3, y + scaled_img.height + 3
-                    frame_id = self.canvas.create_rectangle(
-                        x1,
-                        y1,
-                        x2,
-                        y2,
-                        outline="red",
-                        width=2,
-                        dash=(5, 5),
-                        tags=f"sig_{self.selected_signature['id']}_frame")
-                    self.selected_signature['frame_id'] = frame_id
-
-                    self.log_callback(
-                        f"更新簽名 {self.selected_signature['id']} 的選中框", "info")
-            except Exception as e:
-                self.log_callback(f"更新選中框失敗：{str(e)}", "error")
+        """只移動或隱藏選中框，不重繪簽名"""
+        signature = self.selected_signature
+        canvas_id = signature.get('canvas_id') if signature else None
+        if canvas_id is None:
+            if self.selection_frame:
+                self.canvas.delete(self.selection_frame)
+                self.selection_frame = None
+            return
 
-    def _update_signature_scale_only(self, signature):
-        """只更新簽名的縮放，保持事件綁定和位置"""
         try:
-            if 'canvas_id' not in signature:
-                return
-
-            # 獲取當前位置
-            canvas_id = signature['canvas_id']
-            coords = self.canvas.coords(canvas_id)
-            if not coords:
-                return
-
-            current_x, current_y = coords[0], coords[1]
-
-            # 重新縮放圖片
-            scale_factor = signature.get('scale_factor', 1.0)
-            original_img = signature['original_image']
-
-            if scale_factor != 1.0:
-                new_width = int(original_img.width * scale_factor)
-                new_height = int(original_img.height * scale_factor)
-                scaled_img = original_img.resize((new_width, new_height),
-                                                 Image.LANCZOS)
+            x, y = self.canvas.coords(canvas_id)[:2]
+            width, height = signature['display_size']
+            box = (x - 3, y - 3, x + width + 3, y + height + 3)
+            if self.selection_frame:
+                self.canvas.coords(self.selection_frame, *box)
+                self.canvas.tag_raise(self.selection_frame)
             else:
-                scaled_img = original_img
-
-            signature['image'] = scaled_img
-            signature_tk = ImageTk.PhotoImage(scaled_img)
-            signature['tk_image'] = signature_tk
-
-            # 更新Canvas圖片，保持位置
-            self.canvas.itemconfig(canvas_id, image=signature_tk)
-
-            # 更新選中框
-            if signature == self.selected_signature:
-                self._update_selection_visual()
-
-            self.log_callback(f"簽名 {signature['id']} 縮放更新完成", "info")
-
+                self.selection_frame = self.canvas.create_rectangle(
+                    *box,
+                    outline="red",
+                    width=2,
+                    dash=(5, 5),
+                    tags="selection_frame")
         except Exception as e:
-            self.log_callback(f"更新簽名縮放失敗：{str(e)}", "error")
-
-    def _bind_signature_drag(self, signature):
-        """綁定簽名拖曳事件"""
-        signature_tag = f"signature_{signature['id']}"
-
-        def on_click(event):
-            # 選中這個簽名
-            self.selected_signature = signature
-            self._redraw_signatures()  # 重繪以顯示選中框
-            self._update_selected_info()
-            self.log_callback(
-                f"已選中簽名 {signature['id']} 在坐標 ({event.x}, {event.y})", "info")
-
-            # 確保Canvas獲得焦點以接收鍵盤事件
-            self.canvas.focus_set()
-
-            # 強制設定焦點到視窗
-            self.focus_force()
-
-            # 設定拖曳起始點
-            signature['drag_start_x'] = event.x
-            signature['drag_start_y'] = event.y
-            signature['dragging'] = True
-
-        def on_drag(event):
-            if signature.get('dragging', False):
-                # 計算移動距離
-                dx = event.x - signature['drag_start_x']
-                dy = event.y - signature['drag_start_y']
-
-                # 移動簽名圖片
-                self.canvas.move(signature_tag, dx, dy)
-
-                # 如果有選中框，也移動選中框的所有元素
-                if 'frame_id' in signature:
-                    # 找到所有與此簽名相關的選中框元素並移動
-                    frame_items = self.canvas.find_withtag(
-                        f"{signature_tag}_frame")
-                    for item in frame_items:
-                        self.canvas.move(item, dx, dy)
-
-                # 更新拖曳起始點
-                signature['drag_start_x'] = event.x
-                signature['drag_start_y'] = event.y
-
-        def on_release(event):
-            if signature.get('dragging', False):
-                signature['dragging'] = False
-
-                # 更新簽名的實際位置
-                try:
-                    coords = self.canvas.coords(signature['canvas_id'])
-                    if coords and len(coords) >= 2:
-                        # 獲取 PDF 頁面位置
-                        page_bbox = self.canvas.bbox("page")
-                        if page_bbox:
-                            page_left, page_top = page_bbox[0], page_bbox[1]
-                            # 更新相對於PDF的位置（確保精確性）
-                            pdf_x = (coords[0] - page_left) / self.scale
-                            pdf_y = (coords[1] - page_top) / self.scale
-
-                            # 驗證PDF坐標的合理性
-                            page = self.pdf.load_page(signature['page'])
-                            page_rect = page.rect
-                            pdf_width, pdf_height = page_rect.width, page_rect.height
-
-                            # 確保坐標在PDF範圍內
-                            signature['x'] = max(
-                                0,
-                                min(pdf_x,
-                                    pdf_width - signature['image'].width))
-                            signature['y'] = max(
-                                0,
-                                min(pdf_y,
-                                    pdf_height - signature['image'].height))
-
-                            self.log_callback(
-                                f"簽名移動到 PDF坐標 ({signature['x']:.1f}, {signature['y']:.1f})",
-                                "info")
-                except Exception as e:
-                    self.log_callback(f"更新位置失敗：{str(e)}", "error")
-
-        # 綁定滑鼠事件到簽名圖片
-        self.canvas.tag_bind(signature_tag, "<Button-1>", on_click)
-        self.canvas.tag_bind(signature_tag, "<B1-Motion>", on_drag)
-        self.canvas.tag_bind(signature_tag, "<ButtonRelease-1>", on_release)
-
-        # 同時綁定到簽名對應的canvas_id
-        self.canvas.tag_bind(signature_id, "<Button-1>", on_click)
-        self.canvas.tag_bind(signature_id, "<B1-Motion>", on_drag)
-        self.canvas.tag_bind(signature_id, "<ButtonRelease-1>", on_release)
-
-        # 調試：輸出綁定信息
-        self.log_callback(
-            f"已綁定簽名 {signature['id']} 的事件，標籤：{signature_tag}, ID：{signature_id}",
-            "info")
-
-        # 設定游標
-        def on_enter(event):
-            self.canvas.config(cursor="hand2")
-
-        def on_leave(event):
-            self.canvas.config(cursor="arrow")
-
-        self.canvas.tag_bind(signature_tag, "<Enter>", on_enter)
-        self.canvas.tag_bind(signature_tag, "<Leave>", on_leave)
-        self.canvas.tag_bind(signature_id, "<Enter>", on_enter)
-        self.canvas.tag_bind(signature_id, "<Leave>", on_leave)
+            self.log_callback(f"更新選中框失敗：{str(e)}", "error")
 
     def _scale_selected_signature(self, scale_factor):
         """縮放選中的簽名"""
@@ -4815,9 +7672,11 @@ class SignEditor(tk.Toplevel):
         # 限制縮放範圍
         if 0.1 <= new_scale <= 5.0:
             signature['scale_factor'] = new_scale
-            self._update_signature_scale_only(signature)
+            self._draw_signature_on_canvas(signature, fast=True)
+            self._update_selection_visual()
             self._update_selected_info()
-            self.log_callback(f"簽名已縮放到 {new_scale:.1f}x", "info")
+            if log_enabled("debug"):
+                self.log_callback(f"簽名已縮放到 {new_scale:.1f}x", "debug")
         else:
             messagebox.showwarning("警告", "縮放範圍限制在 0.1x 到 5.0x 之間")
 
@@ -4828,7 +7687,8 @@ class SignEditor(tk.Toplevel):
             return
 
         self.selected_signature['scale_factor'] = 1.0
-        self._update_signature_scale_only(self.selected_signature)
+        self._draw_signature_on_canvas(self.selected_signature)
+        self._update_selection_visual()
         self._update_selected_info()
         self.log_callback("簽名大小已重設", "info")
 
@@ -4840,16 +7700,11 @@ class SignEditor(tk.Toplevel):
 
                 # 清除Canvas上的所有簽名相關項目
                 for sig in self.signatures:
-                    if 'canvas_id' in sig:
-                        self.canvas.delete(sig['canvas_id'])
-                    if 'frame_id' in sig:
-                        self.canvas.delete(sig['frame_id'])
-
-                # 清除所有以sig_開頭的標籤
-                self.canvas.delete("sig_*")
+                    self._remove_signature_items(sig)
 
                 self.signatures.clear()
                 self.selected_signature = None
+                self._update_selection_visual()
                 self._update_selected_info()
                 self.log_callback("已清除所有簽名", "success")
                 self.status_label.config(text="簽名已清除 - 請重新添加簽名",
@@ -4863,6 +7718,11 @@ class SignEditor(tk.Toplevel):
             messagebox.showwarning("警告", "請先添加簽名")
             return
 
+        # 確保快速縮放中的簽名已產生最終圖片
+        if self._signature_refine_job:
+            self.after_cancel(self._signature_refine_job)
+            self._refine_signatures()
+
         save_path = filedialog.asksaveasfilename(title="儲存簽名後的 PDF",
                                                  defaultextension=".pdf",
                                                  filetypes=[("PDF 檔案", "*.pdf")
@@ -4875,66 +7735,67 @@ class SignEditor(tk.Toplevel):
             self.status_label.config(text="正在儲存 PDF...",
                                      fg=self.colors['warning'])
 
-            # 建立暫存目錄
-            temp_dir = "temp_signatures"
-            os.makedirs(temp_dir, exist_ok=True)
-
-            # 為每個簽名建立暫存圖片
-            for i, signature in enumerate(self.signatures):
-                temp_path = os.path.join(temp_dir, f"signature_{i}.png")
-                # 使用當前顯示的圖片（已縮放的）
-                signature['image'].save(temp_path)
-                signature['temp_path'] = temp_path
-
-            # 將簽名插入到 PDF
-            for signature in self.signatures:
-                page = self.pdf.load_page(signature['page'])
-
-                # 使用實際的縮放後圖片大小
-                actual_img = signature['image']  # 這已經是縮放後的圖片
-                img_width, img_height = actual_img.size
-
-                # 記錄詳細信息用於調試
-                self.log_callback(
-                    f"保存簽名 {signature['id']}: 位置=({signature['x']:.1f}, {signature['y']:.1f}), "
-                    f"尺寸=({img_width}, {img_height}), 類型={signature['type']}",
-                    "info")
-
-                # 簽名矩形 - 使用實際圖片尺寸和PDF坐標
-                rect = fitz.Rect(signature['x'], signature['y'],
-                                 signature['x'] + img_width,
-                                 signature['y'] + img_height)
-
-                # 驗證矩形位置是否在頁面範圍內
-                page_rect = page.rect
-                if (rect.x0 < 0 or rect.y0 < 0 or rect.x1 > page_rect.width
-                        or rect.y1 > page_rect.height):
-                    self.log_callback(f"警告：簽名 {signature['id']} 超出頁面範圍，將調整位置",
-                                      "warning")
-                    # 調整矩形位置確保在頁面內
-                    rect.x0 = max(0, min(rect.x0, page_rect.width - img_width))
-                    rect.y0 = max(0, min(rect.y0,
-                                         page_rect.height - img_height))
-                    rect.x1 = rect.x0 + img_width
-                    rect.y1 = rect.y0 + img_height
-
-                # 插入簽名圖片
-                page.insert_image(rect,
-                                  filename=signature['temp_path'],
-                                  keep_proportion=True,
-                                  overlay=True)
-
-            # 儲存 PDF
-            self.pdf.save(save_path)
-
-            # 清理暫存檔案
-            for signature in self.signatures:
-                if 'temp_path' in signature and os.path.exists(
-                        signature['temp_path']):
-                    os.remove(signature['temp_path'])
+            with track_operation("sign", [self.pdf_path],
+                                 pages=len(self.pdf),
+                                 signatures=len(self.signatures),
+                                 output_paths=[save_path]) as op:
+                # 將簽名插入到 PDF（相同圖片只嵌入一次）
+                image_xrefs = {}
+                for signature in self.signatures:
+                    page = self.pdf.load_page(signature['page'])
+
+                    # 使用實際的縮放後圖片大小
+                    actual_img = signature['image']  # 這已經是縮放後的圖片
+                    img_width, img_height = actual_img.size
+
+                    # 記錄詳細信息用於調試
+                    if log_enabled("debug"):
+                        self.log_callback(
+                            f"保存簽名 {signature['id']}: 位置=({signature['x']:.1f}, {signature['y']:.1f}), "
+                            f"尺寸=({img_width}, {img_height}), 類型={signature['type']}",
+                            "debug")
+
+                    # 簽名矩形 - 使用實際圖片尺寸和PDF坐標
+                    rect = fitz.Rect(signature['x'], signature['y'],
+                                     signature['x'] + img_width,
+                                     signature['y'] + img_height)
+
+                    # 驗證矩形位置是否在頁面範圍內
+                    page_rect = page.rect
+                    if (rect.x0 < 0 or rect.y0 < 0 or rect.x1 > page_rect.width
+                            or rect.y1 > page_rect.height):
+                        self.log_callback(f"警告：簽名 {signature['id']} 超出頁面範圍，將調整位置",
+                                          "warning")
+                        # 調整矩形位置確保在頁面內
+                        rect.x0 = max(0, min(rect.x0,
+                                             page_rect.width - img_width))
+                        rect.y0 = max(0, min(rect.y0,
+                                             page_rect.height - img_height))
+                        rect.x1 = rect.x0 + img_width
+                        rect.y1 = rect.y0 + img_height
+
+                    # 手寫簽名畫成向量路徑，其餘插入圖片
+                    if signature.get('strokes'):
+                        with perf_span("insert"):
+                            draw_handwriting(
+                                page, rect, signature['strokes'],
+                                signature['stroke_width'],
+                                signature.get('scale_factor', 1.0))
+                    else:
+                        insert_signature_image(page, rect, actual_img,
+                                               image_xrefs)
+
+                # 儲存 PDF
+                started = time.perf_counter()
+                incremental = self._write_pdf(save_path)
+                op["incremental"] = incremental
+            self.log_callback(
+                f"{'增量' if incremental else '完整'}儲存耗時 "
+                f"{time.perf_counter() - started:.2f} 秒", "info")
 
-            if os.path.exists(temp_dir):
-                os.rmdir(temp_dir)
+            # 頁面內容已包含簽名，快取的頁面圖片不再有效
+            self.page_cache.clear()
+            self.renderer.reopen(save_path)
 
             self.status_label.config(text="PDF 儲存成功",
                                      fg=self.colors['success'])
@@ -4952,15 +7813,317 @@ class SignEditor(tk.Toplevel):
             self.log_callback(error_msg, "error")
             messagebox.showerror("錯誤", error_msg)
 
+    def _save_layout(self):
+        """將目前的簽名位置存成版面檔，供批次套用到其他檔案"""
+        if not self.signatures:
+            messagebox.showwarning("警告", "請先添加簽名")
+            return
+
+        layout_path = filedialog.asksaveasfilename(
+            title="儲存簽名版面",
+            defaultextension=".json",
+            filetypes=[("簽名版面", "*.json")])
+        if not layout_path:
+            return
+
+        try:
+            save_signature_layout(layout_path, self.signatures, len(self.pdf))
+            self.log_callback(f"簽名版面已儲存：{layout_path}", "success")
+            messagebox.showinfo(
+                "完成", "簽名版面已儲存！\n"
+                "最後一頁的簽名會套用到每個檔案的最後一頁，其餘依頁碼套用。")
+        except Exception as e:
+            error_msg = f"儲存簽名版面失敗：{str(e)}"
+            self.log_callback(error_msg, "error")
+            messagebox.showerror("錯誤", error_msg)
+
+    def _write_pdf(self, save_path):
+        """寫出 PDF；回傳是否使用增量儲存
+
+        覆寫原檔時以增量更新只在檔尾附加變更的物件，保留原有版本且不必
+        重寫未變更的內容；另存新檔則完整寫出。
+        """
+        source_path = self.pdf.name
+        overwrite = (os.path.exists(save_path)
+                     and os.path.samefile(save_path, source_path))
+        if not overwrite:
+            with perf_span("save"):
+                self.pdf.save(save_path)
+            return False
+
+        if not self.incremental_save.get():
+            raise ValueError("覆寫原檔需使用增量儲存，請勾選「覆寫原檔時增量儲存」或另存新檔")
+        if not self.pdf.can_save_incrementally():
+            raise ValueError("此檔案無法增量儲存（可能已損毀修復或加密），請另存新檔")
+        with perf_span("save"):
+            self.pdf.save(source_path,
+                          incremental=True,
+                          encryption=fitz.PDF_ENCRYPT_KEEP)
+        return True
+
     def destroy(self):
         """關閉編輯器時清理資源"""
         try:
+            for job in (self._tile_job, self._resize_job,
+                        self._resize_preview_job, self._signature_refine_job):
+                if job:
+                    self.after_cancel(job)
+            self.renderer.close()
             self.pdf.close()
         except:
             pass
         super().destroy()
 
 
+class BatchSignDialog(tk.Toplevel):
+    """以簽名版面批次簽署多個 PDF"""
+
+    def __init__(self, parent, pdf_files, log_callback=None):
+        super().__init__(parent)
+        self.pdf_files = pdf_files
+        self.log_callback = log_callback or (lambda msg, level: None)
+        self.is_running = False
+        self.layout_path = None
+
+        self.title("批次簽名")
+        self.geometry("480x360")
+        self.resizable(False, False)
+        self.configure(bg='#F8F9FA')
+
+        # 置中顯示
+        self.transient(parent)
+        self.grab_set()
+
+        # 色系配置
+        self.colors = {
+            'bg_main': '#F5F5F0',
+            'bg_panel': '#FDFDF2',
+            'primary': '#4D6FAC',
+            'success': '#4A6741',
+            'danger': '#B22222',
+            'fg_primary': '#2C2C2C'
+        }
+
+        self.setup_ui()
+        self.protocol("WM_DELETE_WINDOW", self._on_close_request)
+
+    def setup_ui(self):
+        """設置使用者介面"""
+        main_frame = tk.Frame(self, bg=self.colors['bg_main'])
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+
+        tk.Label(main_frame,
+                 text="批次套用簽名版面",
+                 bg=self.colors['bg_main'],
+                 fg=self.colors['fg_primary'],
+                 font=("Microsoft YaHei", 16, "bold")).pack(pady=(0, 15))
+
+        tk.Label(main_frame,
+                 text=f"將簽署 {len(self.pdf_files)} 個檔案，輸出檔名加上 _signed",
+                 bg=self.colors['bg_main'],
+                 fg=self.colors['fg_primary'],
+                 font=("Microsoft YaHei", 10)).pack(anchor="w")
+
+        layout_frame = tk.LabelFrame(main_frame,
+                                     text="簽名版面",
+                                     bg=self.colors['bg_panel'],
+                                     fg=self.colors['fg_primary'],
+                                     font=("Microsoft YaHei", 12, "bold"))
+        layout_frame.pack(fill="x", pady=15)
+
+        tk.Button(layout_frame,
+                  text="選擇版面檔...",
+                  command=self.select_layout,
+                  bg=self.colors['primary'],
+                  fg="white",
+                  font=("Microsoft YaHei", 10)).pack(side="left",
+                                                     padx=10,
+                                                     pady=10)
+
+        self.layout_label = tk.Label(layout_frame,
+                                     text="未選擇版面（在簽名編輯器中「儲存版面」產生）",
+                                     bg=self.colors['bg_panel'],
+                                     fg=self.colors['fg_primary'],
+                                     font=("Microsoft YaHei", 9),
+                                     wraplength=260,
+                                     justify="left")
+        self.layout_label.pack(side="left", padx=(0, 10))
+
+        # 進度顯示
+        progress_frame = tk.Frame(main_frame, bg=self.colors['bg_main'])
+        progress_frame.pack(fill="x", pady=(15, 0))
+
+        self.progress = ttk.Progressbar(progress_frame, mode='determinate')
+        self.progress.pack(fill="x")
+
+        self.progress_label = tk.Label(progress_frame,
+                                       text="",
+                                       bg=self.colors['bg_main'],
+                                       fg="black")
+        self.progress_label.pack(pady=5)
+
+        # 按鈕區域
+        btn_frame = tk.Frame(main_frame, bg=self.colors['bg_main'])
+        btn_frame.pack(fill="x", pady=(5, 0))
+
+        self.start_btn = tk.Button(btn_frame,
+                                   text="開始簽名",
+                                   command=self.start_batch,
+                                   bg=self.colors['success'],
+                                   fg="white",
+                                   font=("Microsoft YaHei", 12, "bold"),
+                                   width=15)
+        self.start_btn.pack(side="right", padx=(5, 0))
+
+        self.cancel_btn = tk.Button(btn_frame,
+                                    text="取消",
+                                    command=self._on_close_request,
+                                    bg=self.colors['danger'],
+                                    fg="white",
+                                    font=("Microsoft YaHei", 12, "bold"),
+                                    width=10)
+        self.cancel_btn.pack(side="right")
+
+    def select_layout(self):
+        """選擇簽名版面檔"""
+        layout_path = filedialog.askopenfilename(
+            title="選擇簽名版面", filetypes=[("簽名版面", "*.json")])
+        if layout_path:
+            self.layout_path = layout_path
+            self.layout_label.config(text=os.path.basename(layout_path))
+
+    def start_batch(self):
+        """開始批次簽名"""
+        if not self.layout_path:
+            messagebox.showwarning("警告", "請先選擇簽名版面")
+            return
+
+        try:
+            # 圖片在這裡解碼、縮放並編碼一次，整批檔案共用
+            layout = load_signature_layout(self.layout_path)
+        except Exception as e:
+            messagebox.showerror("錯誤", f"讀取簽名版面失敗：{str(e)}")
+            return
+
+        output_dir = filedialog.askdirectory(title="選擇簽名檔案的儲存目錄")
+        if not output_dir:
+            return
+
+        # 同名檔案加上序號，避免平行輸出互相覆蓋
+        jobs = []
+        used_names = set()
+        for pdf_file in self.pdf_files:
+            base_name = os.path.splitext(os.path.basename(pdf_file['path']))[0]
+            file_name = f"{base_name}_signed.pdf"
+            counter = 2
+            while file_name.lower() in used_names:
+                file_name = f"{base_name}_signed_{counter}.pdf"
+                counter += 1
+            used_names.add(file_name.lower())
+            jobs.append((pdf_file['path'], os.path.join(output_dir, file_name)))
+
+        self.is_running = True
+        self.start_btn.config(state="disabled")
+        self.cancel_btn.config(state="disabled")
+        self.progress.config(maximum=len(jobs), value=0)
+        self.progress_label.config(text=f"正在處理 0 / {len(jobs)} 個檔案...")
+
+        threading.Thread(target=self._do_batch,
+                         args=(jobs, layout, output_dir),
+                         daemon=True).start()
+
+    def _do_batch(self, jobs, layout, output_dir):
+        """平行簽署所有檔案（在背景執行緒中）"""
+        started = time.perf_counter()
+        failures = []
+        completed = [0]
+
+        def on_result(job, result, error):
+            completed[0] += 1
+            name = os.path.basename(job[0])
+            if error is None and result[0] == 0:
+                error = ValueError("沒有符合版面的頁面")
+            if error:
+                failures.append((name, error))
+            self.after(0, lambda n=completed[0], nm=name, r=result, e=error:
+                       self._update_progress(n, len(jobs), nm, r, e))
+
+        page_counts = {f['path']: f.get('pages', 0) for f in self.pdf_files}
+        try:
+            with track_operation(
+                    "batch_sign", [job[0] for job in jobs],
+                    pages=sum(page_counts.get(job[0], 0) for job in jobs),
+                    output_paths=[job[1] for job in jobs]) as op:
+                run_process_pool(_batch_sign_worker,
+                                 jobs,
+                                 initializer=_init_batch_sign_worker,
+                                 initargs=(layout, ),
+                                 on_result=on_result,
+                                 min_tasks=2)
+                op["failures"] = len(failures)
+            total_time = time.perf_counter() - started
+            self.after(0, lambda: self._batch_complete(
+                len(jobs), failures, output_dir, total_time))
+        except Exception as e:
+            self.after(0, lambda err=e: self._batch_error(err))
+
+    def _update_progress(self, completed, total, name, result, error):
+        """更新進度（主執行緒）"""
+        self.progress['value'] = completed
+        self.progress_label.config(text=f"正在處理 {completed} / {total} 個檔案...")
+        if error:
+            self.log_callback(f"簽署 {name} 失敗：{str(error)}", "error")
+        else:
+            count, elapsed = result
+            self.log_callback(f"已簽署：{name}（{count} 個簽名，{elapsed:.2f} 秒）",
+                              "success")
+
+    def _batch_complete(self, total, failures, output_dir, total_time):
+        """批次簽名完成（主執行緒）"""
+        self.is_running = False
+        success_count = total - len(failures)
+        self.log_callback(
+            f"批次簽名完成：{success_count} / {total} 個檔案，耗時 {total_time:.2f} 秒",
+            "success" if not failures else "warning")
+
+        if success_count == 0:
+            self.start_btn.config(state="normal")
+            self.cancel_btn.config(state="normal")
+            self.progress_label.config(text="")
+            messagebox.showerror("錯誤", "沒有檔案成功簽署")
+            return
+
+        if failures:
+            failed_names = "\n".join(name for name, _ in failures[:10])
+            messagebox.showwarning(
+                "部分失敗",
+                f"成功簽署 {success_count} 個檔案，{len(failures)} 個失敗：\n"
+                f"{failed_names}\n檔案已儲存到：{output_dir}")
+        else:
+            messagebox.showinfo(
+                "完成", f"成功簽署 {success_count} 個檔案！\n檔案已儲存到：{output_dir}")
+        self.destroy()
+
+    def _batch_error(self, exception):
+        """批次簽名錯誤（主執行緒）"""
+        self.is_running = False
+        self.start_btn.config(state="normal")
+        self.cancel_btn.config(state="normal")
+        self.progress_label.config(text="")
+        error_msg = f"批次簽名失敗：{str(exception)}"
+        self.log_callback(error_msg, "error")
+        messagebox.showerror("錯誤", error_msg)
+
+    def _on_close_request(self):
+        """關閉視窗請求"""
+        if self.is_running:
+            messagebox.showinfo("提示", "批次簽名處理中，請等待完成")
+            return
+        self.destroy()
+
+
 if __name__ == "__main__":
+    # 打包後的執行檔需要此呼叫才能啟動程序池的工作程序
+    multiprocessing.freeze_support()
     app = PDFToolkit()
     app.run()
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF Toolkit 效能基準測試
+以 PyMuPDF 在本機產生固定內容的測試文件，量測合併、拆分、壓縮、浮水印、
+縮圖與簽名的耗時、吞吐量與記憶體峰值，結果寫成 JSON 供不同版本比較。
+
+用法：
+    python benchmark.py                    # 完整測試，結果存到 benchmarks/results
+    python benchmark.py --quick            # 縮小規模的快速測試
+    python benchmark.py --corpus text,huge --operation merge,compress
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import statistics
+import shutil
+import argparse
+import platform
+import subprocess
+import tempfile
+import io
+from datetime import datetime
+
+import fitz  # PyMuPDF
+from PIL import Image, ImageDraw, __version__ as PIL_VERSION
+
+BENCHMARK_SCHEMA_VERSION = 1
+# 測試文件的產生方式改變時遞增，不同版本的結果不可直接比較
+CORPUS_VERSION = 1
+
+BENCHMARK_DIR = "benchmarks"
+QUICK_SCALE = 0.2  # --quick 時頁數與檔案數的比例
+
+# 測試文件：檔案數、每個檔案的頁數與內容種類
+CORPORA = {
+    "text": {"files": 1, "pages": 200, "kind": "text"},
+    "scanned": {"files": 1, "pages": 30, "kind": "scanned"},
+    "vector": {"files": 1, "pages": 20, "kind": "vector"},
+    "small_files": {"files": 200, "pages": 1, "kind": "text"},
+    "huge": {"files": 1, "pages": 1000, "kind": "mixed"},
+}
+OPERATIONS = ("merge", "split", "compress", "watermark", "thumbnail", "sign")
+
+SPLIT_PAGES = 10  # 拆分測試每個檔案的頁數
+PAGE_SIZE = (595, 842)  # A4（點）
+SCAN_SIZE = (1240, 1754)  # A4 以 150 DPI 掃描的像素
+MIXED_IMAGE_INTERVAL = 10  # 混合文件每隔幾頁放一張掃描圖片
+
+WORDS = ("pdf document page merge split compress watermark signature "
+         "toolkit report invoice contract annual review summary section "
+         "table figure appendix chapter total amount date approved").split()
+
+
+def corpus_spec(name, quick=False):
+    """取得測試文件的規格（--quick 時縮小規模）"""
+    spec = dict(CORPORA[name])
+    if quick:
+        if spec["files"] > 1:
+            spec["files"] = max(int(spec["files"] * QUICK_SCALE), 2)
+        else:
+            spec["pages"] = max(int(spec["pages"] * QUICK_SCALE), 2)
+    return spec
+
+
+def corpus_dir(root, name, quick=False):
+    spec = corpus_spec(name, quick)
+    return os.path.join(
+        root, f"{name}_{spec['files']}x{spec['pages']}_v{CORPUS_VERSION}")
+
+
+# ---- 測試文件產生 ----
+
+def _text_page(doc, rng):
+    """文字密集的頁面"""
+    page = doc.new_page(width=PAGE_SIZE[0], height=PAGE_SIZE[1])
+    lines = []
+    for _ in range(70):
+        lines.append(" ".join(rng.choice(WORDS) for _ in range(14)))
+    page.insert_textbox(fitz.Rect(40, 40, PAGE_SIZE[0] - 40,
+                                  PAGE_SIZE[1] - 40),
+                        "\n".join(lines),
+                        fontsize=8,
+                        fontname="helv")
+    return page
+
+
+def _scan_image(rng):
+    """模擬掃描頁面的 JPEG：帶雜訊的紙張底色與文字列"""
+    width, height = SCAN_SIZE
+    # 雜訊以四分之一解析度產生再放大，接近掃描器的顆粒感
+    # （Random.randbytes 需 Python 3.9，以 getrandbits 產生相同的位元組）
+    size = width // 4 * height // 4
+    noise = Image.frombytes("L", (width // 4, height // 4),
+                            rng.getrandbits(8 * size).to_bytes(size, "little"))
+    image = noise.resize(SCAN_SIZE, Image.BILINEAR).point(
+        lambda v: 225 + v // 10)
+    draw = ImageDraw.Draw(image)
+    y = 120
+    while y < height - 120:
+        x = 100
+        while x < width - 100:
+            word = rng.randint(20, 110)
+            draw.rectangle((x, y, min(x + word, width - 100), y + 14),
+                           fill=rng.randint(20, 70))
+            x += word + rng.randint(10, 20)
+        y += rng.randint(26, 34)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=75)
+    return buffer.getvalue()
+
+
+def _scanned_page(doc, rng):
+    page = doc.new_page(width=PAGE_SIZE[0], height=PAGE_SIZE[1])
+    page.insert_image(page.rect, stream=_scan_image(rng))
+    return page
+
+
+def _vector_page(doc, rng):
+    """大量線段與曲線的向量圖頁面"""
+    page = doc.new_page(width=PAGE_SIZE[0], height=PAGE_SIZE[1])
+    shape = page.new_shape()
+
+    def point():
+        return fitz.Point(rng.uniform(20, PAGE_SIZE[0] - 20),
+                          rng.uniform(20, PAGE_SIZE[1] - 20))
+
+    for _ in range(30):
+        for _ in range(100):
+            shape.draw_line(point(), point())
+        shape.finish(color=(rng.random(), rng.random(), rng.random()),
+                     width=0.3)
+    for _ in range(30):
+        for _ in range(10):
+            shape.draw_bezier(point(), point(), point(), point())
+        shape.finish(color=(0, 0, 0), width=0.5)
+    shape.commit()
+    return page
+
+
+def _mixed_page(doc, rng, index):
+    if index % MIXED_IMAGE_INTERVAL == 0:
+        return _scanned_page(doc, rng)
+    return _text_page(doc, rng)
+
+
+def generate_corpus(root, name, quick=False):
+    """產生測試文件（內容由固定亂數種子決定）；已存在時直接回傳檔案列表"""
+    spec = corpus_spec(name, quick)
+    directory = corpus_dir(root, name, quick)
+    marker = os.path.join(directory, "complete")
+    paths = [os.path.join(directory, f"{name}_{index:04d}.pdf")
+             for index in range(spec["files"])]
+    if os.path.exists(marker):
+        return paths
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    rng = random.Random(f"{name}-{CORPUS_VERSION}")
+    for path in paths:
+        doc = fitz.open()
+        for index in range(spec["pages"]):
+            if spec["kind"] == "text":
+                _text_page(doc, rng)
+            elif spec["kind"] == "scanned":
+                _scanned_page(doc, rng)
+            elif spec["kind"] == "vector":
+                _vector_page(doc, rng)
+            else:
+                _mixed_page(doc, rng, index)
+        doc.save(path, garbage=3, deflate=True)
+        doc.close()
+    with open(marker, "w", encoding="utf-8") as f:
+        f.write(datetime.now().isoformat())
+    return paths
+
+
+# ---- 測試項目（在子程序中執行） ----
+
+def _benchmark_layout(app):
+    """簽名測試用的版面：每頁一個圖片簽名，最後一頁一個手寫簽名"""
+    image = Image.new("RGBA", (200, 80), (255, 255, 255, 0))
+    draw = ImageDraw.Draw(image)
+    draw.line((10, 60, 60, 15, 110, 55, 160, 20, 190, 50),
+              fill=(0, 0, 160, 255), width=4)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+
+    stroke = [(x, 40 + 25 * ((x // 15) % 2)) for x in range(0, 200, 5)]
+    strokes, width, preview = app.prepare_handwriting([stroke])
+    return {
+        'images': [buffer.getvalue()],
+        'stamps': [
+            {'image': 0, 'page': "all", 'rect': (380, 740, 580, 820)},
+            {'strokes': strokes, 'stroke_width': width, 'scale': 1.0,
+             'page': "last",
+             'rect': (40, 740, 40 + preview.width, 740 + preview.height)},
+        ]
+    }
+
+
+WATERMARK_SETTINGS = {
+    'type': "text",
+    'text': "CONFIDENTIAL",
+    'font_size': 48,
+    'opacity': 0.3,
+    'position': "center",
+    'image_path': None,
+    'font_name': "helv",
+    'font_file': None,
+    'rotation': 45,
+    'tiled': False
+}
+
+
+def run_operation(app, operation, paths, output_dir):
+    """執行一次測試項目，回傳輸出檔列表；不適用時回傳 None"""
+    if operation == "merge":
+        docs = [fitz.open(path) for path in paths]
+        try:
+            output_path = os.path.join(output_dir, "merged.pdf")
+            app.merge_pages([(doc, index) for doc in docs
+                             for index in range(len(doc))], output_path)
+        finally:
+            for doc in docs:
+                doc.close()
+        return [output_path]
+
+    if operation == "split":
+        outputs = []
+        for path in paths:
+            with fitz.open(path) as doc:
+                page_count = len(doc)
+            if page_count < 2:
+                continue
+            stem = os.path.splitext(os.path.basename(path))[0]
+            parts = [(start, min(start + SPLIT_PAGES, page_count) - 1,
+                      os.path.join(output_dir, f"{stem}_{start + 1}.pdf"))
+                     for start in range(0, page_count, SPLIT_PAGES)]
+            app.run_process_pool(app._split_part_worker,
+                                 parts,
+                                 initializer=app._init_split_worker,
+                                 initargs=(path, ))
+            outputs.extend(part[2] for part in parts)
+        return outputs or None
+
+    if operation == "compress":
+        outputs = []
+        for path in paths:
+            output_path = os.path.join(output_dir, os.path.basename(path))
+            with fitz.open(path) as doc:
+                app.compress_document(doc, output_path, "medium")
+            outputs.append(output_path)
+        return outputs
+
+    if operation == "watermark":
+        jobs = [(path, os.path.join(output_dir, os.path.basename(path)))
+                for path in paths]
+        app.run_process_pool(app._watermark_file_worker,
+                             jobs,
+                             initializer=app._init_watermark_worker,
+                             initargs=(WATERMARK_SETTINGS, ),
+                             min_tasks=2)
+        return [job[1] for job in jobs]
+
+    if operation == "thumbnail":
+        for path in paths:
+            with fitz.open(path) as doc:
+                for index in range(len(doc)):
+                    app.render_thumbnail(doc, index)
+        return []
+
+    if operation == "sign":
+        jobs = [(path, os.path.join(output_dir, os.path.basename(path)))
+                for path in paths]
+        app.run_process_pool(app._batch_sign_worker,
+                             jobs,
+                             initializer=app._init_batch_sign_worker,
+                             initargs=(_benchmark_layout(app), ),
+                             min_tasks=2)
+        return [job[1] for job in jobs]
+
+    raise ValueError(f"未知的測試項目：{operation}")
+
+
+def children_peak_memory_mb():
+    """已結束的子程序中最高的記憶體用量（MB）；Windows 無法取得時回傳 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    if sys.platform != "darwin":
+        peak *= 1024
+    return round(peak / (1024 * 1024), 1)
+
+
+def run_case(corpus_root, corpus, operation, quick, repeat, warmup):
+    """在目前程序中量測一個 (測試文件, 測試項目)，回傳結果字典"""
+    import app
+
+    paths = generate_corpus(corpus_root, corpus, quick)
+    pages = 0
+    for path in paths:
+        with fitz.open(path) as doc:
+            pages += len(doc)
+    input_bytes = app.total_file_size(paths)
+
+    runs = []
+    output_bytes = 0
+    stages = {}
+    for index in range(warmup + repeat):
+        output_dir = tempfile.mkdtemp(prefix="pdf_benchmark_")
+        try:
+            with app.track_operation(operation, paths) as entry:
+                outputs = run_operation(app, operation, paths, output_dir)
+                entry["output_paths"] = outputs or []
+            if outputs is None:
+                return {"corpus": corpus, "operation": operation,
+                        "skipped": "不適用於此測試文件"}
+            if index >= warmup:
+                runs.append(entry["duration_s"])
+                output_bytes = entry["output_bytes"]
+                stages = entry["stages"]
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    median = statistics.median(runs)
+    return {
+        "corpus": corpus,
+        "operation": operation,
+        "files": len(paths),
+        "pages": pages,
+        "input_bytes": input_bytes,
+        "output_bytes": output_bytes,
+        "runs_s": runs,
+        "median_s": round(median, 4),
+        "pages_per_s": round(pages / median, 1) if median else None,
+        "mb_per_s": (round(input_bytes / (1024 * 1024) / median, 2)
+                     if median else None),
+        "peak_rss_mb": app.process_peak_memory_mb(),
+        "children_peak_rss_mb": children_peak_memory_mb(),
+        "stages": stages,
+    }
+
+
+# ---- 主程序 ----
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True,
+                                text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def app_version():
+    import app
+    return app.APP_VERSION
+
+
+def environment_info():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "pymupdf": fitz.VersionBind,
+        "pillow": PIL_VERSION,
+    }
+
+
+def run_case_subprocess(args, corpus, operation):
+    """每個測試在獨立程序中執行，記憶體峰值才不會互相影響"""
+    command = [sys.executable, os.path.abspath(__file__),
+               "--run-case", corpus, operation,
+               "--corpus-dir", args.corpus_dir,
+               "--repeat", str(args.repeat),
+               "--warmup", str(args.warmup)]
+    if args.quick:
+        command.append("--quick")
+    # Windows 的管線預設使用 ANSI 字碼頁（cp1252、cp950…），中文訊息會無法
+    # 編碼或解碼；子程序的輸出一律以 UTF-8 傳回
+    env = dict(os.environ, PYTHONIOENCODING="utf-8")
+    result = subprocess.run(command, capture_output=True, text=True,
+                            encoding="utf-8", errors="replace", env=env)
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        return {"corpus": corpus, "operation": operation,
+                "error": result.stderr.strip().splitlines()[-1:]}
+    return json.loads(lines[-1])
+
+
+def split_names(value, choices, label):
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in choices]
+    if unknown:
+        raise SystemExit(f"未知的{label}：{', '.join(unknown)}"
+                         f"（可用：{', '.join(choices)}）")
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF Toolkit 效能基準測試")
+    parser.add_argument("--quick", action="store_true", help="縮小規模的快速測試")
+    parser.add_argument("--corpus", default=",".join(CORPORA),
+                        help="測試文件，以逗號分隔")
+    parser.add_argument("--operation", default=",".join(OPERATIONS),
+                        help="測試項目，以逗號分隔")
+    parser.add_argument("--repeat", type=int, default=5, help="每項量測次數")
+    parser.add_argument("--warmup", type=int, default=1, help="量測前的暖身次數")
+    parser.add_argument("--corpus-dir",
+                        default=os.path.join(BENCHMARK_DIR, "corpus"),
+                        help="測試文件存放目錄（重複使用）")
+    parser.add_argument("--output", help="結果 JSON 路徑")
+    parser.add_argument("--run-case", nargs=2, metavar=("CORPUS", "OPERATION"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        result = run_case(args.corpus_dir, *args.run_case, args.quick,
+                          args.repeat, args.warmup)
+        # 只輸出 ASCII，不受主控台或管線的編碼影響
+        print(json.dumps(result))
+        return
+
+    corpora = split_names(args.corpus, CORPORA, "測試文件")
+    operations = split_names(args.operation, OPERATIONS, "測試項目")
+
+    print("=== 產生測試文件 ===")
+    for corpus in corpora:
+        started = time.perf_counter()
+        paths = generate_corpus(args.corpus_dir, corpus, args.quick)
+        print(f"{corpus}: {len(paths)} 個檔案（{time.perf_counter() - started:.1f} 秒）")
+
+    print("\n=== 量測 ===")
+    results = []
+    for corpus in corpora:
+        for operation in operations:
+            result = run_case_subprocess(args, corpus, operation)
+            results.append(result)
+            name = f"{corpus}/{operation}"
+            if "error" in result:
+                print(f"❌ {name}: {' '.join(result['error'])}")
+            elif "skipped" in result:
+                print(f"－ {name}: {result['skipped']}")
+            else:
+                print(f"✅ {name}: 中位數 {result['median_s']:.3f} 秒，"
+                      f"{result['pages_per_s']} 頁/秒，"
+                      f"記憶體峰值 {result['peak_rss_mb']} MB")
+
+    commit = git_commit()
+    report = {
+        "schema_version": BENCHMARK_SCHEMA_VERSION,
+        "corpus_version": CORPUS_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "app_version": app_version(),
+        "quick": args.quick,
+        "repeat": args.repeat,
+        "warmup": args.warmup,
+        "environment": environment_info(),
+        "results": results,
+    }
+
+    output_path = args.output
+    if not output_path:
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = os.path.join(BENCHMARK_DIR, "results",
+                                   f"bench_{commit or 'unknown'}_{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n結果已儲存：{output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF Toolkit 效能比較工具
+比較兩組 benchmark.py 的結果，依各測試的中位數與 MAD（中位數絕對偏差）
+判斷退步或進步，輸出文字或 HTML 報告。
+
+每組可以是多個結果檔或一個目錄（目錄內所有 JSON），重複執行的量測會合併
+計算，結果越多越不受雜訊影響。
+
+用法：
+    python benchmark_compare.py baseline.json current.json
+    python benchmark_compare.py benchmarks/baseline/ current.json --html report.html
+    python benchmark_compare.py base.json cur.json --fail-on-regression
+"""
+
+import os
+import sys
+import json
+import html
+import argparse
+import statistics
+
+SUPPORTED_SCHEMA_VERSIONS = (1, )
+DEFAULT_THRESHOLD = 0.10  # 中位數變慢超過此比例才可能算退步
+DEFAULT_NOISE_FACTOR = 3.0  # 差距須超過幾倍雜訊（由 MAD 估計的標準差）
+MIN_DELTA_S = 0.01  # 差距小於此秒數一律視為持平
+MAD_TO_SIGMA = 1.4826  # 常態分布下 MAD 換算標準差的係數
+
+# 影響結果可比性的環境欄位
+ENVIRONMENT_KEYS = ("platform", "machine", "cpu_count", "python", "pymupdf")
+
+STATUS_LABELS = {
+    "regression": "退步",
+    "improvement": "進步",
+    "unchanged": "持平",
+    "new": "新增",
+    "missing": "缺少",
+    "skipped": "略過",
+    "error": "錯誤",
+}
+
+
+class IncompatibleResults(ValueError):
+    """兩組結果的測試條件不同，無法比較"""
+
+
+def _result_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name)
+                         for name in sorted(os.listdir(path))
+                         if name.lower().endswith(".json"))
+        else:
+            files.append(path)
+    if not files:
+        raise FileNotFoundError(f"找不到結果檔：{', '.join(paths)}")
+    return files
+
+
+def load_result_set(paths):
+    """讀取一組結果，合併相同 (測試文件, 測試項目) 的每次耗時"""
+    result_set = {"reports": [], "runs": {}, "errors": {}, "skipped": {}}
+    for file_path in _result_files(paths):
+        with open(file_path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        if report.get("schema_version") not in SUPPORTED_SCHEMA_VERSIONS:
+            raise IncompatibleResults(
+                f"{file_path}：不支援的結果格式版本 {report.get('schema_version')}")
+        report["path"] = file_path
+        result_set["reports"].append(report)
+        for result in report["results"]:
+            key = (result["corpus"], result["operation"])
+            if "error" in result:
+                error = result["error"]
+                result_set["errors"][key] = (" ".join(error) if isinstance(
+                    error, list) else str(error))
+            elif "skipped" in result:
+                result_set["skipped"][key] = str(result["skipped"])
+            elif "runs_s" in result:
+                result_set["runs"].setdefault(key, []).extend(
+                    result["runs_s"])
+    return result_set
+
+
+def check_compatible(baseline, current):
+    """檢查兩組結果可否比較；回傳環境差異的警告列表"""
+    warnings = []
+    reports = baseline["reports"] + current["reports"]
+    for key in ("corpus_version", "quick"):
+        values = {report.get(key) for report in reports}
+        if len(values) > 1:
+            raise IncompatibleResults(f"測試條件不同（{key}：{sorted(map(str, values))}）")
+    for key in ENVIRONMENT_KEYS:
+        values = {str(report["environment"].get(key)) for report in reports}
+        if len(values) > 1:
+            warnings.append(f"執行環境不同（{key}：{', '.join(sorted(values))}）")
+    return warnings
+
+
+def median_and_mad(values):
+    median = statistics.median(values)
+    return median, statistics.median(abs(value - median) for value in values)
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD,
+                    noise_factor=DEFAULT_NOISE_FACTOR,
+                    min_delta=MIN_DELTA_S):
+    """逐項比較，回傳每個 (測試文件, 測試項目) 的比較結果
+
+    變慢超過 threshold 比例、差距超過 noise_factor 倍雜訊且大於 min_delta
+    才算退步；進步的判斷方式相同。雜訊取兩組中較大的 MAD 換算的標準差。
+    目前結果略過（不適用）的項目記為 skipped，基準有量測時則記為 missing。
+    """
+    keys = sorted(set(baseline["runs"]) | set(current["runs"])
+                  | set(current["errors"]) | set(current["skipped"]))
+    rows = []
+    for key in keys:
+        row = {"corpus": key[0], "operation": key[1]}
+        base_runs = baseline["runs"].get(key)
+        current_runs = current["runs"].get(key)
+        if key in current["errors"] and not current_runs:
+            row.update(status="error", detail=current["errors"][key])
+        elif key in current["skipped"] and not current_runs:
+            row.update(status="missing" if base_runs else "skipped",
+                       detail=current["skipped"][key])
+        elif not base_runs:
+            row.update(status="new")
+        elif not current_runs:
+            row.update(status="missing")
+        if "status" in row:
+            rows.append(row)
+            continue
+
+        base_median, base_mad = median_and_mad(base_runs)
+        current_median, current_mad = median_and_mad(current_runs)
+        delta = current_median - base_median
+        noise = MAD_TO_SIGMA * max(base_mad, current_mad)
+        change = delta / base_median if base_median else 0.0
+        significant = (abs(delta) > noise_factor * noise
+                       and abs(delta) > min_delta)
+        if significant and change > threshold:
+            status = "regression"
+        elif significant and change < -threshold:
+            status = "improvement"
+        else:
+            status = "unchanged"
+        row.update(status=status,
+                   base_median=base_median,
+                   current_median=current_median,
+                   change=change,
+                   noise=noise,
+                   base_runs=len(base_runs),
+                   current_runs=len(current_runs))
+        rows.append(row)
+    return rows
+
+
+def _describe(result_set):
+    commits = sorted({str(report.get("commit")) for report in
+                      result_set["reports"]})
+    return f"commit {', '.join(commits)}，{len(result_set['reports'])} 個結果檔"
+
+
+def _summary(rows):
+    counts = {status: 0 for status in STATUS_LABELS}
+    for row in rows:
+        counts[row["status"]] += 1
+    return "、".join(f"{counts[status]} 項{label}"
+                    for status, label in STATUS_LABELS.items()
+                    if counts[status] or status in ("regression", "unchanged"))
+
+
+def format_text_report(rows, baseline, current, warnings, threshold,
+                       noise_factor, min_delta):
+    lines = [
+        "效能比較",
+        f"  基準：{_describe(baseline)}",
+        f"  目前：{_describe(current)}",
+        f"  門檻：慢 {threshold:.0%} 以上，且差距超過 {noise_factor:g} 倍雜訊與 "
+        f"{min_delta * 1000:.0f} ms",
+    ]
+    lines += [f"  ⚠️ {warning}" for warning in warnings]
+    lines += ["", f"{'狀態':<4} {'測試':<24} {'基準(s)':>9} {'目前(s)':>9} "
+              f"{'變化':>8} {'雜訊(s)':>8}"]
+    for row in rows:
+        name = f"{row['corpus']}/{row['operation']}"
+        label = STATUS_LABELS[row["status"]]
+        if "base_median" not in row:
+            lines.append(f"{label:<4} {name:<24} {row.get('detail', '')}")
+            continue
+        lines.append(f"{label:<4} {name:<24} {row['base_median']:>9.3f} "
+                     f"{row['current_median']:>9.3f} {row['change']:>+8.1%} "
+                     f"{row['noise']:>8.3f}")
+    lines += ["", f"結果：{_summary(rows)}"]
+    return "\n".join(lines)
+
+
+def format_html_report(rows, baseline, current, warnings, threshold,
+                       noise_factor, min_delta):
+    colors = {"regression": "#F8D7DA", "improvement": "#D4EDDA",
+              "error": "#F8D7DA", "missing": "#FFF3CD", "new": "#E8F2F5"}
+    body = []
+    for row in rows:
+        cells = [STATUS_LABELS[row["status"]],
+                 f"{row['corpus']}/{row['operation']}"]
+        if "base_median" in row:
+            cells += [f"{row['base_median']:.3f}",
+                      f"{row['current_median']:.3f}",
+                      f"{row['change']:+.1%}", f"{row['noise']:.3f}",
+                      f"{row['base_runs']} / {row['current_runs']}"]
+        else:
+            cells += [str(row.get("detail", ""))] + [""] * 4
+        color = colors.get(row["status"])
+        style = f' style="background:{color}"' if color else ""
+        body.append(f"<tr{style}>" +
+                    "".join(f"<td>{html.escape(cell)}</td>" for cell in cells)
+                    + "</tr>")
+    notes = "".join(f"<li>{html.escape(warning)}</li>" for warning in warnings)
+    return f"""<!DOCTYPE html>
+<html lang="zh-Hant">
+<head>
+<meta charset="utf-8">
+<title>效能比較</title>
+<style>
+body {{ font-family: "Microsoft YaHei", sans-serif; color: #2C2C2C; background: #F5F5F0; }}
+table {{ border-collapse: collapse; background: #FDFDF2; }}
+th, td {{ border: 1px solid #D8D8D8; padding: 4px 10px; text-align: right; }}
+td:nth-child(-n+2), th:nth-child(-n+2) {{ text-align: left; }}
+</style>
+</head>
+<body>
+<h1>效能比較</h1>
+<p>基準：{html.escape(_describe(baseline))}<br>
+目前：{html.escape(_describe(current))}<br>
+門檻：慢 {threshold:.0%} 以上，且差距超過 {noise_factor:g} 倍雜訊與 {min_delta * 1000:.0f} ms</p>
+<ul>{notes}</ul>
+<table>
+<tr><th>狀態</th><th>測試</th><th>基準(s)</th><th>目前(s)</th><th>變化</th><th>雜訊(s)</th><th>次數</th></tr>
+{chr(10).join(body)}
+</table>
+<p>結果：{html.escape(_summary(rows))}</p>
+</body>
+</html>
+"""
+
+
+def compare_paths(baseline_paths, current_paths, threshold=DEFAULT_THRESHOLD,
+                  noise_factor=DEFAULT_NOISE_FACTOR, min_delta=MIN_DELTA_S,
+                  html_path=None):
+    """讀取並比較兩組結果，回傳 (比較結果, 文字報告)；可一併輸出 HTML"""
+    baseline = load_result_set(baseline_paths)
+    current = load_result_set(current_paths)
+    warnings = check_compatible(baseline, current)
+    rows = compare_results(baseline, current, threshold, noise_factor,
+                           min_delta)
+    options = (threshold, noise_factor, min_delta)
+    if html_path:
+        with open(html_path, "w", encoding="utf-8") as f:
+            f.write(format_html_report(rows, baseline, current, warnings,
+                                       *options))
+    return rows, format_text_report(rows, baseline, current, warnings,
+                                    *options)
+
+
+def has_regression(rows):
+    return any(row["status"] in ("regression", "error") for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="比較兩組效能基準測試結果")
+    parser.add_argument("baseline", help="基準結果檔或目錄（以逗號分隔多個）")
+    parser.add_argument("current", help="目前結果檔或目錄（以逗號分隔多個）")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="中位數變慢的容許比例（預設 0.10）")
+    parser.add_argument("--noise-factor", type=float,
+                        default=DEFAULT_NOISE_FACTOR,
+                        help="差距須超過幾倍雜訊（預設 3）")
+    parser.add_argument("--min-delta", type=float, default=MIN_DELTA_S,
+                        help="差距小於此秒數視為持平（預設 0.01）")
+    parser.add_argument("--html", help="另存 HTML 報告的路徑")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="有退步時以結束碼 1 結束")
+    args = parser.parse_args()
+
+    try:
+        rows, report = compare_paths(args.baseline.split(","),
+                                     args.current.split(","),
+                                     args.threshold, args.noise_factor,
+                                     args.min_delta, args.html)
+    except (IncompatibleResults, OSError, ValueError) as e:
+        print(f"❌ 無法比較：{e}")
+        sys.exit(2)
+
+    print(report)
+    if args.html:
+        print(f"\nHTML 報告：{args.html}")
+    if args.fail_on_regression and has_regression(rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,13 +12,15 @@ import subprocess
 import shutil
 import re
 import zipfile
+import argparse
 from datetime import datetime
 from pathlib import Path
 
 
 class PDFToolkitBuilder:
 
-    def __init__(self):
+    def __init__(self, perf_baseline=None, perf_current=None,
+                 perf_threshold=None):
         self.base_app_name = "PDFToolkit"
         self.script_name = "app.py"
         self.system = platform.system()
@@ -26,8 +28,12 @@ class PDFToolkitBuilder:
         self.app_name = f"{self.base_app_name}-v{self.version}" if self.version else self.base_app_name
         self.requirements = [
             "pyinstaller>=5.0", "tkinterdnd2>=0.3.0", "PyMuPDF>=1.20.0",
-            "Pillow>=9.0.0", "pyfiglet>=0.8.0"
+            "Pillow>=9.0.0", "pyfiglet>=0.8.0", "numpy>=1.20.0"
         ]
+        # 效能退步檢查：指定基準結果時才執行
+        self.perf_baseline = perf_baseline
+        self.perf_current = perf_current
+        self.perf_threshold = perf_threshold
 
     def get_app_version(self):
         """從 app.py 中讀取版本號"""
@@ -119,6 +125,70 @@ class PDFToolkitBuilder:
 
         return True
 
+    def check_performance(self):
+        """效能退步檢查：與基準結果比較，退步超過門檻時停止建置"""
+        if not self.perf_baseline:
+            return True
+
+        print("\n⏱️  效能退步檢查...")
+        try:
+            from benchmark_compare import (DEFAULT_THRESHOLD, compare_paths,
+                                           has_regression, load_result_set)
+        except ImportError as e:
+            print(f"❌ 無法載入效能比較工具：{e}")
+            return False
+
+        baseline_paths = self.perf_baseline.split(",")
+        results_dir = Path("benchmarks") / "results"
+        results_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        try:
+            current = self.perf_current
+            if not current:
+                # 以與基準相同的條件執行基準測試
+                baseline = load_result_set(baseline_paths)
+                reference = baseline["reports"][0]
+                results = [result for report in baseline["reports"]
+                           for result in report["results"]]
+                current = str(results_dir /
+                              f"build_v{self.version}_{stamp}.json")
+                command = [
+                    sys.executable, "benchmark.py", "--output", current,
+                    "--repeat", str(reference["repeat"]),
+                    "--warmup", str(reference["warmup"]),
+                    "--corpus", ",".join(sorted({r["corpus"] for r in results})),
+                    "--operation",
+                    ",".join(sorted({r["operation"] for r in results}))
+                ]
+                if reference.get("quick"):
+                    command.append("--quick")
+                print("正在執行效能基準測試...")
+                # 輸出被導向檔案時 Windows 使用 ANSI 字碼頁，中文與符號會
+                # 無法編碼；主控台不受此設定影響
+                env = dict(os.environ, PYTHONIOENCODING="utf-8")
+                subprocess.run(command, check=True, env=env)
+
+            html_path = results_dir / f"build_report_{stamp}.html"
+            threshold = (self.perf_threshold if self.perf_threshold is not None
+                         else DEFAULT_THRESHOLD)
+            rows, report = compare_paths(baseline_paths,
+                                         current.split(","),
+                                         threshold=threshold,
+                                         html_path=str(html_path))
+        except (subprocess.CalledProcessError, OSError, ValueError) as e:
+            print(f"❌ 效能退步檢查失敗：{e}")
+            return False
+
+        print(report)
+        print(f"📄 HTML 報告：{html_path}")
+        if has_regression(rows):
+            print("❌ 效能退步超過門檻，停止建置")
+            return False
+
+        print("✅ 沒有效能退步")
+        return True
+
     def create_icon(self):
         """創建圖示"""
         print("\n🎨 處理應用程式圖示...")
@@ -204,7 +274,7 @@ class PDFToolkitBuilder:
 
         # 排除不必要的模組（保守排除，只排除確定不需要的）
         exclude_modules = [
-            "matplotlib", "numpy", "scipy", "pandas", "jupyter", "IPython",
+            "matplotlib", "scipy", "pandas", "jupyter", "IPython",
             "test", "unittest", "tkinter.test", "lib2to3", "pydoc", "doctest"
         ]
 
@@ -402,6 +472,10 @@ Build Date: {platform.node()}
         if not self.install_requirements():
             return False
 
+        # 效能退步檢查（選用）
+        if not self.check_performance():
+            return False
+
         # 準備檔案
         self.create_icon()
         self.clean_build()
@@ -435,7 +509,18 @@ Build Date: {platform.node()}
 
 def main():
     """主函數"""
-    builder = PDFToolkitBuilder()
+    parser = argparse.ArgumentParser(description="PDF 工具包打包腳本")
+    parser.add_argument("--perf-baseline",
+                        help="效能基準結果（檔案或目錄，以逗號分隔）；指定時效能退步即停止建置")
+    parser.add_argument("--perf-current",
+                        help="目前的效能結果；未指定時自動執行 benchmark.py")
+    parser.add_argument("--perf-threshold", type=float,
+                        help="中位數變慢的容許比例（預設 0.10）")
+    args = parser.parse_args()
+
+    builder = PDFToolkitBuilder(perf_baseline=args.perf_baseline,
+                                perf_current=args.perf_current,
+                                perf_threshold=args.perf_threshold)
 
     try:
         success = builder.run()
@@ -129,7 +129,7 @@ class PDFToolkitSimpleInstaller:
 
         # 排除不需要的模組
         exclude_modules = [
-            "matplotlib", "numpy", "scipy", "pandas", "jupyter", "IPython",
+            "matplotlib", "scipy", "pandas", "jupyter", "IPython",
             "test", "unittest", "lib2to3", "pydoc", "doctest"
         ]
 
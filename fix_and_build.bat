@@ -112,7 +112,6 @@ python -m PyInstaller ^
     --icon=icon.ico ^
     --exclude-module=pathlib ^
     --exclude-module=matplotlib ^
-    --exclude-module=numpy ^
     --exclude-module=scipy ^
     --exclude-module=pandas ^
     --exclude-module=jupyter ^
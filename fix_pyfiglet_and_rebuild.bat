@@ -118,7 +118,6 @@ python -m PyInstaller ^
     --name="PDFMerger_Fixed" ^
     --icon=icon.ico ^
     --exclude-module=matplotlib ^
-    --exclude-module=numpy ^
     --exclude-module=scipy ^
     --exclude-module=pandas ^
     --clean ^
@@ -23,7 +23,7 @@ build_options = {
         "winshell", "win32com.client", "winreg"
     ],
     "excludes": [
-        "matplotlib", "numpy", "scipy", "pandas", "jupyter", "IPython",
+        "matplotlib", "scipy", "pandas", "jupyter", "IPython",
         "test", "unittest", "lib2to3", "pydoc", "doctest"
     ],
     "include_files": [
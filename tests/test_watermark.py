@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""浮水印：混合頁面尺寸的回歸測試"""
+
+import os
+import sys
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+SETTINGS = {
+    'type': "text",
+    'text': "CONFIDENTIAL",
+    'font_size': 40,
+    'opacity': 0.3,
+    'position': "center",
+    'image_path': None,
+    'font_name': "helv",
+    'font_file': None,
+    'rotation': 45,
+    'tiled': False
+}
+
+
+def _mixed_pdf(path):
+    """50 頁 Letter 直向加 1 頁 A4 橫向"""
+    doc = fitz.open()
+    for _ in range(50):
+        doc.new_page(width=612, height=792)
+    doc.new_page(width=842, height=595)
+    doc.save(path)
+    doc.close()
+
+
+def test_text_watermark_mixed_page_sizes(tmp_path):
+    source = str(tmp_path / "mixed.pdf")
+    output = str(tmp_path / "out.pdf")
+    _mixed_pdf(source)
+
+    app.WatermarkStamper(SETTINGS).apply(source, output)
+
+    with fitz.open(output) as doc:
+        assert all("CONFIDENTIAL" in page.get_text() for page in doc)
+
+
+def test_recipient_watermark_mixed_page_sizes(tmp_path):
+    source = str(tmp_path / "mixed.pdf")
+    prepared = str(tmp_path / "prepared.pdf")
+    output = str(tmp_path / "alice.pdf")
+    _mixed_pdf(source)
+
+    targets = app.prepare_recipient_base(SETTINGS, source, prepared)
+    assert len(targets) == 2
+    stamper = app.WatermarkStamper(dict(SETTINGS, text="Alice"))
+    app.write_recipient_copy(stamper, prepared, targets, output)
+
+    with fitz.open(output) as doc:
+        assert "Alice" in doc[0].get_text()
+        assert "Alice" in doc[-1].get_text()
+
+
+def test_one_stamper_across_files_of_different_sizes(tmp_path):
+    stamper = app.WatermarkStamper(SETTINGS)
+    for index, size in enumerate([(612, 792), (842, 595), (612, 792)]):
+        source = str(tmp_path / f"in_{index}.pdf")
+        output = str(tmp_path / f"out_{index}.pdf")
+        doc = fitz.open()
+        doc.new_page(width=size[0], height=size[1])
+        doc.save(source)
+        doc.close()
+
+        stamper.apply(source, output)
+
+        with fitz.open(output) as doc:
+            assert "CONFIDENTIAL" in doc[0].get_text()